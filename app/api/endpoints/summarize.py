@@ -1,45 +1,159 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Request
+from fastapi import (
+    APIRouter,
+    File,
+    UploadFile,
+    Form,
+    HTTPException,
+    Depends,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+import asyncio
+import json
+import time
+import uuid
 from app.core.enums import FileType
-from app.core.models import SummaryResponse, JobStatusResponse, JobStatus
+from app.core.models import (
+    BatchStatusResponse,
+    BulkStatusRequest,
+    BulkStatusResponse,
+    JobStatus,
+    JobStatusResponse,
+    SummaryResponse,
+)
 from app.config.logging_config import logger
-from app.services.file_service import save_upload_file, cleanup_file
-from app.services.summarization.text import generate_text_summary
-from app.services.summarization.image import generate_image_summary
-from app.services.summarization.pdf import summarize_pdf
-from app.services.summarization.audio import summarize_audio
+from app.services.file_service import store_upload_file, cleanup_file
+from app.services.metrics import time_stage
+from app.services.tracing import profile_key
+from app.services.whisper_models import resolve_whisper_model
+from app.services.summary_cache import (
+    SummaryCache,
+    create_cached_job,
+    summary_cache_key,
+)
+from app.services.batches import batch_job_ids, new_batch_id
+from app.services.queues import fetch_job, fetch_jobs_with_results
+from app.services.cost_estimator import estimate_cost, estimate_text_cost
+from app.services.scheduling import (
+    JobSubmission,
+    cost_stats,
+    submit_job,
+    submit_jobs,
+)
+from app.services.job_stream import (
+    partial_key,
+    stream_channel,
+    wait_for_result,
+)
+from app.config.settings import (
+    BATCH_MAX_FILES,
+    PROFILING_ENABLED,
+    RESULT_WAIT_MAX,
+    RESULTS_MAX_IDS,
+    SUMMARY_CACHE_ENABLED,
+    STREAM_KEEPALIVE_INTERVAL,
+    UPLOAD_MAX_SIZES,
+)
 from rq import Queue, job
+from rq.exceptions import NoSuchJobError
+from rq.job import JobStatus as RQJobStatus
 import redis
 
 router = APIRouter()
 
 
-def process_summarization(
-    file_path: str, file_type: FileType, file_name: str, target_language: str
-):
-    """Function to be executed by RQ worker."""
-    logger.info(f"Processing file: {file_name}, type: {file_type}")
+# Job functions are enqueued by dotted path, so the API process never imports
+# the summarization stack (torch, Whisper, transformers)
+PROCESS_SUMMARIZATION = "app.services.jobs.process_summarization"
+PROCESS_TEXT_SUMMARIZATION = "app.services.jobs.process_text_summarization"
+
+
+def process_summarization(*args, **kwargs):
+    """Kept for jobs enqueued under this path before the move to app.services.jobs"""
+    from app.services.jobs import process_summarization
+
+    return process_summarization(*args, **kwargs)
+
+
+async def _prepare_summarization(
+    queues: dict[FileType, Queue],
+    file: UploadFile,
+    file_type: FileType,
+    file_name: str,
+    target_language: str,
+    whisper_model: str | None,
+    job_id: str | None = None,
+    profile: bool = False,
+) -> JobSubmission | job.Job:
+    """
+    Save an upload and return its cached job, or the job to submit for it.
+    A job to be profiled is always run.
+    """
+    # Only audio is transcribed, a mixed batch's other files ignore the model
+    if file_type != FileType.AUDIO:
+        whisper_model = None
+    upload_start = time.perf_counter()
+    with time_stage("upload"):
+        upload = await store_upload_file(
+            file, file_name, max_size=UPLOAD_MAX_SIZES.get(file_type.value, 0)
+        )
+    upload_seconds = round(time.perf_counter() - upload_start, 4)
+    queue = queues[file_type]
+
+    cache_key = None
+    if SUMMARY_CACHE_ENABLED:
+        cache_key = summary_cache_key(
+            upload.sha256, file_type, target_language, whisper_model
+        )
+    if cache_key and not profile:
+        cached = SummaryCache(queue.connection).get(cache_key)
+        if cached is not None:
+            cleanup_file(upload.path)
+            cached["file_name"] = file_name
+            cached_job = create_cached_job(queue, cached)
+            logger.info(f"Summary cache hit for {file_name}, job {cached_job.id}")
+            return cached_job
+
+    cost = await run_in_threadpool(estimate_cost, upload.path, file_type, upload.size)
+    return JobSubmission(
+        file_type,
+        cost,
+        PROCESS_SUMMARIZATION,
+        (
+            upload.path,
+            file_type,
+            file_name,
+            target_language,
+            whisper_model,
+            cache_key,
+        ),
+        meta={
+            "file_sha256": upload.sha256,
+            "file_size": upload.size,
+            "upload_seconds": upload_seconds,
+            "profile": profile,
+        },
+        job_id=job_id,
+    )
+
+
+def _validate_whisper_model(file_types, whisper_model: str | None) -> str | None:
+    """The Whisper model to use, or None when there is no audio to transcribe"""
+    if FileType.AUDIO not in file_types:
+        return None
     try:
-        summary = ""
-        if file_type == FileType.PDF:
-            summary = summarize_pdf(file_path, target_language)
-        elif file_type == FileType.AUDIO:
-            summary = summarize_audio(file_path, target_language)
-        elif file_type == FileType.IMAGE:
-            summary = generate_image_summary(file_path, target_language)
-        elif file_type == FileType.TEXT:
-            with open(file_path, "r") as text_file:
-                text = text_file.read()
-            summary = generate_text_summary(text, target_language)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
-        return SummaryResponse(
-            summary=summary, file_type=file_type, file_name=file_name
-        ).dict()
-    except Exception as e:
-        logger.error(f"Error processing {file_type} file: {e}")
-        raise e
-    finally:
-        cleanup_file(file_path)
+        return resolve_whisper_model(whisper_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _validate_profile(profile: bool):
+    if profile and not PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled")
 
 
 @router.post("/summarize")
@@ -49,48 +163,459 @@ async def summarize_file(
     file_type: FileType = Form(...),
     file_name: str = Form(...),
     target_language: str = Form("en"),
+    whisper_model: str | None = Form(None),
+    profile: bool = Form(False),
 ):
-    """Universal endpoint for submitting files for summarization."""
-    file_path = await save_upload_file(file, file_name)
-    queue: Queue = request.app.state.redis_queue
-    job = queue.enqueue(
-        process_summarization, file_path, file_type, file_name, target_language
+    """
+    Universal endpoint for submitting files for summarization. With profile,
+    the job runs under a profiler, see GET /result/{job_id}/profile.
+    """
+    whisper_model = _validate_whisper_model([file_type], whisper_model)
+    _validate_profile(profile)
+    queues = request.app.state.queues
+    prepared = await _prepare_summarization(
+        queues,
+        file,
+        file_type,
+        file_name,
+        target_language,
+        whisper_model,
+        profile=profile,
     )
-    return {"job_id": job.id}
+    if isinstance(prepared, job.Job):
+        return {"job_id": prepared.id, "cached": True}
 
+    (submitted,) = submit_jobs(queues, [prepared])
+    return {"job_id": submitted.id}
 
-@router.get("/result/{job_id}", response_model=JobStatusResponse)
-async def get_job_result(request: Request, job_id: str):
-    """Endpoint to retrieve the result of a summarization job."""
+
+@router.post("/summarize/batch")
+async def summarize_batch(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    file_types: list[FileType] = Form(...),
+    file_names: list[str] | None = Form(None),
+    target_language: str = Form("en"),
+    whisper_model: str | None = Form(None),
+):
+    """
+    Submit many files at once. file_types holds one type per file, or a single
+    type for all of them; file_names defaults to the uploaded file names.
+    """
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413, detail=f"At most {BATCH_MAX_FILES} files per batch"
+        )
+    if len(file_types) == 1:
+        file_types = file_types * len(files)
+    if len(file_types) != len(files):
+        raise HTTPException(
+            status_code=400, detail="Give one file type per file, or a single one"
+        )
+    if file_names is None:
+        file_names = [file.filename for file in files]
+    if len(file_names) != len(files):
+        raise HTTPException(status_code=400, detail="Give one file name per file")
+    whisper_model = _validate_whisper_model(file_types, whisper_model)
+
+    queues = request.app.state.queues
+    job_ids = []
+    submissions = []
+    try:
+        for file, file_type, file_name in zip(files, file_types, file_names):
+            # Ids are assigned up front so the batch keeps the upload order
+            prepared = await _prepare_summarization(
+                queues,
+                file,
+                file_type,
+                file_name,
+                target_language,
+                whisper_model,
+                job_id=str(uuid.uuid4()),
+            )
+            if isinstance(prepared, job.Job):
+                job_ids.append(prepared.id)
+            else:
+                job_ids.append(prepared.job_id)
+                submissions.append(prepared)
+
+        batch_id = new_batch_id()
+        submit_jobs(queues, submissions, batch=(batch_id, job_ids))
+    except Exception:
+        # Nothing was enqueued, so no job will remove the uploads saved so far
+        for submission in submissions:
+            cleanup_file(submission.args[0])
+        raise
+    logger.info(f"Batch {batch_id}: {len(submissions)} of {len(job_ids)} enqueued")
+    return {
+        "batch_id": batch_id,
+        "job_ids": job_ids,
+        "cached": len(job_ids) - len(submissions),
+    }
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(request: Request):
+    """Hit/miss counters for the summary cache."""
     queue: Queue = request.app.state.redis_queue
-    job = queue.fetch_job(job_id)
-    if job is None:
-        raise HTTPException(status_code=404, detail="Job not found")
-    if job.is_finished:
-        if job.result:
+    return SummaryCache(queue.connection).stats()
+
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats(request: Request):
+    """Estimated vs actual job runtimes and held jobs per file type."""
+    queue: Queue = request.app.state.redis_queue
+    return cost_stats(queue.connection)
+
+
+def _client_status(rq_status) -> JobStatus:
+    if rq_status == RQJobStatus.FINISHED:
+        return JobStatus.COMPLETED
+    if rq_status in (RQJobStatus.FAILED, RQJobStatus.STOPPED, RQJobStatus.CANCELED):
+        return JobStatus.FAILED
+    if rq_status in (RQJobStatus.QUEUED, RQJobStatus.DEFERRED, RQJobStatus.SCHEDULED):
+        return JobStatus.QUEUED
+    return JobStatus.PROCESSING
+
+
+def _job_status_response(
+    job_id: str, rq_job, return_value, error: str | None = None
+) -> JobStatusResponse:
+    """Client-facing status of a job, given its return value if it finished"""
+    status = _client_status(rq_job.get_status(refresh=False))
+    timings = rq_job.meta.get("timings")
+    language = rq_job.meta.get("detected_language")
+    if status == JobStatus.COMPLETED:
+        if return_value:
             return JobStatusResponse(
-                status=JobStatus.COMPLETED, job_id=job_id, summary=job.result["summary"]
+                status=JobStatus.COMPLETED,
+                job_id=job_id,
+                summary=return_value["summary"],
+                file_name=return_value.get("file_name"),
+                timings=timings,
+                detected_language=language,
             )
         else:
             return JobStatusResponse(
                 status=JobStatus.FAILED,
                 job_id=job_id,
                 error="Job finished with no result",
+                timings=timings,
+                detected_language=language,
             )
 
-    elif job.is_failed:
+    elif status == JobStatus.FAILED:
         return JobStatusResponse(
-            status=JobStatus.FAILED, job_id=job_id, error=str(job.exc_info)
+            status=JobStatus.FAILED,
+            job_id=job_id,
+            error=error if error is not None else str(rq_job.exc_info),
+            timings=timings,
+            detected_language=language,
         )
-    else:
-        return JobStatusResponse(status=JobStatus.PROCESSING, job_id=job_id)
+    return JobStatusResponse(
+        status=status, job_id=job_id, timings=timings, detected_language=language
+    )
+
+
+def _current_status(job_id: str, rq_job) -> JobStatusResponse:
+    """
+    Reload a job's status and timings, and its result if it has ended. Raises
+    NoSuchJobError if the job expired or was deleted since it was fetched.
+    Uses the blocking Redis client, so async handlers run it in the threadpool.
+    """
+    rq_job.refresh()
+    status = rq_job.get_status(refresh=False)
+    result = rq_job.result if status == RQJobStatus.FINISHED else None
+    return _job_status_response(job_id, rq_job, result)
+
+
+def _has_ended(response: JobStatusResponse) -> bool:
+    return response.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+@router.get("/result/{job_id}", response_model=JobStatusResponse)
+async def get_job_result(
+    request: Request,
+    job_id: str,
+    wait: float = Query(0, ge=0, le=RESULT_WAIT_MAX),
+):
+    """
+    Endpoint to retrieve the result of a summarization job. With wait, hold
+    the request for up to that many seconds until the job ends.
+    """
+    queue: Queue = request.app.state.redis_queue
+    job = fetch_job(queue.connection, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        response = await run_in_threadpool(_current_status, job_id, job)
+        if wait and not _has_ended(response):
+            if await wait_for_result(request.app.state.async_redis, job_id, wait):
+                response = await run_in_threadpool(_current_status, job_id, job)
+    except NoSuchJobError:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return response
+
+
+@router.get("/result/{job_id}/profile")
+async def get_job_profile(request: Request, job_id: str):
+    """
+    cProfile stats of a job submitted with profile set, for pstats or snakeviz.
+    """
+    queue: Queue = request.app.state.redis_queue
+    stats = queue.connection.get(profile_key(job_id))
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No profile for this job")
+    return Response(
+        stats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.prof"'},
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Read and ignore client frames, such as pings, until the client leaves"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/result/{job_id}/ws")
+async def job_result_websocket(websocket: WebSocket, job_id: str):
+    """Push a job's status on every change until it ends, then close."""
+    queue: Queue = websocket.app.state.redis_queue
+    job = fetch_job(queue.connection, job_id)
+    if job is None:
+        await websocket.close(code=4404, reason="Job not found")
+        return
+    await websocket.accept()
+
+    async_redis = websocket.app.state.async_redis
+    pubsub = async_redis.pubsub()
+    await pubsub.subscribe(stream_channel(job_id))
+    # Subscribed first, so a status published from here on is not missed
+    ended = asyncio.create_task(wait_for_result(async_redis, job_id))
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        response = await run_in_threadpool(_current_status, job_id, job)
+        await websocket.send_json(response.model_dump(mode="json"))
+        while not _has_ended(response):
+            message = asyncio.create_task(
+                pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=STREAM_KEEPALIVE_INTERVAL
+                )
+            )
+            await asyncio.wait(
+                {ended, disconnected, message}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected.done():
+                # The client is gone, there is nothing left to close
+                message.cancel()
+                return
+            if ended.done():
+                message.cancel()
+            elif message.result() is None:
+                continue
+            elif json.loads(message.result()["data"])["type"] != "status":
+                continue
+            response = await run_in_threadpool(_current_status, job_id, job)
+            await websocket.send_json(response.model_dump(mode="json"))
+        await websocket.close()
+    except NoSuchJobError:
+        await websocket.close(code=4404, reason="Job not found")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        ended.cancel()
+        disconnected.cancel()
+        await pubsub.unsubscribe(stream_channel(job_id))
+        await pubsub.aclose()
+
+
+@router.get("/batch/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_result(request: Request, batch_id: str):
+    """Progress of a batch and every summary finished so far, in one response."""
+    queue: Queue = request.app.state.redis_queue
+    job_ids = batch_job_ids(queue.connection, batch_id)
+    if not job_ids:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    results = []
+    jobs = await run_in_threadpool(fetch_jobs_with_results, queue.connection, job_ids)
+    for job_id, (rq_job, result) in zip(job_ids, jobs):
+        if rq_job is None:
+            results.append(
+                JobStatusResponse(
+                    status=JobStatus.FAILED, job_id=job_id, error="Job expired"
+                )
+            )
+        else:
+            results.append(
+                _job_status_response(
+                    job_id,
+                    rq_job,
+                    result.return_value if result else None,
+                    result.exc_string if result else None,
+                )
+            )
+
+    statuses = [result.status for result in results]
+    completed = statuses.count(JobStatus.COMPLETED)
+    failed = statuses.count(JobStatus.FAILED)
+    return BatchStatusResponse(
+        batch_id=batch_id,
+        total=len(results),
+        completed=completed,
+        failed=failed,
+        pending=len(results) - completed - failed,
+        results=results,
+    )
+
+
+@router.post(
+    "/results", response_model=BulkStatusResponse, response_model_exclude_none=True
+)
+async def get_job_results(request: Request, body: BulkStatusRequest):
+    """
+    Statuses of many jobs at once, loaded with pipelined reads. Summaries
+    and errors are left out unless include_summaries is set.
+    """
+    if len(body.job_ids) > RESULTS_MAX_IDS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {RESULTS_MAX_IDS} job ids per request"
+        )
+    queue: Queue = request.app.state.redis_queue
+    jobs = await run_in_threadpool(
+        fetch_jobs_with_results,
+        queue.connection,
+        body.job_ids,
+        body.include_summaries,
+    )
+
+    response = BulkStatusResponse(statuses={})
+    if body.include_summaries:
+        response.summaries, response.errors = {}, {}
+    for job_id, (rq_job, result) in zip(body.job_ids, jobs):
+        if rq_job is None:
+            response.missing.append(job_id)
+            continue
+        if not body.include_summaries:
+            response.statuses[job_id] = _client_status(rq_job.get_status(refresh=False))
+            continue
+        status = _job_status_response(
+            job_id,
+            rq_job,
+            result.return_value if result else None,
+            (result.exc_string or "") if result else "",
+        )
+        response.statuses[job_id] = status.status
+        if status.summary is not None:
+            response.summaries[job_id] = status.summary
+        if status.error:
+            response.errors[job_id] = status.error
+    return response
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _final_event(job) -> str | None:
+    """SSE event for a job that has already ended, None while it is running"""
+    job.get_status(refresh=True)
+    if job.is_finished:
+        if job.result:
+            return _sse("done", {"summary": job.result["summary"]})
+        return _sse("error", {"error": "Job finished with no result"})
+    if job.is_failed:
+        return _sse("error", {"error": str(job.exc_info)})
+    return None
+
+
+async def _job_event_stream(request: Request, job):
+    # _final_event reads the job with the blocking Redis client
+    final = await run_in_threadpool(_final_event, job)
+    if final:
+        yield final
+        return
+
+    async_redis = request.app.state.async_redis
+    pubsub = async_redis.pubsub()
+    await pubsub.subscribe(stream_channel(job.id))
+    try:
+        # The job may have ended before the subscription was in place
+        final = await run_in_threadpool(_final_event, job)
+        if final:
+            yield final
+            return
+
+        partial = await async_redis.get(partial_key(job.id)) or b""
+        seen = len(partial)
+        if partial:
+            yield _sse("token", {"text": partial.decode("utf-8", errors="ignore")})
+
+        while not await request.is_disconnected():
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=STREAM_KEEPALIVE_INTERVAL
+            )
+            if message is None:
+                final = await run_in_threadpool(_final_event, job)
+                if final:
+                    yield final
+                    return
+                yield ": keep-alive\n\n"
+                continue
+
+            event = json.loads(message["data"])
+            if event["type"] == "status":
+                yield _sse("status", event)
+                continue
+            if event["type"] != "token":
+                yield _sse(event["type"], event)
+                return
+
+            # Skip whatever was already sent from the partial key
+            data = event["text"].encode("utf-8")
+            start = max(seen - event["offset"], 0)
+            if start < len(data):
+                seen = event["offset"] + len(data)
+                yield _sse("token", {"text": data[start:].decode("utf-8", "ignore")})
+    finally:
+        await pubsub.unsubscribe(stream_channel(job.id))
+        await pubsub.aclose()
+
+
+@router.get("/result/{job_id}/stream")
+async def stream_job_result(request: Request, job_id: str):
+    """Stream a job's summary as Server-Sent Events while it is generated."""
+    queue: Queue = request.app.state.redis_queue
+    job = fetch_job(queue.connection, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _job_event_stream(request, job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/summarize/text", response_model=SummaryResponse)
 async def summarize_text(
-    request: Request, text: str = Form(...), target_language: str = Form("en")
+    request: Request,
+    text: str = Form(...),
+    target_language: str = Form("en"),
+    profile: bool = Form(False),
 ):
     """Summarize directly provided text via queue."""
-    queue: Queue = request.app.state.redis_queue
-    job = queue.enqueue(generate_text_summary, text, target_language)
+    _validate_profile(profile)
+    job = submit_job(
+        request.app.state.queues,
+        FileType.TEXT,
+        estimate_text_cost(len(text)),
+        PROCESS_TEXT_SUMMARIZATION,
+        text,
+        target_language,
+        meta={"profile": profile},
+    )
     return {"job_id": job.id}
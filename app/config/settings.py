@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List
 from pathlib import Path
 
 # API Configuration
@@ -21,9 +21,216 @@ TEMP_DIR = os.path.join(
 TEMP_FILE_MAX_AGE = 3600  # 1 hour in seconds
 TEMP_CLEANUP_INTERVAL = 1800  # 30 minutes in seconds
 
+# Uploads are written in chunks of this size, and rejected above the size
+# limit of their file type (in bytes, 0 = no limit)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_MAX_SIZES: Dict[str, int] = {
+    "pdf": int(os.getenv("UPLOAD_MAX_SIZE_PDF", str(50 * 1024 * 1024))),
+    "audio": int(os.getenv("UPLOAD_MAX_SIZE_AUDIO", str(500 * 1024 * 1024))),
+    "image": int(os.getenv("UPLOAD_MAX_SIZE_IMAGE", str(20 * 1024 * 1024))),
+    "text": int(os.getenv("UPLOAD_MAX_SIZE_TEXT", str(10 * 1024 * 1024))),
+}
+
 # Audio file conversion
-CONVERSION_API_URL = "http://localhost:8001"
+CONVERSION_API_URL = os.getenv("CONVERSION_API_URL", "http://localhost:8001")
 
 # Path for storing models
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 MODELS_DIR = os.environ.get("MODELS_DIR", os.path.join(BASE_DIR, "models"))
+
+# RQ queues, named after the file type they take so cheap jobs don't wait
+# behind heavy ones. Each has its own job timeout and result TTL in seconds.
+JOB_QUEUES: Dict[str, Dict[str, int]] = {
+    file_type: {
+        "job_timeout": int(os.getenv(f"QUEUE_{file_type.upper()}_TIMEOUT", timeout)),
+        "result_ttl": int(os.getenv(f"QUEUE_{file_type.upper()}_RESULT_TTL", "3600")),
+    }
+    for file_type, timeout in [
+        ("text", "300"),
+        ("image", "600"),
+        ("pdf", "1800"),
+        ("audio", "7200"),
+    ]
+}
+
+# Whisper model registry
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "small")
+WHISPER_ALLOWED_MODELS: List[str] = os.getenv(
+    "WHISPER_ALLOWED_MODELS", "tiny,base,small,medium,large,turbo"
+).split(",")
+WHISPER_MAX_LOADED_MODELS = int(os.getenv("WHISPER_MAX_LOADED_MODELS", "2"))
+# Comma-separated model sizes loaded when the worker starts
+WHISPER_PRELOAD_MODELS: List[str] = [
+    size
+    for size in os.getenv("WHISPER_PRELOAD_MODELS", WHISPER_MODEL).split(",")
+    if size
+]
+
+# Worker settings
+WORKER_MODE = os.getenv("WORKER_MODE", "fork")  # plain, fork or inprocess
+WORKER_MAX_JOBS = int(os.getenv("WORKER_MAX_JOBS", "0"))  # 0 = never recycle
+# Queues a worker listens on, cheapest first, and optional weights such as
+# "text=4,pdf=1" to pick among them at random instead of strictly in order
+WORKER_QUEUES: List[str] = os.getenv(
+    "WORKER_QUEUES", "text,image,pdf,audio,default"
+).split(",")
+WORKER_QUEUE_WEIGHTS = os.getenv("WORKER_QUEUE_WEIGHTS", "")
+WORKER_PRELOAD_TRANSLATION = os.getenv("WORKER_PRELOAD_TRANSLATION", "1") == "1"
+
+# Translation settings
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "8"))
+# Upper bound on tokens per translated segment (0 = the model's own limit)
+TRANSLATION_MAX_TOKENS = int(os.getenv("TRANSLATION_MAX_TOKENS", "0"))
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))  # 0 = torch default
+TORCH_NUM_INTEROP_THREADS = int(os.getenv("TORCH_NUM_INTEROP_THREADS", "0"))
+
+
+# Marian model per "source-target" language pair. More pairs can be added as
+# "pt-en=Helsinki-NLP/opus-mt-ROMANCE-en,en-es=Helsinki-NLP/opus-mt-en-es".
+def _parse_translation_models(spec: str) -> Dict[str, str]:
+    models = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        pair, _, model = (part.strip() for part in entry.partition("="))
+        source, _, target = pair.partition("-")
+        if not (source and target and model):
+            raise ValueError(
+                f"Invalid TRANSLATION_MODELS entry {entry!r}, expected "
+                "'source-target=model', e.g. 'pt-en=Helsinki-NLP/opus-mt-ROMANCE-en'"
+            )
+        models[pair] = model
+    return models
+
+
+TRANSLATION_MODELS: Dict[str, str] = _parse_translation_models(
+    os.getenv(
+        "TRANSLATION_MODELS",
+        "pt-en=Helsinki-NLP/opus-mt-ROMANCE-en,en-pt=Helsinki-NLP/opus-mt-tc-big-en-pt",
+    )
+)
+# Each pair is loaded on first use. Least recently used models are unloaded to
+# keep the resident ones under this many MB (0 = no limit).
+TRANSLATION_MEMORY_BUDGET_MB = int(os.getenv("TRANSLATION_MEMORY_BUDGET_MB", "0"))
+# Detect the language of texts to summarize, so only the translation passes it
+# actually needs are run. Only the start of the text is looked at.
+LANGUAGE_DETECTION_ENABLED = os.getenv("LANGUAGE_DETECTION_ENABLED", "1") == "1"
+LANGUAGE_DETECTION_MAX_CHARS = int(os.getenv("LANGUAGE_DETECTION_MAX_CHARS", "1000"))
+# Pairs the workers load before taking jobs, when WORKER_PRELOAD_TRANSLATION is
+# on. Every configured pair by default.
+TRANSLATION_PRELOAD_PAIRS: List[str] = [
+    pair.strip()
+    for pair in os.getenv(
+        "TRANSLATION_PRELOAD_PAIRS", ",".join(TRANSLATION_MODELS)
+    ).split(",")
+    if pair.strip()
+]
+# fp32, or int8 to run Marian with dynamically quantized Linear layers. The
+# int8 models are built once and cached under MODELS_DIR/int8.
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "fp32")
+
+# Summary cache
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") == "1"
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "10000"))
+# Bump whenever the summarization prompts change so stale summaries aren't served
+SUMMARY_PROMPT_VERSION = "1"
+
+# Streaming of partial summaries
+STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "1") == "1"
+STREAM_PARTIAL_TTL = int(os.getenv("STREAM_PARTIAL_TTL", "3600"))
+STREAM_KEEPALIVE_INTERVAL = 15  # seconds between SSE keep-alive comments
+# Longest a /result long-poll may wait for the job to end, in seconds
+RESULT_WAIT_MAX = int(os.getenv("RESULT_WAIT_MAX", "60"))
+
+# Outgoing HTTP (Ollama and conversion API)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "10"))
+# Non-streaming generations only answer once the whole summary is ready
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "600"))
+CONVERSION_API_READ_TIMEOUT = float(os.getenv("CONVERSION_API_READ_TIMEOUT", "60"))
+
+# Map-reduce summarization of long texts
+SUMMARY_CHARS_PER_TOKEN = int(os.getenv("SUMMARY_CHARS_PER_TOKEN", "4"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1500"))
+SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS = int(
+    os.getenv("SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS", str(SUMMARY_CHUNK_TOKENS))
+)
+# Ollama only runs these in parallel up to its own OLLAMA_NUM_PARALLEL
+SUMMARY_MAX_PARALLEL_CHUNKS = int(os.getenv("SUMMARY_MAX_PARALLEL_CHUNKS", "4"))
+
+# PDF text extraction
+PDF_FAST_TEXT = os.getenv("PDF_FAST_TEXT", "0") == "1"
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "0"))  # 0 = no limit
+PDF_MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+# Audio decoding: "auto" uses a local ffmpeg when present and falls back to the
+# conversion API, "local" requires ffmpeg, "remote" always uses the API
+AUDIO_DECODE_MODE = os.getenv("AUDIO_DECODE_MODE", "auto")
+AUDIO_DECODE_TIMEOUT = int(os.getenv("AUDIO_DECODE_TIMEOUT", "300"))
+AUDIO_SAMPLE_RATE = 16000  # What Whisper expects
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+# Long audio is split at silences and its segments transcribed in parallel
+AUDIO_LONG_THRESHOLD_SECONDS = int(os.getenv("AUDIO_LONG_THRESHOLD_SECONDS", "600"))
+AUDIO_SEGMENT_MAX_SECONDS = int(os.getenv("AUDIO_SEGMENT_MAX_SECONDS", "300"))
+AUDIO_SEGMENT_MIN_SECONDS = int(os.getenv("AUDIO_SEGMENT_MIN_SECONDS", "60"))
+AUDIO_MIN_SILENCE_SECONDS = float(os.getenv("AUDIO_MIN_SILENCE_SECONDS", "0.5"))
+# Frames quieter than this many dB below the loud parts of the file are silence
+AUDIO_SILENCE_DB = float(os.getenv("AUDIO_SILENCE_DB", "35"))
+# Each transcription process loads its own Whisper model
+AUDIO_TRANSCRIBE_WORKERS = int(
+    os.getenv("AUDIO_TRANSCRIBE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+# Cost estimates, in expected seconds of worker time, made before enqueueing
+COST_BASE_SECONDS: Dict[str, float] = {
+    "text": float(os.getenv("COST_TEXT_BASE_SECONDS", "5")),
+    "pdf": float(os.getenv("COST_PDF_BASE_SECONDS", "5")),
+    "image": float(os.getenv("COST_IMAGE_BASE_SECONDS", "20")),
+    "audio": float(os.getenv("COST_AUDIO_BASE_SECONDS", "10")),
+}
+COST_SECONDS_PER_KCHAR = float(os.getenv("COST_SECONDS_PER_KCHAR", "0.5"))
+COST_SECONDS_PER_PAGE = float(os.getenv("COST_SECONDS_PER_PAGE", "1.5"))
+COST_SECONDS_PER_MEGAPIXEL = float(os.getenv("COST_SECONDS_PER_MEGAPIXEL", "2"))
+# Worker seconds per second of audio
+COST_AUDIO_REALTIME_FACTOR = float(os.getenv("COST_AUDIO_REALTIME_FACTOR", "0.3"))
+# Used when an audio header can't be read, 128 kbit/s
+COST_AUDIO_BYTES_PER_SECOND = int(os.getenv("COST_AUDIO_BYTES_PER_SECOND", "16000"))
+
+# Shortest-job-first: jobs wait in a sorted set and are moved onto their RQ
+# queue cheapest first, keeping at most SJF_QUEUE_WATERMARK jobs queued.
+# Each second of waiting takes SJF_AGING_RATE seconds off a job's cost, so
+# large jobs are not starved.
+SJF_ENABLED = os.getenv("SJF_ENABLED", "1") == "1"
+SJF_QUEUE_WATERMARK = int(os.getenv("SJF_QUEUE_WATERMARK", "1"))
+SJF_AGING_RATE = float(os.getenv("SJF_AGING_RATE", "1.0"))
+
+# Batch submissions
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+BATCH_TTL = int(os.getenv("BATCH_TTL", str(24 * 3600)))
+
+# Redis connections. Blocking reads (long-polls, WebSockets) hold an async
+# connection each while they wait, so that pool is larger.
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_ASYNC_MAX_CONNECTIONS = int(os.getenv("REDIS_ASYNC_MAX_CONNECTIONS", "500"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "5"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+# Most job ids accepted by one bulk status request
+RESULTS_MAX_IDS = int(os.getenv("RESULTS_MAX_IDS", "1000"))
+
+# Prometheus metrics. Each worker serves its own on WORKER_METRICS_PORT
+# (0 = off), including the stages of the jobs it ran in forked processes.
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+METRICS_HEALTH_TIMEOUT = float(os.getenv("METRICS_HEALTH_TIMEOUT", "2"))
+
+# Lets requests ask for their job to run under cProfile. The stats are kept in
+# Redis for PROFILE_TTL seconds.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_TTL = int(os.getenv("PROFILE_TTL", str(24 * 3600)))
@@ -21,3 +21,29 @@ class JobStatusResponse(BaseModel):
     job_id: str
     summary: str | None = None
     error: str | None = None
+    file_name: str | None = None
+    # Queue wait, total and per-stage times recorded by the worker
+    timings: dict | None = None
+    # Language the worker detected the text to be in, if it could tell
+    detected_language: str | None = None
+
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    total: int
+    completed: int
+    failed: int
+    pending: int
+    results: list[JobStatusResponse]
+
+
+class BulkStatusRequest(BaseModel):
+    job_ids: list[str]
+    include_summaries: bool = False
+
+
+class BulkStatusResponse(BaseModel):
+    statuses: dict[str, JobStatus]
+    missing: list[str] = []
+    summaries: dict[str, str] | None = None
+    errors: dict[str, str] | None = None
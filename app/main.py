@@ -1,15 +1,31 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.config.settings import CORS_ORIGINS
 from app.api.endpoints import summarize
 from app.utils.temp_manager import setup_periodic_cleanup, startup_cleanup
-import redis
+from app.services.http_client import close_async_client
+from app.services.metrics import QueueCollector, metrics_registry
+from app.services.queues import create_queues
+from app.services.redis_client import (
+    create_async_redis_connection,
+    create_redis_connection,
+)
 from rq import Queue
 
 # Initialize Redis and RQ
-redis_conn = redis.Redis()
+redis_conn = create_redis_connection()
 queue = Queue(connection=redis_conn)
+queues = create_queues(redis_conn)
+
+# Async connection for pub/sub driven endpoints
+async_redis_conn = create_async_redis_connection()
+
+# Stage metrics of this process, plus queue and backend state read at scrape time
+registry = metrics_registry()
+registry.register(QueueCollector(redis_conn, [queue.name for queue in queues.values()]))
 
 
 # Define lifespan context manager
@@ -21,11 +37,16 @@ async def lifespan(app: FastAPI):
 
     # Store Redis queue in app state
     app.state.redis_queue = queue
+    app.state.queues = queues
+    app.state.async_redis = async_redis_conn
 
     yield  # This is where the app runs
 
     # Shutdown code (if you have any)
     cleanup_task.cancel()  # Cancel the periodic task if it returns a task
+    await async_redis_conn.aclose()
+    redis_conn.close()
+    await close_async_client()
 
 
 # Create the FastAPI app with lifespan
@@ -53,3 +74,11 @@ app.include_router(summarize.router, tags=["summarization"])
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    # Collecting talks to Redis and the backends, keep it off the event loop
+    data = await run_in_threadpool(generate_latest, registry)
+    return Response(data, media_type=CONTENT_TYPE_LATEST)
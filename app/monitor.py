@@ -8,35 +8,38 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import redis
 from rq import Queue
 from rq.registry import StartedJobRegistry
-
-redis_conn = redis.Redis()
-queue = Queue(connection=redis_conn)
-
-# Get the list of started jobs (active jobs)
-started_job_registry = StartedJobRegistry("default", connection=redis_conn)
-started_job_ids = started_job_registry.get_job_ids()
-
-if started_job_ids:
-    print("Active Jobs:")
-    for job_id in started_job_ids:
-        job = queue.fetch_job(job_id)
-        if job:
-            print(f"  Job ID: {job.id}, Function: {job.func_name}, Status: started")
-        else:
-            print(f"Job id: {job_id} not found")
-else:
-    print("No active jobs.")
-
-# get the queued jobs.
-queued_jobs = queue.get_job_ids()
-
-if queued_jobs:
-    print("Queued Jobs:")
-    for job_id in queued_jobs:
-        job = queue.fetch_job(job_id)
-        if job:
-            print(f"  Job ID: {job.id}, Function: {job.func_name}, Status: queued")
-        else:
-            print(f"Job id: {job_id} not found")
-else:
-    print("No queued jobs.")
+from app.config.settings import REDIS_URL, WORKER_QUEUES
+
+redis_conn = redis.from_url(REDIS_URL)
+
+for queue_name in WORKER_QUEUES:
+    queue = Queue(queue_name, connection=redis_conn)
+
+    # Get the list of started jobs (active jobs)
+    started_job_registry = StartedJobRegistry(queue.name, connection=redis_conn)
+    started_job_ids = started_job_registry.get_job_ids()
+
+    if started_job_ids:
+        print(f"Active Jobs in {queue.name}:")
+        for job_id in started_job_ids:
+            job = queue.fetch_job(job_id)
+            if job:
+                print(f"  Job ID: {job.id}, Function: {job.func_name}, Status: started")
+            else:
+                print(f"Job id: {job_id} not found")
+    else:
+        print(f"No active jobs in {queue.name}.")
+
+    # get the queued jobs.
+    queued_jobs = queue.get_job_ids()
+
+    if queued_jobs:
+        print(f"Queued Jobs in {queue.name}:")
+        for job_id in queued_jobs:
+            job = queue.fetch_job(job_id)
+            if job:
+                print(f"  Job ID: {job.id}, Function: {job.func_name}, Status: queued")
+            else:
+                print(f"Job id: {job_id} not found")
+    else:
+        print(f"No queued jobs in {queue.name}.")
@@ -1,7 +1,24 @@
+import json
+import httpx
 import requests
+from typing import AsyncIterator, Callable, Iterator
 from fastapi import HTTPException
 from app.config.logging_config import logger
-from app.config.settings import OLLAMA_API_URL
+from app.config.settings import (
+    HTTP_CONNECT_TIMEOUT,
+    OLLAMA_API_URL,
+    OLLAMA_READ_TIMEOUT,
+)
+from app.services.metrics import time_stage
+from app.services.http_client import (
+    async_request,
+    get_async_client,
+    get_session,
+    timeout,
+)
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
 
 
 def filter_model_response(response: str) -> str:
@@ -12,12 +29,101 @@ def filter_model_response(response: str) -> str:
     return response
 
 
+def _partial_tag_length(text: str, tag: str) -> int:
+    """Length of the longest suffix of text that is a prefix of tag"""
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:length]):
+            return length
+    return 0
+
+
+class ThinkFilter:
+    """
+    Incremental version of filter_model_response for streamed tokens.
+
+    Text inside <think>...</think> is dropped as it arrives, and a tag split
+    across two tokens is held back until it can be recognised.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+        self._strip_leading = True
+
+    def feed(self, chunk: str) -> str:
+        """Add a streamed chunk, returning the text that is safe to show"""
+        self._buffer += chunk
+        output = []
+        while self._buffer:
+            if self._in_think:
+                end = self._buffer.find(THINK_CLOSE)
+                if end == -1:
+                    keep = _partial_tag_length(self._buffer, THINK_CLOSE)
+                    self._buffer = self._buffer[len(self._buffer) - keep :]
+                    break
+                self._buffer = self._buffer[end + len(THINK_CLOSE) :]
+                self._in_think = False
+                continue
+
+            start = self._buffer.find(THINK_OPEN)
+            if start != -1:
+                output.append(self._buffer[:start])
+                self._buffer = self._buffer[start + len(THINK_OPEN) :]
+                self._in_think = True
+                continue
+
+            keep = _partial_tag_length(self._buffer, THINK_OPEN)
+            output.append(self._buffer[: len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep :]
+            break
+        return self._emit("".join(output))
+
+    def flush(self) -> str:
+        """Return whatever is still held back once the stream has ended"""
+        remaining = "" if self._in_think else self._buffer
+        self._buffer = ""
+        return self._emit(remaining)
+
+    def _emit(self, text: str) -> str:
+        # Leading whitespace left behind by a removed block is dropped
+        if self._strip_leading:
+            text = text.lstrip()
+            if text:
+                self._strip_leading = False
+        return text
+
+
 class OllamaClient:
     """Client for interacting with Ollama API"""
 
     @staticmethod
-    def generate(model: str, prompt: str, images=None) -> str:
-        """Send a generate request to Ollama API"""
+    def generate(
+        model: str,
+        prompt: str,
+        images=None,
+        on_token: Callable[[str], None] | None = None,
+    ) -> str:
+        """
+        Send a generate request to Ollama API.
+
+        When on_token is given the response is streamed, and on_token is called
+        with each piece of filtered text as soon as it arrives.
+        """
+        with time_stage("ollama_generate", model=model) as sizes:
+            sizes["input_chars"] = len(prompt)
+            if on_token is None:
+                response = OllamaClient._generate(model, prompt, images)
+            else:
+                pieces = []
+                for piece in OllamaClient.generate_stream(model, prompt, images):
+                    pieces.append(piece)
+                    on_token(piece)
+                response = "".join(pieces).strip()
+            sizes["output_chars"] = len(response)
+            return response
+
+    @staticmethod
+    def _generate(model: str, prompt: str, images=None) -> str:
         payload = {
             "model": model,
             "prompt": prompt,
@@ -28,7 +134,9 @@ class OllamaClient:
             payload["images"] = images
 
         try:
-            response = requests.post(OLLAMA_API_URL, json=payload)
+            response = get_session().post(
+                OLLAMA_API_URL, json=payload, timeout=timeout(OLLAMA_READ_TIMEOUT)
+            )
             response.raise_for_status()
             result = response.json()
             raw_response = result.get("response", "")
@@ -41,3 +149,125 @@ class OllamaClient:
             raise HTTPException(
                 status_code=500, detail=f"Error generating content: {str(e)}"
             )
+
+    @staticmethod
+    def generate_stream(model: str, prompt: str, images=None) -> Iterator[str]:
+        """Stream a generate request, yielding text with the thinking removed"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+        }
+
+        if images:
+            payload["images"] = images
+
+        think_filter = ThinkFilter()
+        try:
+            with get_session().post(
+                OLLAMA_API_URL,
+                json=payload,
+                stream=True,
+                timeout=timeout(OLLAMA_READ_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                # Ollama streams one JSON object per line
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise requests.exceptions.RequestException(data["error"])
+                    piece = think_filter.feed(data.get("response", ""))
+                    if piece:
+                        yield piece
+                    if data.get("done"):
+                        break
+            piece = think_filter.flush()
+            if piece:
+                yield piece
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error streaming from Ollama API: {e}")
+            raise HTTPException(
+                status_code=500, detail=f"Error generating content: {str(e)}"
+            )
+
+
+class AsyncOllamaClient:
+    """Async client for interacting with Ollama API, sharing one httpx pool"""
+
+    @staticmethod
+    async def generate(model: str, prompt: str, images=None) -> str:
+        """Send a generate request to Ollama API"""
+        with time_stage("ollama_generate", model=model) as sizes:
+            sizes["input_chars"] = len(prompt)
+            response = await AsyncOllamaClient._generate(model, prompt, images)
+            sizes["output_chars"] = len(response)
+            return response
+
+    @staticmethod
+    async def _generate(model: str, prompt: str, images=None) -> str:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+        }
+
+        if images:
+            payload["images"] = images
+
+        try:
+            response = await async_request(
+                "POST", OLLAMA_API_URL, OLLAMA_READ_TIMEOUT, json=payload
+            )
+            response.raise_for_status()
+            raw_response = response.json().get("response", "")
+            return filter_model_response(raw_response)
+        except httpx.HTTPError as e:
+            logger.error(f"Error calling Ollama API: {e}")
+            raise HTTPException(
+                status_code=500, detail=f"Error generating content: {str(e)}"
+            )
+
+    @staticmethod
+    async def generate_stream(
+        model: str, prompt: str, images=None
+    ) -> AsyncIterator[str]:
+        """Stream a generate request, yielding text with the thinking removed"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+        }
+
+        if images:
+            payload["images"] = images
+
+        think_filter = ThinkFilter()
+        request_timeout = httpx.Timeout(
+            OLLAMA_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT
+        )
+        try:
+            async with get_async_client().stream(
+                "POST", OLLAMA_API_URL, json=payload, timeout=request_timeout
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise httpx.HTTPError(data["error"])
+                    piece = think_filter.feed(data.get("response", ""))
+                    if piece:
+                        yield piece
+                    if data.get("done"):
+                        break
+            piece = think_filter.flush()
+            if piece:
+                yield piece
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming from Ollama API: {e}")
+            raise HTTPException(
+                status_code=500, detail=f"Error generating content: {str(e)}"
+            )
@@ -0,0 +1,28 @@
+# app/services/batches.py
+import uuid
+from redis import Redis
+from redis.client import Pipeline
+from app.config.settings import BATCH_TTL
+
+BATCH_PREFIX = "synthia:batch"
+
+
+def batch_key(batch_id: str) -> str:
+    return f"{BATCH_PREFIX}:{batch_id}:jobs"
+
+
+def new_batch_id() -> str:
+    return str(uuid.uuid4())
+
+
+def record_batch(pipeline: Pipeline, batch_id: str, job_ids: list[str]):
+    """Store the ordered job ids of a batch, as part of a pipeline"""
+    pipeline.rpush(batch_key(batch_id), *job_ids)
+    pipeline.expire(batch_key(batch_id), BATCH_TTL)
+
+
+def batch_job_ids(connection: Redis, batch_id: str) -> list[str]:
+    return [
+        job_id.decode() if isinstance(job_id, bytes) else job_id
+        for job_id in connection.lrange(batch_key(batch_id), 0, -1)
+    ]
@@ -0,0 +1,139 @@
+# app/services/cost_estimator.py
+import os
+import struct
+import wave
+from app.config.logging_config import logger
+from app.config.settings import (
+    COST_AUDIO_BYTES_PER_SECOND,
+    COST_AUDIO_REALTIME_FACTOR,
+    COST_BASE_SECONDS,
+    COST_SECONDS_PER_KCHAR,
+    COST_SECONDS_PER_MEGAPIXEL,
+    COST_SECONDS_PER_PAGE,
+)
+from app.core.enums import FileType
+
+# Reading this much of the end of an Ogg file finds its last page
+OGG_TAIL_BYTES = 64 * 1024
+
+
+def pdf_page_count(file_path: str) -> int:
+    # Deferred so only the first PDF upload pays for loading PyMuPDF
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def _ogg_duration(file_path: str) -> float | None:
+    """Duration from the granule position of the last Ogg page"""
+    with open(file_path, "rb") as f:
+        head = f.read(OGG_TAIL_BYTES)
+        if not head.startswith(b"OggS"):
+            return None
+        if b"OpusHead" in head[:128]:
+            sample_rate = 48000  # Opus granules always count 48 kHz samples
+        else:
+            marker = head.find(b"\x01vorbis")
+            if marker < 0:
+                return None
+            sample_rate = struct.unpack_from("<I", head, marker + 12)[0]
+
+        f.seek(max(0, os.path.getsize(file_path) - OGG_TAIL_BYTES))
+        tail = f.read()
+    last_page = tail.rfind(b"OggS")
+    if last_page < 0 or not sample_rate:
+        return None
+    granule = struct.unpack_from("<q", tail, last_page + 6)[0]
+    return granule / sample_rate if granule > 0 else None
+
+
+def audio_duration(file_path: str, file_size: int) -> float:
+    """Audio duration in seconds from its header, or guessed from its size"""
+    try:
+        with open(file_path, "rb") as f:
+            magic = f.read(4)
+        if magic == b"RIFF":
+            with wave.open(file_path, "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        if magic == b"OggS":
+            duration = _ogg_duration(file_path)
+            if duration is not None:
+                return duration
+    except Exception as e:
+        logger.warning(f"Could not read audio header of {file_path}: {e}")
+    return file_size / COST_AUDIO_BYTES_PER_SECOND
+
+
+def image_pixels(file_path: str) -> int | None:
+    """Pixel count from a PNG, GIF or JPEG header"""
+    with open(file_path, "rb") as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            width, height = struct.unpack(">II", head[16:24])
+            return width * height
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            width, height = struct.unpack("<HH", head[6:10])
+            return width * height
+        if not head.startswith(b"\xff\xd8"):
+            return None
+
+        # Walk the JPEG segments up to the start-of-frame marker
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            length = struct.unpack(">H", f.read(2))[0]
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">xHH", f.read(5))
+                return width * height
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def estimate_cost(file_path: str, file_type: FileType, file_size: int) -> dict:
+    """
+    Estimate how many seconds of worker time a job will take, from cheap
+    reads of the file's header or metadata.
+
+    Returns the measured size ("units" of "unit") and the estimate in "seconds".
+    """
+    base = COST_BASE_SECONDS[file_type.value]
+    try:
+        if file_type == FileType.PDF:
+            pages = pdf_page_count(file_path)
+            return {
+                "unit": "pages",
+                "units": pages,
+                "seconds": base + pages * COST_SECONDS_PER_PAGE,
+            }
+        if file_type == FileType.AUDIO:
+            duration = audio_duration(file_path, file_size)
+            return {
+                "unit": "seconds",
+                "units": round(duration, 1),
+                "seconds": base + duration * COST_AUDIO_REALTIME_FACTOR,
+            }
+        if file_type == FileType.IMAGE:
+            pixels = image_pixels(file_path)
+            if pixels is not None:
+                return {
+                    "unit": "pixels",
+                    "units": pixels,
+                    "seconds": base + pixels / 1e6 * COST_SECONDS_PER_MEGAPIXEL,
+                }
+    except Exception as e:
+        logger.warning(f"Could not estimate the cost of {file_path}: {e}")
+
+    if file_type == FileType.TEXT:
+        return estimate_text_cost(file_size)
+    return {"unit": "bytes", "units": file_size, "seconds": base}
+
+
+def estimate_text_cost(length: int) -> dict:
+    """Cost of summarizing text of the given length (characters or bytes)"""
+    return {
+        "unit": "chars",
+        "units": length,
+        "seconds": COST_BASE_SECONDS["text"] + length / 1000 * COST_SECONDS_PER_KCHAR,
+    }
@@ -1,26 +1,78 @@
+import hashlib
 import os
-import shutil
+from typing import BinaryIO, NamedTuple
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.config.logging_config import logger
+from app.config.settings import UPLOAD_CHUNK_SIZE
 from app.utils.temp_manager import create_temp_file_path
 
 
-async def save_upload_file(file: UploadFile, file_name: str) -> str:
-    """Save an uploaded file to a temporary location"""
-    file_path = create_temp_file_path(file_name)
+class SavedUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+
+
+def _copy_chunk(source: BinaryIO, target: BinaryIO, digest) -> int:
+    """Copy, hash and measure one chunk, run in the threadpool"""
+    chunk = source.read(UPLOAD_CHUNK_SIZE)
+    if chunk:
+        digest.update(chunk)
+        target.write(chunk)
+    return len(chunk)
+
+
+async def store_upload_file(
+    file: UploadFile, file_name: str, max_size: int = 0
+) -> SavedUpload:
+    """
+    Stream an uploaded file to a temporary location in chunks, hashing and
+    measuring it on the way, without blocking the event loop.
 
+    Raises a 413 as soon as the file grows past max_size bytes (0 = no limit).
+    """
+    known_size = getattr(file, "size", None)
+    if max_size and known_size is not None and known_size > max_size:
+        raise HTTPException(
+            status_code=413, detail=f"File too large, limit is {max_size} bytes"
+        )
+
+    file_path = create_temp_file_path(file_name)
+    digest = hashlib.sha256()
+    size = 0
     try:
-        # Save the uploaded file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        buffer = await run_in_threadpool(open, file_path, "wb")
+        try:
+            while True:
+                copied = await run_in_threadpool(_copy_chunk, file.file, buffer, digest)
+                if not copied:
+                    break
+                size += copied
+                if max_size and size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large, limit is {max_size} bytes",
+                    )
+        finally:
+            await run_in_threadpool(buffer.close)
 
-        logger.info(f"Saved uploaded file to: {file_path}")
-        return file_path
+        logger.info(f"Saved uploaded file to: {file_path} ({size} bytes)")
+        return SavedUpload(file_path, digest.hexdigest(), size)
+    except HTTPException:
+        cleanup_file(file_path)
+        raise
     except Exception as e:
         logger.error(f"Error saving uploaded file: {e}")
+        cleanup_file(file_path)
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
 
 
+async def save_upload_file(file: UploadFile, file_name: str) -> str:
+    """Save an uploaded file to a temporary location"""
+    return (await store_upload_file(file, file_name)).path
+
+
 def cleanup_file(file_path: str) -> bool:
     """Remove a temporary file"""
     try:
@@ -0,0 +1,111 @@
+# app/services/http_client.py
+import asyncio
+import os
+import random
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.config.logging_config import logger
+from app.config.settings import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_BACKOFF_MAX,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+)
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+_async_client: httpx.AsyncClient | None = None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given retry attempt"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_FACTOR * 2**attempt))
+
+
+def timeout(read_timeout: float) -> tuple[float, float]:
+    """(connect, read) timeout pair for requests"""
+    return (HTTP_CONNECT_TIMEOUT, read_timeout)
+
+
+def get_session() -> requests.Session:
+    """
+    Shared keep-alive session for outgoing HTTP calls.
+
+    Connection errors are retried with jittered backoff; since the request
+    never reached the server this is safe for POSTs too. A forked process gets
+    its own session instead of reusing the parent's sockets.
+    """
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            retry = Retry(
+                total=HTTP_RETRIES,
+                connect=HTTP_RETRIES,
+                read=0,
+                status=0,
+                other=0,
+                allowed_methods=None,
+                backoff_factor=HTTP_BACKOFF_FACTOR,
+                backoff_max=HTTP_BACKOFF_MAX,
+                backoff_jitter=HTTP_BACKOFF_FACTOR,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared keep-alive httpx client for async callers"""
+    global _async_client
+
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE,
+            ),
+            timeout=httpx.Timeout(None, connect=HTTP_CONNECT_TIMEOUT),
+        )
+    return _async_client
+
+
+async def close_async_client():
+    """Close the shared async client, e.g. on application shutdown"""
+    global _async_client
+
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+async def async_request(
+    method: str, url: str, read_timeout: float, **kwargs
+) -> httpx.Response:
+    """Send a request with the async client, retrying connection errors"""
+    client = get_async_client()
+    request_timeout = httpx.Timeout(read_timeout, connect=HTTP_CONNECT_TIMEOUT)
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            return await client.request(method, url, timeout=request_timeout, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if attempt == HTTP_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(
+                f"Connection to {url} failed ({e}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,96 @@
+# app/services/job_stream.py
+import json
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from rq import get_current_job
+from rq.results import Result
+from app.config.logging_config import logger
+from app.config.settings import STREAM_PARTIAL_TTL, STREAMING_ENABLED
+
+STREAM_PREFIX = "synthia:stream"
+
+
+def stream_channel(job_id: str) -> str:
+    """Pub/sub channel carrying a job's streamed output"""
+    return f"{STREAM_PREFIX}:{job_id}:events"
+
+
+def partial_key(job_id: str) -> str:
+    """Key holding everything streamed so far, for late subscribers"""
+    return f"{STREAM_PREFIX}:{job_id}:partial"
+
+
+class JobStreamPublisher:
+    """
+    Publishes partial output of a job as it is generated.
+
+    Each token is appended to the job's partial key and published together with
+    its byte offset, so a subscriber that read the partial key first can drop
+    the tokens it has already seen.
+    """
+
+    def __init__(self, connection: Redis, job_id: str):
+        self.connection = connection
+        self.job_id = job_id
+        self._offset = 0
+
+    def token(self, text: str) -> None:
+        data = text.encode("utf-8")
+        message = {"type": "token", "text": text, "offset": self._offset}
+        try:
+            with self.connection.pipeline(transaction=False) as pipe:
+                pipe.append(partial_key(self.job_id), data)
+                pipe.expire(partial_key(self.job_id), STREAM_PARTIAL_TTL)
+                pipe.publish(stream_channel(self.job_id), json.dumps(message))
+                pipe.execute()
+            self._offset += len(data)
+        except Exception as e:
+            # Streaming is best-effort, the final result is still stored by RQ
+            logger.warning(f"Could not publish partial output for {self.job_id}: {e}")
+
+    def done(self, summary: str) -> None:
+        self._publish({"type": "done", "summary": summary})
+
+    def error(self, error: str) -> None:
+        self._publish({"type": "error", "error": error})
+
+    def _publish(self, message: dict) -> None:
+        try:
+            self.connection.publish(stream_channel(self.job_id), json.dumps(message))
+        except Exception as e:
+            logger.warning(f"Could not publish stream event for {self.job_id}: {e}")
+
+
+def current_job_publisher() -> JobStreamPublisher | None:
+    """Publisher for the RQ job running in this process, if any"""
+    if not STREAMING_ENABLED:
+        return None
+    job = get_current_job()
+    if job is None:
+        return None
+    return JobStreamPublisher(job.connection, job.id)
+
+
+def publish_status(connection: Redis, job_id: str, status: str) -> None:
+    """Announce a job state change to the job's subscribers"""
+    try:
+        connection.publish(
+            stream_channel(job_id), json.dumps({"type": "status", "status": status})
+        )
+    except Exception as e:
+        logger.warning(f"Could not publish status of {job_id}: {e}")
+
+
+async def wait_for_result(
+    async_redis: AsyncRedis, job_id: str, timeout: float | None = None
+) -> bool:
+    """
+    Wait until RQ stores a result (success or failure) for the job, or the
+    timeout in seconds passes. Blocks on the job's result stream in Redis, so
+    nothing is polled.
+    """
+    block = 0 if timeout is None else max(1, int(timeout * 1000))
+    response = await async_redis.xread(
+        {Result.get_key(job_id): "0-0"}, count=1, block=block
+    )
+    return bool(response)
@@ -0,0 +1,115 @@
+# app/services/jobs.py
+"""
+Functions executed by the RQ workers. The API enqueues them by dotted path and
+never imports this module, which pulls in torch, Whisper and transformers.
+"""
+
+import time
+from rq import get_current_job
+from app.config.logging_config import logger
+from app.core.enums import FileType
+from app.core.models import SummaryResponse
+from app.services.file_service import cleanup_file
+from app.services.job_stream import current_job_publisher
+from app.services.scheduling import record_job_cost
+from app.services.summarization import (
+    generate_image_summary,
+    generate_text_summary,
+    summarize_audio,
+    summarize_pdf,
+)
+from app.services.summary_cache import SummaryCache
+from app.services.tracing import trace_job
+
+
+def process_summarization(
+    file_path: str,
+    file_type: FileType,
+    file_name: str,
+    target_language: str,
+    whisper_model: str | None = None,
+    cache_key: str | None = None,
+):
+    """Function to be executed by RQ worker."""
+    current_job = get_current_job()
+    # Hash and size were computed while the upload was saved
+    file_size = current_job.meta.get("file_size") if current_job else None
+    logger.info(f"Processing file: {file_name}, type: {file_type}, size: {file_size}")
+    start_time = time.monotonic()
+    publisher = current_job_publisher()
+    on_token = publisher.token if publisher else None
+    try:
+        with trace_job(current_job):
+            summary = _summarize(
+                file_path, file_type, target_language, whisper_model, on_token
+            )
+        result = SummaryResponse(
+            summary=summary, file_type=file_type, file_name=file_name
+        ).dict()
+
+        duration = time.monotonic() - start_time
+        _record_cost(current_job, file_type, duration)
+        if cache_key and current_job is not None:
+            SummaryCache(current_job.connection).set(
+                cache_key, result, duration=duration
+            )
+        if publisher:
+            publisher.done(summary)
+        return result
+    except Exception as e:
+        logger.error(f"Error processing {file_type} file: {e}")
+        if publisher:
+            publisher.error(str(e))
+        raise e
+    finally:
+        cleanup_file(file_path)
+
+
+def _record_cost(job, file_type: FileType, duration: float):
+    """Compare the job's estimated cost with its runtime, for the SJF scheduler"""
+    if job is not None and "cost" in job.meta:
+        record_job_cost(
+            job.connection, file_type, job.meta["cost"]["seconds"], duration
+        )
+
+
+def _summarize(
+    file_path: str,
+    file_type: FileType,
+    target_language: str,
+    whisper_model: str | None,
+    on_token,
+) -> str:
+    if file_type == FileType.PDF:
+        return summarize_pdf(file_path, target_language, on_token)
+    elif file_type == FileType.AUDIO:
+        return summarize_audio(file_path, target_language, whisper_model, on_token)
+    elif file_type == FileType.IMAGE:
+        return generate_image_summary(file_path, target_language, on_token)
+    elif file_type == FileType.TEXT:
+        with open(file_path, "r") as text_file:
+            text = text_file.read()
+        return generate_text_summary(text, target_language, on_token)
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def process_text_summarization(text: str, target_language: str):
+    """Function to be executed by RQ worker for text sent in the request."""
+    current_job = get_current_job()
+    start_time = time.monotonic()
+    publisher = current_job_publisher()
+    on_token = publisher.token if publisher else None
+    try:
+        with trace_job(current_job):
+            summary = generate_text_summary(text, target_language, on_token)
+        _record_cost(current_job, FileType.TEXT, time.monotonic() - start_time)
+        if publisher:
+            publisher.done(summary)
+        return SummaryResponse(
+            summary=summary, file_type=FileType.TEXT, file_name=""
+        ).dict()
+    except Exception as e:
+        logger.error(f"Error processing text: {e}")
+        if publisher:
+            publisher.error(str(e))
+        raise e
@@ -0,0 +1,274 @@
+# app/services/metrics.py
+import os
+import time
+import requests
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from redis import Redis
+from redis.exceptions import RedisError
+from rq import Queue, Worker
+from rq.registry import StartedJobRegistry
+from app.config.logging_config import logger
+from app.config.settings import (
+    CONVERSION_API_URL,
+    METRICS_HEALTH_TIMEOUT,
+    OLLAMA_API_URL,
+)
+from app.services.scheduling import pending_key
+from app.services.tracing import record_span
+
+# Stages range from milliseconds (uploads, short translations) to the better
+# part of an hour (long audio)
+STAGE_BUCKETS = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+    600,
+    1800,
+    3600,
+)
+
+STAGE_SECONDS = Histogram(
+    "synthia_stage_duration_seconds",
+    "Time spent in each stage of a summarization",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+TRANSLATION_SECONDS = Histogram(
+    "synthia_translation_duration_seconds",
+    "Time spent translating, per direction",
+    ["direction"],
+    buckets=STAGE_BUCKETS,
+)
+OLLAMA_SECONDS = Histogram(
+    "synthia_ollama_generate_duration_seconds",
+    "Time spent in Ollama generate requests, per model",
+    ["model"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "synthia_stage_errors_total", "Stages that raised an error", ["stage"]
+)
+
+JOB_SECONDS = Histogram(
+    "synthia_job_duration_seconds",
+    "Time a worker spent on a job, per queue",
+    ["queue"],
+    buckets=STAGE_BUCKETS,
+)
+JOB_WAIT_SECONDS = Histogram(
+    "synthia_job_wait_seconds",
+    "Time between submitting a job and a worker starting it, per queue",
+    ["queue"],
+    buckets=STAGE_BUCKETS,
+)
+WORKER_JOBS = Counter(
+    "synthia_worker_jobs_total", "Jobs run by workers", ["queue", "status"]
+)
+WORKER_BUSY = Gauge(
+    "synthia_worker_busy",
+    "Whether the worker is running a job",
+    multiprocess_mode="livesum",
+)
+
+# Stages with their own histogram, and the label it is split by
+_STAGE_HISTOGRAMS = {
+    "translation": (TRANSLATION_SECONDS, "direction"),
+    "ollama_generate": (OLLAMA_SECONDS, "model"),
+}
+
+
+def _stage_histogram(stage: str, labels: dict):
+    if stage not in _STAGE_HISTOGRAMS:
+        return STAGE_SECONDS.labels(stage=stage)
+    histogram, label = _STAGE_HISTOGRAMS[stage]
+    return histogram.labels(**{label: labels[label]})
+
+
+@contextmanager
+def time_stage(stage: str, **labels):
+    """
+    Time a stage, counting an error if it raises. Inside a job the stage is
+    added to the job's trace, and observed by the worker from there (see
+    observe_timings); elsewhere it is observed right away.
+
+    translation takes a direction label and ollama_generate a model label.
+    Yields a dict the block can fill with input and output sizes for the trace.
+    """
+    sizes = {}
+    start = time.perf_counter()
+    try:
+        yield sizes
+    except Exception:
+        sizes["error"] = True
+        raise
+    finally:
+        end = time.perf_counter()
+        if not record_span(stage, start, end, **labels, **sizes):
+            _observe(stage, labels, end - start, sizes.get("error", False))
+
+
+def time_iter(iterable: Iterable, stage: str, **labels) -> Iterator:
+    """
+    Yield from iterable, timing only the time spent producing its items, not
+    the time the consumer spends between them. Traced and observed like
+    time_stage.
+    """
+    iterator = iter(iterable)
+    elapsed = 0.0
+    items = 0
+    error = False
+    first = last = time.perf_counter()
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            except Exception:
+                error = True
+                raise
+            finally:
+                last = time.perf_counter()
+                elapsed += last - start
+            items += 1
+            yield item
+    finally:
+        # The span covers first to last item, seconds only the producing time
+        fields = {"error": True} if error else {}
+        if not record_span(
+            stage, first, last, seconds=elapsed, items=items, **labels, **fields
+        ):
+            _observe(stage, labels, elapsed, error)
+
+
+def _observe(stage: str, labels: dict, seconds: float, error: bool):
+    _stage_histogram(stage, labels).observe(seconds)
+    if error:
+        STAGE_ERRORS.labels(stage=stage).inc()
+
+
+def observe_timings(timings: dict | None):
+    """
+    Observe the stages of a job's trace (job.meta["timings"]). The worker does
+    this after every job, so stages run in forked job processes are counted
+    by the long-lived worker process.
+    """
+    for span in (timings or {}).get("stages") or []:
+        _observe(span["stage"], span, span["seconds"], span.get("error", False))
+
+
+class QueueCollector:
+    """
+    Reads queue depths, running jobs, worker states and backend health at
+    scrape time, so every API process reports the same numbers.
+    """
+
+    def __init__(self, connection: Redis, queue_names: list[str]):
+        self.connection = connection
+        self.queues = [Queue(name, connection=connection) for name in queue_names]
+
+    def describe(self):
+        # Keeps registration from running a collection against Redis
+        return []
+
+    def collect(self):
+        up = GaugeMetricFamily(
+            "synthia_backend_up", "Whether a backend answered", labels=["backend"]
+        )
+        try:
+            yield from self._collect_queues()
+            up.add_metric(["redis"], 1)
+        except RedisError as e:
+            logger.warning(f"Could not read queue metrics from Redis: {e}")
+            up.add_metric(["redis"], 0)
+
+        up.add_metric(["ollama"], _http_up(OLLAMA_API_URL.rsplit("/api/", 1)[0]))
+        up.add_metric(["conversion_api"], _http_up(f"{CONVERSION_API_URL}/queue"))
+        yield up
+
+    def _collect_queues(self):
+        depth = GaugeMetricFamily(
+            "synthia_queue_depth", "Jobs waiting on each queue", labels=["queue"]
+        )
+        held = GaugeMetricFamily(
+            "synthia_queue_held_jobs",
+            "Jobs held back for shortest-job-first dispatch",
+            labels=["queue"],
+        )
+        started = GaugeMetricFamily(
+            "synthia_queue_started_jobs",
+            "Jobs being run by a worker",
+            labels=["queue"],
+        )
+        with self.connection.pipeline() as pipe:
+            for queue in self.queues:
+                pipe.llen(queue.key)
+                pipe.zcard(pending_key(queue.name))
+                pipe.zcard(StartedJobRegistry(queue=queue).key)
+            counts = pipe.execute()
+        for index, queue in enumerate(self.queues):
+            depth.add_metric([queue.name], counts[3 * index])
+            held.add_metric([queue.name], counts[3 * index + 1])
+            started.add_metric([queue.name], counts[3 * index + 2])
+
+        workers = GaugeMetricFamily(
+            "synthia_workers", "Registered workers by state", labels=["state"]
+        )
+        states: dict[str, int] = {}
+        for worker in Worker.all(connection=self.connection):
+            state = worker.get_state()
+            states[state] = states.get(state, 0) + 1
+        for state, count in states.items():
+            workers.add_metric([state], count)
+
+        yield from (depth, held, started, workers)
+
+
+def _http_up(url: str) -> int:
+    # A single attempt, the shared session's retries would stall the scrape
+    try:
+        requests.get(url, timeout=METRICS_HEALTH_TIMEOUT).raise_for_status()
+        return 1
+    except Exception:
+        return 0
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    The registry to expose. With PROMETHEUS_MULTIPROC_DIR set, samples written
+    by every process sharing that directory (such as several API processes)
+    are aggregated.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def start_metrics_server(port: int):
+    """Expose this process's metrics on port, for workers"""
+    start_http_server(port, registry=metrics_registry())
+    logger.info(f"Serving metrics on port {port}")
@@ -0,0 +1,31 @@
+# app/services/preload.py
+import gc
+import time
+from app.config.logging_config import logger
+from app.config.settings import WORKER_PRELOAD_TRANSLATION
+
+
+def preload_worker_models():
+    """
+    Load the PDF, Whisper and translation stacks into the current process.
+
+    Called once by the worker before it starts taking jobs, so every job (or
+    every forked job process) finds the models already in memory.
+    """
+    start_time = time.monotonic()
+
+    # Importing the job functions pulls in PyMuPDF, Whisper and transformers
+    import app.services.jobs  # noqa: F401
+    from app.services.translation import load_translation_models
+    from app.services.whisper_models import warmup_whisper_models
+
+    warmup_whisper_models()
+    if WORKER_PRELOAD_TRANSLATION:
+        load_translation_models()
+
+    # Move everything loaded so far out of the garbage collector's reach, so
+    # forked children don't copy shared pages just by running a collection
+    gc.collect()
+    gc.freeze()
+
+    logger.info(f"Preloaded worker models in {time.monotonic() - start_time:.1f}s")
@@ -0,0 +1,85 @@
+# app/services/queues.py
+import random
+from redis import Redis
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+from rq.results import Result
+from app.core.enums import FileType
+
+
+def create_queues(connection: Redis) -> dict[FileType, Queue]:
+    """One RQ queue per file type, named after it"""
+    return {
+        file_type: Queue(file_type.value, connection=connection)
+        for file_type in FileType
+    }
+
+
+def fetch_job(connection: Redis, job_id: str) -> Job | None:
+    """Fetch a job whatever queue it was enqueued on"""
+    try:
+        return Job.fetch(job_id, connection=connection)
+    except NoSuchJobError:
+        return None
+
+
+def fetch_jobs_with_results(
+    connection: Redis, job_ids: list[str], with_results: bool = True
+) -> list[tuple]:
+    """
+    Fetch jobs, and the latest results of those that have ended, in two
+    pipelined round trips instead of one or two per job.
+
+    Returns (job, result) pairs in job_ids order; job is None for unknown ids
+    and result is None for jobs that haven't ended (or with_results=False).
+    """
+    jobs = Job.fetch_many(job_ids, connection=connection)
+    if not with_results:
+        return [(job, None) for job in jobs]
+
+    ended = [
+        job
+        for job in jobs
+        if job is not None
+        and job.get_status(refresh=False) in (JobStatus.FINISHED, JobStatus.FAILED)
+    ]
+    with connection.pipeline() as pipe:
+        for job in ended:
+            pipe.xrevrange(Result.get_key(job.id), "+", "-", count=1)
+        responses = pipe.execute()
+
+    results = {}
+    for job, response in zip(ended, responses):
+        if response:
+            result_id, payload = response[0]
+            results[job.id] = Result.restore(
+                job.id,
+                result_id.decode(),
+                payload,
+                connection=connection,
+                serializer=job.serializer,
+            )
+    return [(job, results.get(job.id) if job else None) for job in jobs]
+
+
+def parse_queue_weights(spec: str) -> dict[str, float]:
+    """Parse weights written as 'text=4,pdf=1'"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def weighted_order(queues: list, weights: dict[str, float], rng=random) -> list:
+    """
+    Order queues by weighted random sampling without replacement, so a queue
+    with weight 4 is checked first four times as often as one with weight 1.
+    Queues without a weight count as 1.
+    """
+    return sorted(
+        queues,
+        key=lambda queue: rng.random() ** (1.0 / weights.get(queue.name, 1.0)),
+        reverse=True,
+    )
@@ -0,0 +1,39 @@
+# app/services/redis_client.py
+import redis
+import redis.asyncio
+from app.config.settings import (
+    REDIS_ASYNC_MAX_CONNECTIONS,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_URL,
+)
+
+
+def create_redis_connection(url: str = REDIS_URL) -> redis.Redis:
+    """
+    Redis client over a bounded pool. When every connection is busy, callers
+    wait up to REDIS_POOL_TIMEOUT for one instead of opening more.
+    """
+    pool = redis.BlockingConnectionPool.from_url(
+        url,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    # from_pool hands the pool over, so closing the client disconnects it
+    return redis.Redis.from_pool(pool)
+
+
+def create_async_redis_connection(url: str = REDIS_URL) -> redis.asyncio.Redis:
+    """Async Redis client over a bounded pool, for pub/sub and blocking reads"""
+    pool = redis.asyncio.BlockingConnectionPool.from_url(
+        url,
+        max_connections=REDIS_ASYNC_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    return redis.asyncio.Redis.from_pool(pool)
@@ -0,0 +1,177 @@
+# app/services/scheduling.py
+import time
+from typing import Callable, NamedTuple
+from redis import Redis
+from rq import Queue
+from rq.job import Job, JobStatus
+from app.config.logging_config import logger
+from app.config.settings import (
+    JOB_QUEUES,
+    SJF_AGING_RATE,
+    SJF_ENABLED,
+    SJF_QUEUE_WATERMARK,
+)
+from app.core.enums import FileType
+from app.services.batches import record_batch
+
+SJF_PREFIX = "synthia:sjf"
+COST_STATS_PREFIX = "synthia:cost_stats"
+
+
+def pending_key(queue_name: str) -> str:
+    """Sorted set of jobs held back from an RQ queue, cheapest first"""
+    return f"{SJF_PREFIX}:{queue_name}:pending"
+
+
+def sjf_score(cost_seconds: float, submitted_at: float) -> float:
+    """
+    Dispatch order of a job.
+
+    Its priority at time t is cost - SJF_AGING_RATE * (t - submitted_at); the
+    time-dependent term is the same for every job, so the order is fixed at
+    submission and can live in a sorted set.
+    """
+    return cost_seconds + SJF_AGING_RATE * submitted_at
+
+
+class JobSubmission(NamedTuple):
+    file_type: FileType
+    cost: dict
+    # A dotted path keeps the job's imports out of the submitting process
+    func: Callable | str
+    args: tuple
+    meta: dict | None = None
+    job_id: str | None = None
+
+
+def submit_jobs(
+    queues: dict[FileType, Queue],
+    submissions: list[JobSubmission],
+    batch: tuple[str, list[str]] | None = None,
+) -> list[Job]:
+    """
+    Enqueue jobs on their file type's queue in a single Redis pipeline, each
+    with its cost estimate in job.meta["cost"].
+
+    With shortest-job-first enabled the jobs are held in a sorted set and only
+    moved onto the RQ queues by dispatch_jobs. A (batch_id, job_ids) batch is
+    recorded in the same pipeline.
+    """
+    connection = next(iter(queues.values())).connection
+    submitted_at = time.time()
+    jobs = []
+    with connection.pipeline() as pipe:
+        for submission in submissions:
+            queue = queues[submission.file_type]
+            config = JOB_QUEUES[submission.file_type.value]
+            meta = {**(submission.meta or {}), "cost": submission.cost}
+            if not SJF_ENABLED:
+                job_data = Queue.prepare_data(
+                    submission.func,
+                    args=submission.args,
+                    timeout=config["job_timeout"],
+                    result_ttl=config["result_ttl"],
+                    job_id=submission.job_id,
+                    meta=meta,
+                )
+                jobs.extend(queue.enqueue_many([job_data], pipeline=pipe))
+                continue
+
+            job = queue.create_job(
+                submission.func,
+                args=submission.args,
+                timeout=config["job_timeout"],
+                result_ttl=config["result_ttl"],
+                job_id=submission.job_id,
+                meta=meta,
+                status=JobStatus.DEFERRED,
+            )
+            job.save(pipeline=pipe)
+            pipe.zadd(
+                pending_key(queue.name),
+                {job.id: sjf_score(submission.cost["seconds"], submitted_at)},
+            )
+            jobs.append(job)
+        if batch is not None:
+            record_batch(pipe, *batch)
+        pipe.execute()
+
+    if SJF_ENABLED:
+        for file_type in {submission.file_type for submission in submissions}:
+            dispatch_jobs(queues[file_type])
+    return jobs
+
+
+def submit_job(
+    queues: dict[FileType, Queue],
+    file_type: FileType,
+    cost: dict,
+    func,
+    *args,
+    meta: dict | None = None,
+) -> Job:
+    """Enqueue a single job, see submit_jobs"""
+    return submit_jobs(queues, [JobSubmission(file_type, cost, func, args, meta)])[0]
+
+
+def dispatch_jobs(queue: Queue, watermark: int | None = None) -> int:
+    """
+    Move the cheapest held jobs onto the RQ queue until it holds watermark
+    jobs. Called on submission and by workers whenever they take a job.
+    """
+    watermark = SJF_QUEUE_WATERMARK if watermark is None else watermark
+    connection = queue.connection
+    moved = 0
+    while queue.count < watermark:
+        popped = connection.zpopmin(pending_key(queue.name))
+        if not popped:
+            break
+        job_id = popped[0][0]
+        job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+        try:
+            job = Job.fetch(job_id, connection=connection)
+        except Exception as e:
+            logger.warning(f"Dropping held job {job_id}: {e}")
+            continue
+        # enqueue_job leaves deferred jobs alone, so release it first
+        job.set_status(JobStatus.QUEUED)
+        queue.enqueue_job(job)
+        moved += 1
+    return moved
+
+
+def pending_count(connection: Redis, queue_name: str) -> int:
+    return connection.zcard(pending_key(queue_name))
+
+
+def record_job_cost(
+    connection: Redis, file_type: FileType, estimated: float, actual: float
+):
+    """Accumulate estimated and actual seconds per file type"""
+    key = f"{COST_STATS_PREFIX}:{file_type.value}"
+    with connection.pipeline() as pipe:
+        pipe.hincrby(key, "jobs", 1)
+        pipe.hincrbyfloat(key, "estimated_seconds", estimated)
+        pipe.hincrbyfloat(key, "actual_seconds", actual)
+        pipe.hincrbyfloat(key, "ratio_sum", actual / estimated if estimated else 0)
+        pipe.execute()
+
+
+def cost_stats(connection: Redis) -> dict:
+    """Estimated vs actual runtime per file type, plus held job counts"""
+    stats = {}
+    for file_type in FileType:
+        data = connection.hgetall(f"{COST_STATS_PREFIX}:{file_type.value}")
+        jobs = int(data.get(b"jobs", 0))
+        estimated = float(data.get(b"estimated_seconds", 0))
+        actual = float(data.get(b"actual_seconds", 0))
+        stats[file_type.value] = {
+            "jobs": jobs,
+            "estimated_seconds": estimated,
+            "actual_seconds": actual,
+            "mean_actual_to_estimated": (
+                float(data.get(b"ratio_sum", 0)) / jobs if jobs else None
+            ),
+            "held": pending_count(connection, file_type.value),
+        }
+    return stats
@@ -1,124 +1,328 @@
 # app/services/summarization/audio.py
+import io
+import multiprocessing
 import os
 import shutil
-import requests
+import subprocess
 import time
+import wave
+import numpy as np
+import torch
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Callable
+from rq import get_current_job
 from app.config.logging_config import logger
-from app.config.settings import TEMP_DIR
+from app.config.settings import (
+    AUDIO_DECODE_MODE,
+    AUDIO_DECODE_TIMEOUT,
+    AUDIO_LONG_THRESHOLD_SECONDS,
+    AUDIO_MIN_SILENCE_SECONDS,
+    AUDIO_SAMPLE_RATE,
+    AUDIO_SEGMENT_MAX_SECONDS,
+    AUDIO_SEGMENT_MIN_SECONDS,
+    AUDIO_SILENCE_DB,
+    AUDIO_TRANSCRIBE_WORKERS,
+    FFMPEG_BINARY,
+)
+from app.services.metrics import time_stage
 from app.services.summarization.text import generate_text_summary
-import whisper
-from app.config.settings import CONVERSION_API_URL
+from app.services.whisper_models import get_whisper_model, resolve_whisper_model
+from app.utils.audio_segmentation import split_on_silence
+from app.config.settings import CONVERSION_API_URL, CONVERSION_API_READ_TIMEOUT
+from app.services.http_client import get_session, timeout
 
 
-def transcribe_audio(audio_path: str) -> str:
-    """Transcribe audio using Whisper"""
+@lru_cache(maxsize=1)
+def ffmpeg_available() -> bool:
+    """Whether ffmpeg can be run inside this worker"""
+    return shutil.which(FFMPEG_BINARY) is not None
+
+
+def decode_audio(audio_path: str, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+    """Decode any audio file to mono float32 PCM by piping ffmpeg's output"""
+    cmd = [
+        FFMPEG_BINARY,
+        "-nostdin",
+        "-threads",
+        "0",
+        "-i",
+        audio_path,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sample_rate),
+        "-",
+    ]
+    with time_stage("ffmpeg_conversion") as sizes:
+        process = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+            timeout=AUDIO_DECODE_TIMEOUT,
+        )
+        if process.returncode != 0:
+            raise Exception(
+                f"ffmpeg error (code {process.returncode}): "
+                f"{process.stderr.decode(errors='ignore')}"
+            )
+        audio = pcm16_to_float32(process.stdout)
+        sizes["output_samples"] = len(audio)
+    return audio
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM to float32 samples in [-1, 1)"""
+    audio = np.frombuffer(data, dtype="<i2").astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
+def read_pcm_wav(source) -> np.ndarray | None:
+    """
+    Read a WAV file (path or file object) that is already 16-bit mono at the
+    Whisper sample rate, or return None if it needs resampling first, or isn't
+    plain PCM the wave module can read (float, WAVE_FORMAT_EXTENSIBLE, cut short).
+    """
     try:
-        # Create a dedicated temp directory if it doesn't exist
-        os.makedirs(TEMP_DIR, exist_ok=True)
-
-        # Get unique filename for this transcription
-        file_basename = os.path.basename(audio_path)
-        file_name, file_ext = os.path.splitext(file_basename)
-
-        # Process the audio file - either convert or use as-is
-        if file_ext.lower() != ".wav":
-            # File needs conversion - send to conversion API
-            logger.info(f"Sending file to conversion API: {audio_path}")
-
-            # Send file to conversion API
-            with open(audio_path, "rb") as file:
-                files = {
-                    "file": (file_basename, file, "audio/ogg")
-                }  # Adjust content type as needed
-                response = requests.post(f"{CONVERSION_API_URL}/convert/", files=files)
-
-            if response.status_code != 200:
-                logger.error(f"Conversion API error: {response.text}")
-                raise Exception(
-                    f"Conversion API returned error: {response.status_code}"
+        with wave.open(source, "rb") as wav:
+            if (
+                wav.getframerate() != AUDIO_SAMPLE_RATE
+                or wav.getnchannels() != 1
+                or wav.getsampwidth() != 2
+            ):
+                return None
+            return pcm16_to_float32(wav.readframes(wav.getnframes()))
+    except (wave.Error, EOFError):
+        return None
+
+
+def convert_with_api(audio_path: str) -> np.ndarray:
+    """Convert audio through the conversion API and return the decoded samples"""
+    file_basename = os.path.basename(audio_path)
+    session = get_session()
+    conversion_timeout = timeout(CONVERSION_API_READ_TIMEOUT)
+
+    logger.info(f"Sending file to conversion API: {audio_path}")
+
+    # Send file to conversion API
+    with open(audio_path, "rb") as file:
+        files = {
+            "file": (file_basename, file, "audio/ogg")
+        }  # Adjust content type as needed
+        response = session.post(
+            f"{CONVERSION_API_URL}/convert/",
+            files=files,
+            timeout=conversion_timeout,
+        )
+
+    if response.status_code != 200:
+        logger.error(f"Conversion API error: {response.text}")
+        raise Exception(f"Conversion API returned error: {response.status_code}")
+
+    # Get job details
+    job_data = response.json()
+    job_id = job_data["job_id"]
+    logger.info(f"Conversion job created with ID: {job_id}")
+
+    # Poll for completion
+    max_wait_time = 300  # 5 minutes
+    start_time = time.time()
+    while True:
+        # Check if we've exceeded the wait time
+        if time.time() - start_time > max_wait_time:
+            raise Exception(f"Conversion timed out after {max_wait_time} seconds")
+
+        # Check job status
+        status_response = session.get(
+            f"{CONVERSION_API_URL}/status/{job_id}",
+            timeout=conversion_timeout,
+        )
+        if status_response.status_code != 200:
+            logger.error(f"Error checking conversion status: {status_response.text}")
+            raise Exception("Failed to check conversion status")
+
+        status_data = status_response.json()
+
+        if status_data["status"] == "completed":
+            # Download the converted file
+            logger.info(f"Conversion completed, downloading WAV file")
+            download_response = session.get(
+                f"{CONVERSION_API_URL}/download/{job_id}",
+                timeout=conversion_timeout,
+            )
+
+            if download_response.status_code != 200:
+                logger.error(
+                    f"Error downloading converted file: {download_response.text}"
                 )
+                raise Exception("Failed to download converted file")
 
-            # Get job details
-            job_data = response.json()
-            job_id = job_data["job_id"]
-            logger.info(f"Conversion job created with ID: {job_id}")
-
-            # Poll for completion
-            max_wait_time = 300  # 5 minutes
-            start_time = time.time()
-            while True:
-                # Check if we've exceeded the wait time
-                if time.time() - start_time > max_wait_time:
-                    raise Exception(
-                        f"Conversion timed out after {max_wait_time} seconds"
-                    )
-
-                # Check job status
-                status_response = requests.get(f"{CONVERSION_API_URL}/status/{job_id}")
-                if status_response.status_code != 200:
-                    logger.error(
-                        f"Error checking conversion status: {status_response.text}"
-                    )
-                    raise Exception("Failed to check conversion status")
-
-                status_data = status_response.json()
-
-                if status_data["status"] == "completed":
-                    # Download the converted file
-                    logger.info(f"Conversion completed, downloading WAV file")
-                    download_response = requests.get(
-                        f"{CONVERSION_API_URL}/download/{job_id}"
-                    )
-
-                    if download_response.status_code != 200:
-                        logger.error(
-                            f"Error downloading converted file: {download_response.text}"
-                        )
-                        raise Exception("Failed to download converted file")
-
-                    # Save the downloaded file
-                    unique_id = f"{file_name}_{int(time.time())}"
-                    processed_audio_path = os.path.join(TEMP_DIR, f"{unique_id}.wav")
-                    with open(processed_audio_path, "wb") as f:
-                        f.write(download_response.content)
-
-                    logger.info(f"Downloaded converted file to {processed_audio_path}")
-                    break
-
-                elif status_data["status"] == "failed":
-                    logger.error(
-                        f"Conversion failed: {status_data.get('error', 'Unknown error')}"
-                    )
-                    raise Exception(
-                        f"Audio conversion failed: {status_data.get('error', 'Unknown error')}"
-                    )
-
-                # Wait before checking again
-                time.sleep(2)
-        else:
-            # If it's already WAV, copy to temp dir
-            unique_id = f"{file_name}_{int(time.time())}"
-            processed_audio_path = os.path.join(TEMP_DIR, f"{unique_id}.wav")
-            shutil.copy2(audio_path, processed_audio_path)
-            logger.info(f"File is already WAV, copied to {processed_audio_path}")
-
-        # Process with Whisper
-        logger.info("Loading Whisper model")
-        model = whisper.load_model("small")
-
-        logger.info(f"Transcribing audio file: {processed_audio_path}")
-        result = model.transcribe(processed_audio_path)
+            # The service always produces 16 kHz mono PCM, read it from memory
+            audio = read_pcm_wav(io.BytesIO(download_response.content))
+            if audio is None:
+                raise Exception("Conversion API returned an unexpected WAV format")
+            logger.info(f"Downloaded converted audio: {len(audio)} samples")
+            return audio
+
+        elif status_data["status"] == "failed":
+            logger.error(
+                f"Conversion failed: {status_data.get('error', 'Unknown error')}"
+            )
+            raise Exception(
+                f"Audio conversion failed: {status_data.get('error', 'Unknown error')}"
+            )
+
+        # Wait before checking again
+        time.sleep(2)
 
-        # The transcript is in the 'text' field of the result
-        transcript = result["text"]
-        logger.info(f"Transcription successful: {len(transcript)} characters")
 
-        # Clean up temporary files
+def load_audio(audio_path: str) -> np.ndarray | str:
+    """
+    Load audio for Whisper without intermediate files.
+
+    Decodes with a local ffmpeg when available (AUDIO_DECODE_MODE 'auto' or
+    'local'), otherwise falls back to the conversion API. A WAV that Whisper
+    can't take as-is and that can't be decoded here is returned as a path.
+    """
+    use_local = AUDIO_DECODE_MODE == "local" or (
+        AUDIO_DECODE_MODE == "auto" and ffmpeg_available()
+    )
+    if use_local:
         try:
-            os.remove(processed_audio_path)
-            logger.info(f"Removed temporary file: {processed_audio_path}")
+            logger.info(f"Decoding audio with local ffmpeg: {audio_path}")
+            return decode_audio(audio_path)
         except Exception as e:
-            logger.warning(f"Could not remove temporary file: {e}")
+            if AUDIO_DECODE_MODE == "local":
+                raise
+            logger.warning(f"Local decoding failed, using conversion API: {e}")
+
+    if os.path.splitext(audio_path)[1].lower() == ".wav":
+        audio = read_pcm_wav(audio_path)
+        return audio if audio is not None else audio_path
+
+    with time_stage("conversion_api") as sizes:
+        audio = convert_with_api(audio_path)
+        sizes["output_samples"] = len(audio)
+        return audio
+
+
+def _init_transcription_process(model_size: str, torch_threads: int):
+    """Pool initializer: share the cores between processes and load the model"""
+    torch.set_num_threads(torch_threads)
+    get_whisper_model(model_size)
+
+
+def _transcribe_segment(audio: np.ndarray, offset: float, model_size: str) -> dict:
+    """Transcribe one segment, shifting its timestamps by offset seconds"""
+    result = get_whisper_model(model_size).transcribe(audio)
+    return {
+        "text": result["text"].strip(),
+        "language": result.get("language"),
+        "segments": [
+            {
+                "start": segment["start"] + offset,
+                "end": segment["end"] + offset,
+                "text": segment["text"],
+            }
+            for segment in result["segments"]
+        ],
+    }
+
+
+def _record_progress(done: int, total: int):
+    logger.info(f"Transcribed {done}/{total} audio segments")
+    job = get_current_job()
+    if job is not None:
+        job.meta["transcription"] = {"segments": total, "done": done}
+        job.save_meta()
+
+
+def transcribe_long_audio(audio: np.ndarray, model_size: str | None = None) -> dict:
+    """
+    Transcribe long audio by splitting it at silences and transcribing the
+    segments in parallel processes.
+
+    Returns a Whisper-style result whose text and timestamped segments cover
+    the whole recording, in order.
+    """
+    model_size = resolve_whisper_model(model_size)
+    bounds = split_on_silence(
+        audio,
+        AUDIO_SAMPLE_RATE,
+        max_seconds=AUDIO_SEGMENT_MAX_SECONDS,
+        min_seconds=AUDIO_SEGMENT_MIN_SECONDS,
+        min_silence_seconds=AUDIO_MIN_SILENCE_SECONDS,
+        silence_db=AUDIO_SILENCE_DB,
+    )
+    total = len(bounds)
+    workers = min(AUDIO_TRANSCRIBE_WORKERS, total)
+    logger.info(f"Split audio into {total} segments, transcribing with {workers}")
+    _record_progress(0, total)
+
+    results = [None] * total
+    if workers < 2:
+        for index, (start, stop) in enumerate(bounds):
+            results[index] = _transcribe_segment(
+                audio[start:stop], start / AUDIO_SAMPLE_RATE, model_size
+            )
+            _record_progress(index + 1, total)
+    else:
+        # Spawned, not forked: torch's thread pools don't survive a fork
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_transcription_process,
+            initargs=(model_size, max(1, (os.cpu_count() or 1) // workers)),
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _transcribe_segment,
+                    audio[start:stop],
+                    start / AUDIO_SAMPLE_RATE,
+                    model_size,
+                ): index
+                for index, (start, stop) in enumerate(bounds)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                _record_progress(done, total)
+
+    languages = [result["language"] for result in results if result["language"]]
+    return {
+        "text": " ".join(result["text"] for result in results if result["text"]),
+        "segments": [segment for result in results for segment in result["segments"]],
+        "language": max(set(languages), key=languages.count) if languages else None,
+    }
+
+
+def transcribe_audio(audio_path: str, model_size: str | None = None) -> str:
+    """Transcribe audio using Whisper"""
+    try:
+        audio = load_audio(audio_path)
+
+        logger.info(f"Transcribing audio file: {audio_path}")
+        with time_stage("whisper") as sizes:
+            if not isinstance(audio, str):
+                sizes["audio_seconds"] = round(len(audio) / AUDIO_SAMPLE_RATE, 2)
+            if (
+                not isinstance(audio, str)
+                and len(audio) > AUDIO_LONG_THRESHOLD_SECONDS * AUDIO_SAMPLE_RATE
+            ):
+                result = transcribe_long_audio(audio, model_size)
+            else:
+                # Process with Whisper, reusing the model if this process already loaded it
+                result = get_whisper_model(model_size).transcribe(audio)
+            sizes["output_chars"] = len(result["text"])
+
+        # The transcript is in the 'text' field of the result
+        transcript = result["text"]
+        logger.info(f"Transcription successful: {len(transcript)} characters")
 
         return transcript
     except Exception as e:
@@ -126,10 +330,15 @@ def transcribe_audio(audio_path: str) -> str:
         raise
 
 
-def summarize_audio(audio_path: str, target_language: str = "en") -> str:
+def summarize_audio(
+    audio_path: str,
+    target_language: str = "en",
+    model_size: str | None = None,
+    on_token: Callable[[str], None] | None = None,
+) -> str:
     """Transcribe audio and generate a summary"""
-    transcript = transcribe_audio(audio_path)
+    transcript = transcribe_audio(audio_path, model_size)
     logger.info(f"#############################")
     logger.info(f"AUDIO TRANSCRIPT: {transcript}")
     logger.info(f"#############################")
-    return generate_text_summary(transcript, target_language)
+    return generate_text_summary(transcript, target_language, on_token)
@@ -1,13 +1,24 @@
 import base64
+from typing import Callable
 from app.config.logging_config import logger
 from app.config.settings import LLAVA_MODEL
 from app.services.ai_client import OllamaClient
-from app.services.translation import translate_en_to_pt
+from app.services.translation import supports_pair, translate
 
 
-def generate_image_summary(image_path: str, target_language: str = "en") -> str:
+def generate_image_summary(
+    image_path: str,
+    target_language: str = "en",
+    on_token: Callable[[str], None] | None = None,
+) -> str:
     """Generate a summary of an image using LLaVA"""
     try:
+        # LLaVA answers in English, only the English to target model is needed
+        language = target_language.lower()
+        needs_translation = language != "en" and supports_pair("en", language)
+        if language != "en" and not needs_translation:
+            logger.warning(f"No translation model from English to {language}")
+
         # Read the image file as base64
         with open(image_path, "rb") as img_file:
             image_base64 = base64.b64encode(img_file.read()).decode("utf-8")
@@ -16,15 +27,17 @@ def generate_image_summary(image_path: str, target_language: str = "en") -> str:
         prompt = f"Please describe this image in detail and summarize its key elements."
 
         summary = OllamaClient.generate(
-            model=LLAVA_MODEL, prompt=prompt, images=[image_base64]
+            model=LLAVA_MODEL,
+            prompt=prompt,
+            images=[image_base64],
+            on_token=None if needs_translation else on_token,
         )
 
         logger.info(f"Image summary (LLavA): {summary}")
 
-        needs_translation = target_language.lower() != "en"
         if needs_translation:
-            logger.info("Translating summary back to Portuguese")
-            summary = translate_en_to_pt(summary)
+            logger.info(f"Translating summary to {language}")
+            summary = translate(summary, "en", language)
             logger.info(f"Summary translation complete: {len(summary)} characters")
             logger.info(f"#####################################")
             logger.info(f"{summary}")
@@ -0,0 +1,183 @@
+# app/services/summarization/long_text.py
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+from rq import get_current_job
+from app.config.logging_config import logger
+from app.config.settings import (
+    SUMMARY_CHARS_PER_TOKEN,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_MAX_PARALLEL_CHUNKS,
+    TEXT_MODEL,
+)
+from app.services.ai_client import OllamaClient
+from app.utils.text_splitting import PARAGRAPH_BREAK, SENTENCE_BREAK
+
+CHUNK_PROMPT = (
+    "Please summarize the following part of a longer text concisely without "
+    "emitting opinions:\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "The following are summaries of consecutive parts of one text. Combine them "
+    "into a single concise summary without emitting opinions:\n\n{text}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used to size prompts"""
+    return math.ceil(len(text) / SUMMARY_CHARS_PER_TOKEN)
+
+
+def _cut_position(text: str, max_chars: int) -> int:
+    """Where to end a chunk of at most max_chars, preferring natural breaks"""
+    window = text[:max_chars]
+    floor = max_chars // 2
+    for pattern in (PARAGRAPH_BREAK, SENTENCE_BREAK):
+        ends = [m.end() for m in pattern.finditer(window) if m.end() > floor]
+        if ends:
+            return ends[-1]
+    space = window.rfind(" ", floor)
+    return space + 1 if space != -1 else max_chars
+
+
+def iter_text_chunks(pieces: Iterable[str], max_tokens: int) -> Iterator[str]:
+    """
+    Regroup a stream of text pieces (pages, paragraphs...) into chunks of about
+    max_tokens, cut on paragraph or sentence boundaries where possible.
+
+    Chunks are yielded as soon as enough text has arrived, so a producer such as
+    a PDF page generator and the summarization of the first chunks can overlap.
+    """
+    max_chars = max_tokens * SUMMARY_CHARS_PER_TOKEN
+    pending = ""
+    for piece in pieces:
+        pending += piece
+        while len(pending) > max_chars:
+            cut = _cut_position(pending, max_chars)
+            chunk, pending = pending[:cut].strip(), pending[cut:]
+            if chunk:
+                yield chunk
+    if pending.strip():
+        yield pending.strip()
+
+
+def collect_if_short(pieces: Iterable[str], max_tokens: int) -> str | Iterator[str]:
+    """
+    Read pieces until they exceed max_tokens.
+
+    Returns the joined text if everything fit, otherwise an iterator over all
+    the pieces (including those already read) so map-reduce can start on them
+    before the producer is done.
+    """
+    pieces = iter(pieces)
+    max_chars = max_tokens * SUMMARY_CHARS_PER_TOKEN
+    head, length = [], 0
+    for piece in pieces:
+        head.append(piece)
+        length += len(piece)
+        if length > max_chars:
+            return itertools.chain(head, pieces)
+    return "".join(head)
+
+
+def _group_partials(partials: list[str], max_tokens: int) -> list[list[str]]:
+    """Group partial summaries into prompts that fit, at least two per group"""
+    groups, current, current_tokens = [], [], 0
+    for partial in partials:
+        tokens = estimate_tokens(partial)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(partial)
+        current_tokens += tokens
+    if len(current) == 1 and groups:
+        groups[-1].extend(current)
+    elif current:
+        groups.append(current)
+    return groups
+
+
+def _summarize(
+    template: str, text: str, on_token: Callable[[str], None] | None = None
+) -> str:
+    prompt = template.format(text=text)
+    return OllamaClient.generate(model=TEXT_MODEL, prompt=prompt, on_token=on_token)
+
+
+def _record_stats(stats: dict):
+    job = get_current_job()
+    if job is not None:
+        job.meta["map_reduce"] = stats
+        job.save_meta()
+
+
+def map_reduce_summary(
+    text: str | Iterable[str],
+    on_token: Callable[[str], None] | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Summarize a text too long for a single prompt.
+
+    The text is split into chunks that are summarized concurrently (map), then
+    the partial summaries are combined level by level until one remains
+    (reduce). Only the final reduce call is streamed through on_token.
+    """
+    max_tokens = max_tokens or SUMMARY_CHUNK_TOKENS
+    pieces = [text] if isinstance(text, str) else text
+    stats = {"chunks": 0, "levels": []}
+
+    with ThreadPoolExecutor(max_workers=SUMMARY_MAX_PARALLEL_CHUNKS) as executor:
+        level_start = time.monotonic()
+        futures = [
+            executor.submit(_summarize, CHUNK_PROMPT, chunk)
+            for chunk in iter_text_chunks(pieces, max_tokens)
+        ]
+        partials = [future.result() for future in futures]
+        stats["chunks"] = len(partials)
+        stats["levels"].append(
+            {
+                "inputs": len(partials),
+                "calls": len(partials),
+                "seconds": time.monotonic() - level_start,
+            }
+        )
+        logger.info(
+            f"Summarized {len(partials)} chunks in "
+            f"{stats['levels'][-1]['seconds']:.1f}s"
+        )
+
+        while len(partials) > 1:
+            level_start = time.monotonic()
+            inputs = len(partials)
+            groups = _group_partials(partials, max_tokens)
+            if len(groups) == 1:
+                partials = [_summarize(REDUCE_PROMPT, "\n\n".join(groups[0]), on_token)]
+            else:
+                partials = list(
+                    executor.map(
+                        lambda group: _summarize(REDUCE_PROMPT, "\n\n".join(group)),
+                        groups,
+                    )
+                )
+            stats["levels"].append(
+                {
+                    "inputs": inputs,
+                    "calls": len(groups),
+                    "seconds": time.monotonic() - level_start,
+                }
+            )
+            logger.info(
+                f"Reduced to {len(partials)} summaries in "
+                f"{stats['levels'][-1]['seconds']:.1f}s"
+            )
+
+    _record_stats(stats)
+    if not partials:
+        return ""
+    if stats["chunks"] == 1 and on_token is not None:
+        # Nothing was reduced, so nothing was streamed yet
+        on_token(partials[0])
+    return partials[0]
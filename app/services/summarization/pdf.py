@@ -1,22 +1,119 @@
 import fitz  # PyMuPDF
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator
 from app.config.logging_config import logger
+from app.config.settings import (
+    PDF_FAST_TEXT,
+    PDF_MAX_CHARS,
+    PDF_MAX_WORKERS,
+    PDF_PAGES_PER_TASK,
+    PDF_PARALLEL_MIN_PAGES,
+)
+from app.services.metrics import time_iter
 from app.services.summarization.text import generate_text_summary
+from app.utils.pdf_pages import extract_pages
 
+# The default text flags without TEXT_PRESERVE_LIGATURES, TEXT_PRESERVE_WHITESPACE
+# and TEXT_USE_CID_FOR_UNKNOWN_UNICODE: ligatures come out expanded ("fi" as two
+# letters) and odd whitespace as plain spaces, which suits summarization, where
+# the layout of the text doesn't matter
+FAST_TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP
+
+
+def _page_bounds(page_count: int, page_range: tuple[int, int] | None):
+    if page_range is None:
+        return 0, page_count
+    start, stop = page_range
+    return max(start, 0), min(stop, page_count)
+
+
+def _iter_page_texts(pdf_path: str, start: int, stop: int, flags: int):
+    if stop - start < PDF_PARALLEL_MIN_PAGES or PDF_MAX_WORKERS < 2:
+        with fitz.open(pdf_path) as doc:
+            for number in range(start, stop):
+                yield doc[number].get_text("text", flags=flags)
+        return
+
+    logger.info(f"Extracting {stop - start} PDF pages with {PDF_MAX_WORKERS} processes")
+    # Spawned, not forked: the worker has torch and the models loaded
+    with ProcessPoolExecutor(
+        max_workers=PDF_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(
+                extract_pages,
+                pdf_path,
+                batch_start,
+                min(batch_start + PDF_PAGES_PER_TASK, stop),
+                flags,
+            )
+            for batch_start in range(start, stop, PDF_PAGES_PER_TASK)
+        ]
+        try:
+            # Hand pages on in order while later batches are still being extracted
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    page_range: tuple[int, int] | None = None,
+    max_chars: int | None = None,
+    fast: bool | None = None,
+) -> Iterator[str]:
+    """
+    Yield the text of a PDF page by page.
+
+    Args:
+        pdf_path: Path of the PDF file
+        page_range: Optional zero-based [start, stop) range of pages to read
+        max_chars: Stop once this many characters have been produced
+        fast: Use PyMuPDF's cheaper text flags (defaults to PDF_FAST_TEXT)
+    """
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    fast = PDF_FAST_TEXT if fast is None else fast
+    flags = FAST_TEXT_FLAGS if fast else fitz.TEXTFLAGS_TEXT
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from a PDF file using PyMuPDF"""
     try:
-        text = ""
         with fitz.open(pdf_path) as doc:
-            for page in doc:
-                text += page.get_text()
-        return text
+            page_count = doc.page_count
+        start, stop = _page_bounds(page_count, page_range)
+
+        produced = 0
+        pages = _iter_page_texts(pdf_path, start, stop, flags)
+        for text in time_iter(pages, "text_extraction"):
+            if max_chars and produced + len(text) >= max_chars:
+                yield text[: max_chars - produced]
+                logger.info(
+                    f"Stopped PDF extraction at the {max_chars} character budget"
+                )
+                return
+            produced += len(text)
+            yield text
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
         raise
 
 
-def summarize_pdf(pdf_path: str, target_language: str = "en") -> str:
+def extract_text_from_pdf(
+    pdf_path: str,
+    page_range: tuple[int, int] | None = None,
+    max_chars: int | None = None,
+) -> str:
+    """Extract text from a PDF file using PyMuPDF"""
+    return "".join(iter_pdf_pages(pdf_path, page_range, max_chars))
+
+
+def summarize_pdf(
+    pdf_path: str,
+    target_language: str = "en",
+    on_token: Callable[[str], None] | None = None,
+    page_range: tuple[int, int] | None = None,
+) -> str:
     """Extract text from PDF and generate a summary"""
-    text = extract_text_from_pdf(pdf_path)
-    return generate_text_summary(text, target_language)
+    pages = iter_pdf_pages(pdf_path, page_range)
+    return generate_text_summary(pages, target_language, on_token)
@@ -1,43 +1,127 @@
+import itertools
+from typing import Callable, Iterable
+from rq import get_current_job
 from app.config.logging_config import logger
-from app.config.settings import TEXT_MODEL
+from app.config.settings import (
+    LANGUAGE_DETECTION_ENABLED,
+    LANGUAGE_DETECTION_MAX_CHARS,
+    SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS,
+    TEXT_MODEL,
+)
 from app.services.ai_client import OllamaClient
-from app.services.translation import translate_pt_to_en, translate_en_to_pt
+from app.services.summarization.long_text import (
+    collect_if_short,
+    estimate_tokens,
+    map_reduce_summary,
+)
+from app.services.metrics import time_stage
+from app.services.translation import supports_pair, translate
+from app.utils.language_detection import detect_language
 
 
-def generate_text_summary(text: str, target_language: str = "en") -> str:
+def _record_language(language: str | None):
+    job = get_current_job()
+    if job is not None:
+        job.meta["detected_language"] = language
+        job.save_meta()
+
+
+def _detect_source_language(text: str | Iterable[str]):
+    """
+    Detected language of the text, or None, and the text, whose first pieces
+    (up to LANGUAGE_DETECTION_MAX_CHARS) had to be read if it is an iterator
+    """
+    if isinstance(text, str):
+        sample = text
+    else:
+        # A first PDF page can be a title or a blank, so read on to the limit
+        head, length = [], 0
+        for piece in text:
+            head.append(piece)
+            length += len(piece)
+            if length >= LANGUAGE_DETECTION_MAX_CHARS:
+                break
+        sample = "".join(head)
+        text = itertools.chain(head, text)
+    with time_stage("language_detection") as sizes:
+        language = detect_language(sample)
+        sizes.update(input_chars=len(sample))
+    return language, text
+
+
+def generate_text_summary(
+    text: str | Iterable[str],
+    target_language: str = "en",
+    on_token: Callable[[str], None] | None = None,
+) -> str:
     """
     Generate a summary using the text model with translation support.
 
     Args:
-        text: The text to summarize
-        target_language: The target language code ('en' for English, 'pt' for Portuguese)
+        text: The text to summarize, or an iterable of pieces (such as PDF pages)
+            that long-text summarization can start on while it is produced
+        target_language: The target language code ('en' for English, 'pt' for Portuguese).
+            The text is taken to be in this language when its own can't be
+            detected.
+        on_token: Optional callback receiving the summary as it is generated.
+            Not used when the summary still has to be translated afterwards.
 
     Returns:
         A summary in the target language
     """
     try:
-        # Step 1: If target language is Portuguese, translate to English first
+        if not isinstance(text, str):
+            text = collect_if_short(text, SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS)
+
+        # Step 1: Summaries are generated in English, so translate the text
+        # first if it is in another language a model translates from
+        language = target_language.lower()
+        source_language = None
+        if LANGUAGE_DETECTION_ENABLED:
+            source_language, text = _detect_source_language(text)
+            logger.info(f"Detected language: {source_language}")
+            _record_language(source_language)
+        # Undetected texts are taken to be in the target language
+        source_language = source_language or language
+
         input_text = text
-        needs_translation = target_language.lower() == "pt"
-        # needs_translation = False
+        translate_input = source_language != "en" and supports_pair(
+            source_language, "en"
+        )
+        translate_output = language != "en" and supports_pair("en", language)
 
-        if needs_translation:
-            logger.info("Translating Portuguese input to English for summarization")
-            input_text = translate_pt_to_en(text)
+        if translate_input:
+            logger.info(
+                f"Translating {source_language} input to English for summarization"
+            )
+            if not isinstance(text, str):
+                text = "".join(text)
+            input_text = translate(text, source_language, "en")
             logger.info(f"Translation complete: {len(input_text)} characters")
             logger.info(f"#####################################")
             logger.info(f"{input_text}")
             logger.info(f"#####################################")
 
         # Step 2: Generate summary using the English model
-        prompt = f"Please summarize the following text concisely without emitting opinions:\n\n{input_text}"
-        logger.info(f"Generating summary using {TEXT_MODEL}")
-        summary = OllamaClient.generate(model=TEXT_MODEL, prompt=prompt)
-
-        # Step 3: If target language is Portuguese, translate summary back
-        if needs_translation:
-            logger.info("Translating summary back to Portuguese")
-            summary = translate_en_to_pt(summary)
+        summary_on_token = None if translate_output else on_token
+        if (
+            not isinstance(input_text, str)
+            or estimate_tokens(input_text) > SUMMARY_MAP_REDUCE_THRESHOLD_TOKENS
+        ):
+            # Too long for one prompt, summarize in parts and combine them
+            logger.info(f"Generating map-reduce summary using {TEXT_MODEL}")
+            summary = map_reduce_summary(input_text, on_token=summary_on_token)
+        else:
+            prompt = f"Please summarize the following text concisely without emitting opinions:\n\n{input_text}"
+            logger.info(f"Generating summary using {TEXT_MODEL}")
+            summary = OllamaClient.generate(
+                model=TEXT_MODEL, prompt=prompt, on_token=summary_on_token
+            )
+
+        # Step 3: Translate the summary to the target language
+        if translate_output:
+            logger.info(f"Translating summary to {language}")
+            summary = translate(summary, "en", language)
             logger.info(f"Summary translation complete: {len(summary)} characters")
             logger.info(f"#####################################")
             logger.info(f"{summary}")
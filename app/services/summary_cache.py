@@ -0,0 +1,156 @@
+# app/services/summary_cache.py
+import json
+import time
+from redis import Redis
+from rq import Queue
+from rq.defaults import DEFAULT_RESULT_TTL
+from rq.job import Job, JobStatus
+from rq.registry import FinishedJobRegistry
+from rq.results import Result
+from rq.utils import now
+from app.config.logging_config import logger
+from app.config.settings import (
+    JOB_QUEUES,
+    LLAVA_MODEL,
+    SUMMARY_CACHE_MAX_ENTRIES,
+    SUMMARY_CACHE_TTL,
+    SUMMARY_PROMPT_VERSION,
+    TEXT_MODEL,
+)
+from app.core.enums import FileType
+
+CACHE_PREFIX = "synthia:summary_cache"
+INDEX_KEY = f"{CACHE_PREFIX}:index"
+STATS_KEY = f"{CACHE_PREFIX}:stats"
+
+
+def summary_cache_key(
+    file_hash: str,
+    file_type: FileType,
+    target_language: str,
+    whisper_model: str | None = None,
+) -> str:
+    """Build the cache key for a summary of the given content"""
+    model = LLAVA_MODEL if file_type == FileType.IMAGE else TEXT_MODEL
+    parts = [
+        file_hash,
+        file_type.value,
+        target_language.lower(),
+        model,
+        f"v{SUMMARY_PROMPT_VERSION}",
+    ]
+    if file_type == FileType.AUDIO:
+        parts.append(whisper_model or "")
+    return f"{CACHE_PREFIX}:entry:" + ":".join(parts)
+
+
+def cached_summary(result: dict) -> dict:
+    """Job function recorded on jobs that were answered from the cache"""
+    return result
+
+
+class SummaryCache:
+    """Redis-backed store of finished summaries with a TTL and an entry cap"""
+
+    def __init__(
+        self,
+        connection: Redis,
+        ttl: int = SUMMARY_CACHE_TTL,
+        max_entries: int = SUMMARY_CACHE_MAX_ENTRIES,
+    ):
+        self.connection = connection
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached result for key, counting the hit or miss"""
+        try:
+            raw = self.connection.get(key)
+            with self.connection.pipeline() as pipe:
+                if raw is None:
+                    pipe.hincrby(STATS_KEY, "misses", 1)
+                    pipe.execute()
+                    return None
+
+                entry = json.loads(raw)
+                pipe.hincrby(STATS_KEY, "hits", 1)
+                pipe.hincrbyfloat(
+                    STATS_KEY, "seconds_saved", entry.get("duration", 0.0)
+                )
+                # Recently used entries are the last to be trimmed
+                pipe.zadd(INDEX_KEY, {key: time.time()})
+                pipe.execute()
+            return entry["result"]
+        except Exception as e:
+            logger.warning(f"Summary cache lookup failed: {e}")
+            return None
+
+    def set(self, key: str, result: dict, duration: float = 0.0) -> None:
+        """Store a result, trimming the cache back to its size cap"""
+        now = time.time()
+        entry = json.dumps({"result": result, "duration": duration})
+        try:
+            with self.connection.pipeline() as pipe:
+                pipe.set(key, entry, ex=self.ttl)
+                pipe.zadd(INDEX_KEY, {key: now})
+                pipe.zremrangebyscore(INDEX_KEY, "-inf", now - self.ttl)
+                pipe.zcard(INDEX_KEY)
+                size = pipe.execute()[-1]
+
+            if size > self.max_entries:
+                evicted = self.connection.zpopmin(INDEX_KEY, size - self.max_entries)
+                if evicted:
+                    self.connection.delete(*[member for member, _ in evicted])
+                    logger.info(f"Evicted {len(evicted)} summary cache entries")
+        except Exception as e:
+            logger.warning(f"Summary cache store failed: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size of the cache"""
+        with self.connection.pipeline() as pipe:
+            pipe.hgetall(STATS_KEY)
+            pipe.zcard(INDEX_KEY)
+            counters, entries = pipe.execute()
+        counters = {k.decode(): float(v) for k, v in counters.items()}
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "seconds_saved": counters.get("seconds_saved", 0.0),
+            "entries": entries,
+        }
+
+
+def create_cached_job(queue: Queue, result: dict) -> Job:
+    """
+    Record an already-finished job holding a cached result. It is stored the
+    way a worker stores a successful job, and kept for the queue's result_ttl.
+    """
+    result_ttl = JOB_QUEUES.get(queue.name, {}).get("result_ttl", DEFAULT_RESULT_TTL)
+    job = Job.create(
+        cached_summary,
+        args=(result,),
+        connection=queue.connection,
+        origin=queue.name,
+        result_ttl=result_ttl,
+        status=JobStatus.FINISHED,
+        meta={"cache_hit": True},
+    )
+    job.ended_at = now()
+    with queue.connection.pipeline() as pipe:
+        job.save(pipeline=pipe)
+        Result.create(
+            job,
+            Result.Type.SUCCESSFUL,
+            ttl=result_ttl,
+            return_value=result,
+            pipeline=pipe,
+        )
+        if result_ttl != 0:
+            FinishedJobRegistry(queue=queue).add(job, result_ttl, pipeline=pipe)
+        job.cleanup(result_ttl, pipeline=pipe, remove_from_queue=False)
+        pipe.execute()
+    return job
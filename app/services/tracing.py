@@ -0,0 +1,101 @@
+# app/services/tracing.py
+import cProfile
+import marshal
+import time
+from contextlib import contextmanager
+from rq import get_current_job
+from rq.job import Job
+from app.config.logging_config import logger
+from app.config.settings import PROFILE_TTL
+
+PROFILE_PREFIX = "synthia:profile"
+
+# Stages of the job running in this process. A worker runs one job at a time,
+# and the stages of a job may run in its threads, so this is not per thread.
+_spans: list[dict] | None = None
+_trace_start = 0.0
+
+
+def profile_key(job_id: str) -> str:
+    return f"{PROFILE_PREFIX}:{job_id}"
+
+
+def record_span(stage: str, start: float, end: float, **fields) -> bool:
+    """
+    Add a stage to the running job's trace, if there is one, and return whether
+    there was. start and end are time.perf_counter() readings, stored relative
+    to the start of the job.
+    """
+    if _spans is None:
+        return False
+    _spans.append(
+        {
+            "stage": stage,
+            "start": round(start - _trace_start, 4),
+            "end": round(end - _trace_start, 4),
+            "seconds": round(fields.pop("seconds", end - start), 4),
+            **fields,
+        }
+    )
+    return True
+
+
+def _queued_seconds(job: Job) -> float | None:
+    if job.started_at is None:
+        return None
+    # Timestamps read back from Redis are naive UTC
+    started = job.started_at.replace(tzinfo=None)
+    return round((started - job.created_at.replace(tzinfo=None)).total_seconds(), 4)
+
+
+@contextmanager
+def trace_job(job: Job | None = None):
+    """
+    Record the stages run inside the block, and store them with the time the
+    job waited in the queue in job.meta["timings"].
+
+    When job.meta["profile"] is set the block also runs under cProfile, and
+    the stats are kept under profile_key(job.id) for PROFILE_TTL seconds, in
+    the format pstats and snakeviz load. Only the job's own thread is profiled.
+    """
+    global _spans, _trace_start
+
+    job = job or get_current_job()
+    profiler = (
+        cProfile.Profile() if job is not None and job.meta.get("profile") else None
+    )
+    # Without a job the stages are not traced, and are observed where they run
+    _spans = [] if job is not None else None
+    _trace_start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        total = time.perf_counter() - _trace_start
+        spans, _spans = _spans, None
+        if job is not None:
+            try:
+                job.meta["timings"] = {
+                    "upload_seconds": job.meta.get("upload_seconds"),
+                    "queued_seconds": _queued_seconds(job),
+                    "total_seconds": round(total, 4),
+                    "stages": spans,
+                }
+                job.save_meta()
+                if profiler is not None:
+                    _save_profile(job, profiler)
+            except Exception as e:
+                # The job's outcome matters more than its timings
+                logger.warning(f"Could not save timings of job {job.id}: {e}")
+
+
+def _save_profile(job: Job, profiler: cProfile.Profile):
+    profiler.create_stats()
+    # marshal of the stats dict is what pstats.Stats.dump_stats writes
+    job.connection.set(
+        profile_key(job.id), marshal.dumps(profiler.stats), ex=PROFILE_TTL
+    )
+    logger.info(f"Saved profile of job {job.id}")
@@ -1,126 +1,289 @@
 # app/services/translation.py
+import transformers
 from transformers import MarianMTModel, MarianTokenizer
 import torch
 from app.config.logging_config import logger
-from app.config.settings import MODELS_DIR
+from app.config.settings import (
+    MODELS_DIR,
+    TORCH_NUM_INTEROP_THREADS,
+    TORCH_NUM_THREADS,
+    TRANSLATION_BACKEND,
+    TRANSLATION_BATCH_SIZE,
+    TRANSLATION_MAX_TOKENS,
+    TRANSLATION_MEMORY_BUDGET_MB,
+    TRANSLATION_MODELS,
+    TRANSLATION_PRELOAD_PAIRS,
+)
+from app.services.metrics import time_stage
+from app.utils.model_registry import ModelRegistry
+from app.utils.text_splitting import split_paragraphs
 import os
 
-# Global variables to store models and tokenizers
-pt_to_en_model = None
-pt_to_en_tokenizer = None
-en_to_pt_model = None
-en_to_pt_tokenizer = None
+_torch_threads_configured = False
 
+TRANSLATION_BACKENDS = ("fp32", "int8")
 
-def load_translation_models():
+
+def configure_torch_threads():
+    """Apply the configured torch thread counts, once per process"""
+    global _torch_threads_configured
+
+    if _torch_threads_configured:
+        return
+    _torch_threads_configured = True
+
+    if TORCH_NUM_THREADS > 0:
+        torch.set_num_threads(TORCH_NUM_THREADS)
+    if TORCH_NUM_INTEROP_THREADS > 0:
+        try:
+            torch.set_num_interop_threads(TORCH_NUM_INTEROP_THREADS)
+        except RuntimeError as e:
+            # Only allowed before torch runs any parallel work
+            logger.warning(f"Could not set torch inter-op threads: {e}")
+    logger.info(
+        f"Torch using {torch.get_num_threads()} intra-op and "
+        f"{torch.get_num_interop_threads()} inter-op threads"
+    )
+
+
+def quantized_model_path(model_name: str) -> str:
     """
-    Load translation models and tokenizers.
-    Models are loaded on-demand and kept in memory.
+    Where the int8 version of a model is cached. The artifact is a pickled
+    module, so it is tied to the torch and transformers versions that built it.
     """
-    global pt_to_en_model, pt_to_en_tokenizer, en_to_pt_model, en_to_pt_tokenizer
+    versions = f"torch-{torch.__version__}-transformers-{transformers.__version__}"
+    return os.path.join(
+        MODELS_DIR, "int8", model_name.strip("/").replace("/", "--"), f"{versions}.pt"
+    )
 
-    # Create models directory if it doesn't exist
-    os.makedirs(MODELS_DIR, exist_ok=True)
 
-    # Check if models are already loaded
-    if pt_to_en_model is None:
-        try:
-            logger.info("Loading Portuguese-to-English translation model")
-            pt_to_en_model_name = "Helsinki-NLP/opus-mt-ROMANCE-en"
-            # Cache models in the MODELS_DIR
-            pt_to_en_tokenizer = MarianTokenizer.from_pretrained(
-                pt_to_en_model_name, cache_dir=MODELS_DIR
-            )
-            pt_to_en_model = MarianMTModel.from_pretrained(
-                pt_to_en_model_name, cache_dir=MODELS_DIR
-            )
-            logger.info("Successfully loaded Portuguese-to-English model")
-        except Exception as e:
-            logger.error(f"Failed to load Portuguese-to-English model: {e}")
-            raise
-
-    if en_to_pt_model is None:
-        try:
-            logger.info("Loading English-to-Portuguese translation model")
+def quantize_model(model):
+    """Quantize the weights of the Linear layers to int8, activations stay fp32"""
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
 
-            en_to_pt_model_name = "Helsinki-NLP/opus-mt-tc-big-en-pt"
-            en_to_pt_tokenizer = MarianTokenizer.from_pretrained(
-                en_to_pt_model_name, cache_dir=MODELS_DIR
-            )
-            en_to_pt_model = MarianMTModel.from_pretrained(
-                en_to_pt_model_name, cache_dir=MODELS_DIR
-            )
-            logger.info("Successfully loaded English-to-Portuguese model")
-        except Exception as e:
-            logger.error(f"Failed to load English-to-Portuguese model: {e}")
-            raise
 
+def _load_int8_model(model_name: str, load_fp32):
+    path = quantized_model_path(model_name)
+    if os.path.exists(path):
+        logger.info(f"Loading cached int8 model from {path}")
+        # Written by quantize_model below, never downloaded
+        return torch.load(path, weights_only=False)
 
-def translate_pt_to_en(text):
-    """Translate Portuguese text to English"""
-    global pt_to_en_model, pt_to_en_tokenizer
+    logger.info(f"Quantizing {model_name} to int8, cached at {path}")
+    model = quantize_model(load_fp32())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Workers may race to build it, only complete files get the final name
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    torch.save(model, temp_path)
+    os.replace(temp_path, path)
+    return model
+
+
+def load_marian_model(model_name: str, backend: str | None = None):
+    """Load a Marian model and its tokenizer with the given translation backend"""
+    backend = backend or TRANSLATION_BACKEND
+    if backend not in TRANSLATION_BACKENDS:
+        raise ValueError(
+            f"Unsupported translation backend: {backend}. "
+            f"Choose one of: {', '.join(TRANSLATION_BACKENDS)}"
+        )
+
+    def load_fp32():
+        return MarianMTModel.from_pretrained(model_name, cache_dir=MODELS_DIR)
+
+    tokenizer = MarianTokenizer.from_pretrained(model_name, cache_dir=MODELS_DIR)
+    if backend == "int8":
+        model = _load_int8_model(model_name, load_fp32)
+    else:
+        model = load_fp32()
+    return model.eval(), tokenizer
 
-    # Load models if not already loaded
-    if pt_to_en_model is None:
-        load_translation_models()
 
+def base_language(code: str) -> str:
+    """Language of a code without its region: pt-BR and pt_br are pt"""
+    return code.lower().replace("_", "-").split("-")[0]
+
+
+def language_pair(source: str, target: str) -> str:
+    """Registry key of a translation direction, such as pt-en"""
+    return f"{base_language(source)}-{base_language(target)}"
+
+
+def supports_pair(source: str, target: str) -> bool:
+    """Whether a model is configured for translating source into target"""
+    return language_pair(source, target) in TRANSLATION_MODELS
+
+
+def model_bytes(loaded) -> int:
+    """Memory held by a (model, tokenizer) pair's weights, quantized or not"""
+    model, _ = loaded
+    total, seen = 0, set()
+    for value in model.state_dict().values():
+        # Quantized Linear layers keep their weight and bias in a tuple
+        for tensor in value if isinstance(value, tuple) else (value,):
+            # Tied weights, like Marian's embeddings and output layer, count once
+            if isinstance(tensor, torch.Tensor) and tensor.data_ptr() not in seen:
+                seen.add(tensor.data_ptr())
+                total += tensor.nbytes
+    return total
+
+
+def _load_pair(pair: str):
+    if pair not in TRANSLATION_MODELS:
+        raise ValueError(f"No translation model configured for {pair}")
+    configure_torch_threads()
+    # Create models directory if it doesn't exist
+    os.makedirs(MODELS_DIR, exist_ok=True)
     try:
-        # For long texts, split into chunks and process separately
-        if len(text) > 1000:
-            logger.info("Long text detected, splitting into chunks for translation")
-            chunks = [text[i : i + 1000] for i in range(0, len(text), 1000)]
-            translated_chunks = []
-
-            for chunk in chunks:
-                inputs = pt_to_en_tokenizer(chunk, return_tensors="pt", padding=True)
-                with torch.no_grad():
-                    outputs = pt_to_en_model.generate(**inputs)
-                chunk_translation = pt_to_en_tokenizer.batch_decode(
-                    outputs, skip_special_tokens=True
-                )[0]
-                translated_chunks.append(chunk_translation)
-
-            return " ".join(translated_chunks)
-        else:
-            inputs = pt_to_en_tokenizer(text, return_tensors="pt", padding=True)
-            with torch.no_grad():
-                outputs = pt_to_en_model.generate(**inputs)
-            return pt_to_en_tokenizer.batch_decode(outputs, skip_special_tokens=True)[0]
+        return load_marian_model(TRANSLATION_MODELS[pair])
     except Exception as e:
-        logger.error(f"Error translating from Portuguese to English: {e}")
+        logger.error(f"Failed to load {pair} translation model: {e}")
         raise
 
 
-def translate_en_to_pt(text):
-    """Translate English text to Portuguese"""
-    global en_to_pt_model, en_to_pt_tokenizer
+# (model, tokenizer) per language pair, loaded on first use
+translation_registry = ModelRegistry(
+    "translation",
+    _load_pair,
+    max_models=max(1, len(TRANSLATION_MODELS)),
+    max_bytes=TRANSLATION_MEMORY_BUDGET_MB * 1024 * 1024,
+    size_of=model_bytes,
+)
 
-    # Load models if not already loaded
-    if en_to_pt_model is None:
-        load_translation_models()
 
-    try:
-        # For long texts, split into chunks and process separately
-        if len(text) > 1000:
-            logger.info("Long text detected, splitting into chunks for translation")
-            chunks = [text[i : i + 1000] for i in range(0, len(text), 1000)]
-            translated_chunks = []
-
-            for chunk in chunks:
-                inputs = en_to_pt_tokenizer(chunk, return_tensors="pt", padding=True)
-                with torch.no_grad():
-                    outputs = en_to_pt_model.generate(**inputs)
-                chunk_translation = en_to_pt_tokenizer.batch_decode(
-                    outputs, skip_special_tokens=True
-                )[0]
-                translated_chunks.append(chunk_translation)
-
-            return " ".join(translated_chunks)
+def load_translation_models(pairs: list[str] | None = None):
+    """
+    Load the given language pairs (TRANSLATION_PRELOAD_PAIRS by default),
+    skipping those without a model in TRANSLATION_MODELS
+    """
+    pairs = TRANSLATION_PRELOAD_PAIRS if pairs is None else pairs
+    unconfigured = [pair for pair in pairs if pair not in TRANSLATION_MODELS]
+    if unconfigured:
+        logger.warning(
+            f"Not preloading {', '.join(unconfigured)}: "
+            "no translation model configured"
+        )
+    translation_registry.warmup([pair for pair in pairs if pair in TRANSLATION_MODELS])
+
+
+def _count_tokens(tokenizer, pieces: list[str]) -> list[int]:
+    if not pieces:
+        return []
+    encoded = tokenizer(pieces, add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def _split_long_sentence(tokenizer, sentence: str, max_tokens: int) -> list[str]:
+    """Break a sentence that doesn't fit the model on word boundaries"""
+    words = sentence.split(" ")
+    pieces, current, current_tokens = [], [], 0
+    for word, tokens in zip(words, _count_tokens(tokenizer, words)):
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def pack_sentences(tokenizer, sentences: list[str], max_tokens: int) -> list[str]:
+    """Greedily pack consecutive sentences into segments of at most max_tokens"""
+    segments, current, current_tokens = [], [], 0
+    for sentence, tokens in zip(sentences, _count_tokens(tokenizer, sentences)):
+        if tokens > max_tokens:
+            pieces = _split_long_sentence(tokenizer, sentence, max_tokens)
         else:
-            inputs = en_to_pt_tokenizer(text, return_tensors="pt", padding=True)
-            with torch.no_grad():
-                outputs = en_to_pt_model.generate(**inputs)
-            return en_to_pt_tokenizer.batch_decode(outputs, skip_special_tokens=True)[0]
+            pieces = [sentence]
+
+        for piece in pieces:
+            piece_tokens = tokens if len(pieces) == 1 else max_tokens
+            if current and current_tokens + piece_tokens > max_tokens:
+                segments.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        segments.append(" ".join(current))
+    return segments
+
+
+def _max_input_tokens(model, tokenizer) -> int:
+    limit = min(tokenizer.model_max_length, model.config.max_position_embeddings)
+    if TRANSLATION_MAX_TOKENS > 0:
+        limit = min(limit, TRANSLATION_MAX_TOKENS)
+    # Leave room for the end-of-sentence token the tokenizer appends
+    return limit - 1
+
+
+def translate_text(text: str, model, tokenizer, batch_size: int | None = None) -> str:
+    """
+    Translate text with a Marian model in padded batches.
+
+    The text is split on paragraph and sentence boundaries, sentences are packed
+    into segments that fit the model's input length, and the segments are sorted
+    by length so each batch carries as little padding as possible.
+    """
+    batch_size = batch_size or TRANSLATION_BATCH_SIZE
+    max_tokens = _max_input_tokens(model, tokenizer)
+
+    # (paragraph index, segment) pairs, so the layout can be restored afterwards
+    segments = []
+    for index, sentences in enumerate(split_paragraphs(text)):
+        for segment in pack_sentences(tokenizer, sentences, max_tokens):
+            segments.append((index, segment))
+    if not segments:
+        return ""
+
+    order = sorted(range(len(segments)), key=lambda i: len(segments[i][1]))
+    translations = [""] * len(segments)
+    logger.info(
+        f"Translating {len(segments)} segments in batches of up to {batch_size}"
+    )
+
+    for start in range(0, len(order), batch_size):
+        batch = order[start : start + batch_size]
+        inputs = tokenizer(
+            [segments[i][1] for i in batch],
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+        )
+        with torch.inference_mode():
+            outputs = model.generate(**inputs)
+        decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        for i, translation in zip(batch, decoded):
+            translations[i] = translation
+
+    paragraphs: dict[int, list[str]] = {}
+    for (index, _), translation in zip(segments, translations):
+        paragraphs.setdefault(index, []).append(translation)
+    return "\n\n".join(" ".join(parts) for parts in paragraphs.values())
+
+
+def translate(text: str, source: str, target: str) -> str:
+    """Translate text between two languages with the model configured for them"""
+    pair = language_pair(source, target)
+    model, tokenizer = translation_registry.get(pair)
+
+    try:
+        with time_stage("translation", direction=pair) as sizes:
+            translation = translate_text(text, model, tokenizer)
+            sizes.update(input_chars=len(text), output_chars=len(translation))
+            return translation
     except Exception as e:
-        logger.error(f"Error translating from English to Portuguese: {e}")
+        logger.error(f"Error translating {pair}: {e}")
         raise
+
+
+def translate_pt_to_en(text):
+    """Translate Portuguese text to English"""
+    return translate(text, "pt", "en")
+
+
+def translate_en_to_pt(text):
+    """Translate English text to Portuguese"""
+    return translate(text, "en", "pt")
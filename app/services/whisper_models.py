@@ -0,0 +1,48 @@
+# app/services/whisper_models.py
+from app.config.logging_config import logger
+from app.config.settings import (
+    WHISPER_ALLOWED_MODELS,
+    WHISPER_MAX_LOADED_MODELS,
+    WHISPER_MODEL,
+    WHISPER_PRELOAD_MODELS,
+)
+from app.utils.model_registry import ModelRegistry
+
+
+def _load_whisper_model(model_size: str):
+    # Imported here so the API can validate model sizes without loading torch
+    import whisper
+
+    return whisper.load_model(model_size)
+
+
+whisper_registry = ModelRegistry(
+    "Whisper", _load_whisper_model, max_models=WHISPER_MAX_LOADED_MODELS
+)
+
+
+def resolve_whisper_model(model_size: str | None = None) -> str:
+    """Return the Whisper model size to use, validating requested sizes"""
+    model_size = model_size or WHISPER_MODEL
+    if model_size not in WHISPER_ALLOWED_MODELS:
+        raise ValueError(
+            f"Unsupported Whisper model: {model_size}. "
+            f"Choose one of: {', '.join(WHISPER_ALLOWED_MODELS)}"
+        )
+    return model_size
+
+
+def get_whisper_model(model_size: str | None = None):
+    """Get a Whisper model, loading it once per process"""
+    return whisper_registry.get(resolve_whisper_model(model_size))
+
+
+def warmup_whisper_models(model_sizes=None):
+    """Load the configured Whisper models so the first job doesn't pay for it"""
+    model_sizes = model_sizes if model_sizes is not None else WHISPER_PRELOAD_MODELS
+    for model_size in model_sizes:
+        try:
+            get_whisper_model(model_size)
+        except Exception as e:
+            logger.error(f"Failed to preload Whisper model {model_size}: {e}")
+            raise
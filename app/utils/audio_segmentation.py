@@ -0,0 +1,64 @@
+import numpy as np
+
+FRAME_SECONDS = 0.03
+
+
+def frame_rms(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames"""
+    frame_count = len(audio) // frame_length
+    frames = audio[: frame_count * frame_length].reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def silent_runs(silent: np.ndarray, min_frames: int) -> np.ndarray:
+    """[start, stop) frame indices of runs of at least min_frames silent frames"""
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    keep = stops - starts >= min_frames
+    return np.stack((starts[keep], stops[keep]), axis=1)
+
+
+def split_on_silence(
+    audio: np.ndarray,
+    sample_rate: int,
+    max_seconds: float,
+    min_seconds: float,
+    min_silence_seconds: float = 0.5,
+    silence_db: float = 35.0,
+) -> list[tuple[int, int]]:
+    """
+    Split audio into [start, stop) sample ranges of at most max_seconds.
+
+    Cuts go in the middle of the last long enough silence of each window, or
+    at its quietest frame when the window has no silence. Silence is measured
+    relative to the loud parts of the recording, so quiet files split as well
+    as loud ones.
+    """
+    frame_length = int(sample_rate * FRAME_SECONDS)
+    if len(audio) <= max_seconds * sample_rate or len(audio) < frame_length:
+        return [(0, len(audio))]
+
+    rms = frame_rms(audio, frame_length)
+    level_db = 20 * np.log10(np.maximum(rms, 1e-10))
+    silent = level_db < np.percentile(level_db, 95) - silence_db
+    runs = silent_runs(silent, max(1, int(min_silence_seconds / FRAME_SECONDS)))
+    cut_candidates = (runs[:, 0] + runs[:, 1]) // 2
+
+    max_frames = int(max_seconds / FRAME_SECONDS)
+    min_frames = min(int(min_seconds / FRAME_SECONDS), max_frames // 2)
+    frame_count = len(rms)
+    cuts = []
+    start = 0
+    while frame_count - start > max_frames:
+        low, high = start + min_frames, start + max_frames
+        in_window = cut_candidates[(cut_candidates > low) & (cut_candidates <= high)]
+        if len(in_window):
+            cut = int(in_window[-1])
+        else:
+            cut = low + int(np.argmin(rms[low:high]))
+        cuts.append(cut * frame_length)
+        start = cut
+
+    bounds = [0, *cuts, len(audio)]
+    return list(zip(bounds[:-1], bounds[1:]))
@@ -0,0 +1,148 @@
+import math
+import re
+from collections import Counter
+from app.config.settings import LANGUAGE_DETECTION_MAX_CHARS
+
+# Training text for each language's character trigram profile. Adding a
+# language only takes a paragraph or two of ordinary prose.
+SAMPLES = {
+    "en": (
+        "The report was delivered to the board last week and the members will "
+        "discuss it at the next meeting. Sales grew in the first quarter, but "
+        "the costs of transport and energy also went up. The company said that "
+        "it would hire more people this year and open two new offices in the "
+        "north of the country. According to the government, the new rules should "
+        "come into force before the end of the month. We need an answer by Friday "
+        "at the latest, otherwise the project will have to wait until the summer. "
+        "Most of the people who answered the survey think that the service has "
+        "improved, although many of them still complain about the waiting times. "
+        "This document describes how the system works, which data it collects and "
+        "what happens when something goes wrong. There is no evidence that the "
+        "changes had any effect on the results of the study."
+    ),
+    "pt": (
+        "O relatório foi entregue ao conselho na semana passada e os membros vão "
+        "discuti-lo na próxima reunião. As vendas cresceram no primeiro trimestre, "
+        "mas os custos de transporte e de energia também aumentaram. A empresa "
+        "disse que vai contratar mais pessoas este ano e abrir dois novos "
+        "escritórios no norte do país. Segundo o governo, as novas regras devem "
+        "entrar em vigor antes do fim do mês. Precisamos de uma resposta até "
+        "sexta-feira, no máximo, senão o projeto terá de esperar até o verão. A "
+        "maioria das pessoas que responderam à pesquisa acha que o serviço "
+        "melhorou, embora muitas ainda reclamem do tempo de espera. Este documento "
+        "descreve como o sistema funciona, quais dados são coletados e o que "
+        "acontece quando algo dá errado. Não há evidências de que as mudanças "
+        "tenham tido algum efeito nos resultados do estudo, então a decisão não "
+        "foi tomada pela comissão."
+    ),
+    "es": (
+        "El informe fue entregado al consejo la semana pasada y los miembros lo "
+        "discutirán en la próxima reunión. Las ventas crecieron en el primer "
+        "trimestre, pero los costes del transporte y de la energía también "
+        "subieron. La empresa dijo que contratará a más personas este año y que "
+        "abrirá dos nuevas oficinas en el norte del país. Según el gobierno, las "
+        "nuevas normas deberían entrar en vigor antes de que termine el mes. "
+        "Necesitamos una respuesta hasta el viernes como muy tarde, si no el "
+        "proyecto tendrá que esperar hasta el verano. La mayoría de las personas "
+        "que respondieron a la encuesta cree que el servicio ha mejorado, aunque "
+        "muchas todavía se quejan de los tiempos de espera. Este documento "
+        "describe cómo funciona el sistema, qué datos recoge y qué ocurre cuando "
+        "algo sale mal. No hay pruebas de que los cambios hayan tenido ningún "
+        "efecto en los resultados del estudio."
+    ),
+    "fr": (
+        "Le rapport a été remis au conseil la semaine dernière et les membres en "
+        "discuteront lors de la prochaine réunion. Les ventes ont augmenté au "
+        "premier trimestre, mais les coûts du transport et de l'énergie ont "
+        "aussi progressé. L'entreprise a déclaré qu'elle embaucherait plus de "
+        "personnes cette année et qu'elle ouvrirait deux nouveaux bureaux dans "
+        "le nord du pays. Selon le gouvernement, les nouvelles règles devraient "
+        "entrer en vigueur avant la fin du mois. Nous avons besoin d'une réponse "
+        "vendredi au plus tard, sinon le projet devra attendre l'été. La plupart "
+        "des personnes qui ont répondu à l'enquête pensent que le service s'est "
+        "amélioré, même si beaucoup se plaignent encore des délais d'attente. Ce "
+        "document décrit le fonctionnement du système, les données qu'il "
+        "recueille et ce qui se passe en cas de problème."
+    ),
+    "de": (
+        "Der Bericht wurde dem Vorstand letzte Woche übergeben, und die "
+        "Mitglieder werden ihn bei der nächsten Sitzung besprechen. Der Umsatz "
+        "ist im ersten Quartal gestiegen, aber auch die Kosten für Transport und "
+        "Energie sind höher geworden. Das Unternehmen sagte, dass es in diesem "
+        "Jahr mehr Menschen einstellen und zwei neue Büros im Norden des Landes "
+        "eröffnen werde. Nach Angaben der Regierung sollen die neuen Regeln noch "
+        "vor dem Ende des Monats in Kraft treten. Wir brauchen eine Antwort "
+        "spätestens bis Freitag, sonst muss das Projekt bis zum Sommer warten. "
+        "Die meisten Menschen, die an der Umfrage teilgenommen haben, finden, "
+        "dass sich der Dienst verbessert hat, obwohl sich viele noch über die "
+        "Wartezeiten beschweren. Dieses Dokument beschreibt, wie das System "
+        "funktioniert, welche Daten es erfasst und was passiert, wenn etwas "
+        "schiefgeht."
+    ),
+    "it": (
+        "Il rapporto è stato consegnato al consiglio la settimana scorsa e i "
+        "membri ne discuteranno alla prossima riunione. Le vendite sono cresciute "
+        "nel primo trimestre, ma anche i costi del trasporto e dell'energia sono "
+        "aumentati. L'azienda ha detto che quest'anno assumerà più persone e "
+        "aprirà due nuovi uffici nel nord del paese. Secondo il governo, le nuove "
+        "regole dovrebbero entrare in vigore prima della fine del mese. Abbiamo "
+        "bisogno di una risposta entro venerdì al più tardi, altrimenti il "
+        "progetto dovrà aspettare fino all'estate. La maggior parte delle persone "
+        "che hanno risposto al sondaggio pensa che il servizio sia migliorato, "
+        "anche se molte si lamentano ancora dei tempi di attesa. Questo documento "
+        "descrive come funziona il sistema, quali dati raccoglie e cosa succede "
+        "quando qualcosa va storto."
+    ),
+}
+
+# Fewer trigrams than this, or a winner this close to the runner-up (in mean
+# log-probability per trigram), and the language is reported as unknown
+MIN_TRIGRAMS = 12
+MIN_MARGIN = 0.05
+
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+
+# Trigram log-probabilities per language, and the one of an unseen trigram
+_profiles: dict[str, tuple[dict[str, float], float]] = {}
+
+
+def _trigrams(text: str) -> Counter:
+    """Trigrams of the lowercased letters, with words split by single spaces"""
+    padded = f" {' '.join(_NON_LETTERS.sub(' ', text.lower()).split())} "
+    return Counter(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def _build_profile(sample: str) -> tuple[dict[str, float], float]:
+    counts = _trigrams(sample)
+    # Add-one smoothing, with room for as many unseen trigrams as seen ones
+    total = sum(counts.values()) + 2 * len(counts)
+    profile = {trigram: math.log((n + 1) / total) for trigram, n in counts.items()}
+    return profile, math.log(1 / total)
+
+
+def _get_profiles() -> dict[str, tuple[dict[str, float], float]]:
+    if not _profiles:
+        _profiles.update(
+            (language, _build_profile(sample)) for language, sample in SAMPLES.items()
+        )
+    return _profiles
+
+
+def detect_language(text: str, max_chars: int | None = None) -> str | None:
+    """
+    Code of the language text is most likely written in, or None when it is
+    too short or too ambiguous to tell. Only the first max_chars characters
+    (LANGUAGE_DETECTION_MAX_CHARS by default) are looked at.
+    """
+    counts = _trigrams(text[: max_chars or LANGUAGE_DETECTION_MAX_CHARS])
+    total = sum(counts.values())
+    if total < MIN_TRIGRAMS:
+        return None
+
+    scores = []
+    for language, (profile, unseen) in _get_profiles().items():
+        score = sum(n * profile.get(trigram, unseen) for trigram, n in counts.items())
+        scores.append((score / total, language))
+    scores.sort(reverse=True)
+    (best, language), (runner_up, _) = scores[0], scores[1]
+    return language if best - runner_up >= MIN_MARGIN else None
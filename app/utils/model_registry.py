@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+from app.config.logging_config import logger
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models with least-recently-used eviction.
+
+    Each key is loaded at most once through `loader` and kept in memory until
+    more than `max_models` entries are resident, or, with a `max_bytes` budget,
+    until their `size_of` adds up to more than it. The least recently used
+    ones are then dropped. The model just loaded is always kept, even when it
+    is over the budget on its own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Hashable], Any],
+        max_models: int = 1,
+        max_bytes: int = 0,
+        size_of: Callable[[Any], int] | None = None,
+    ):
+        if max_models < 1:
+            raise ValueError(f"{name} registry needs room for at least one model")
+        if max_bytes and size_of is None:
+            raise ValueError(f"{name} registry needs size_of to enforce max_bytes")
+        self.name = name
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._size_of = size_of
+        self._models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the model for `key`, loading it on first use"""
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            logger.info(f"Loading {self.name} model: {key}")
+            model = self._loader(key)
+            self._models[key] = model
+            if self._size_of is not None:
+                self._sizes[key] = self._size_of(model)
+            self._evict()
+            logger.info(f"Loaded {self.name} model: {key}")
+            return model
+
+    def warmup(self, keys: Iterable[Hashable]) -> None:
+        """Load the given models ahead of the first request"""
+        for key in keys:
+            self.get(key)
+
+    def loaded(self) -> List[Hashable]:
+        """Keys of the resident models, least recently used first"""
+        with self._lock:
+            return list(self._models.keys())
+
+    def resident_bytes(self) -> int:
+        """Combined size of the resident models, when sizes are tracked"""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def evict(self, key: Hashable) -> bool:
+        """Drop a single model from memory"""
+        with self._lock:
+            if key in self._models:
+                del self._models[key]
+                self._sizes.pop(key, None)
+                logger.info(f"Evicted {self.name} model: {key}")
+                return True
+        return False
+
+    def clear(self) -> None:
+        """Drop every resident model"""
+        with self._lock:
+            self._models.clear()
+            self._sizes.clear()
+
+    def _over_budget(self) -> bool:
+        if len(self._models) > self.max_models:
+            return True
+        return (
+            self.max_bytes > 0
+            and len(self._models) > 1
+            and sum(self._sizes.values()) > self.max_bytes
+        )
+
+    def _evict(self) -> None:
+        while self._over_budget():
+            key, _ = self._models.popitem(last=False)
+            self._sizes.pop(key, None)
+            logger.info(f"Evicted least recently used {self.name} model: {key}")
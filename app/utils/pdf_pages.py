@@ -0,0 +1,12 @@
+import fitz  # PyMuPDF
+
+
+def extract_pages(pdf_path: str, start: int, stop: int, flags: int) -> list[str]:
+    """
+    Extract the text of pages [start, stop). Runs in spawned pool processes,
+    so this module imports nothing but PyMuPDF.
+    """
+    with fitz.open(pdf_path) as doc:
+        return [
+            doc[number].get_text("text", flags=flags) for number in range(start, stop)
+        ]
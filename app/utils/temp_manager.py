@@ -57,4 +57,4 @@ async def periodic_cleanup():
 
 async def setup_periodic_cleanup():
     """Set up periodic cleanup of temporary files"""
-    asyncio.create_task(periodic_cleanup())
+    return asyncio.create_task(periodic_cleanup())
@@ -0,0 +1,15 @@
+import re
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?;:])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def split_paragraphs(text: str) -> list[list[str]]:
+    """Split text into paragraphs of sentences, folding line wraps into spaces"""
+    paragraphs = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = WHITESPACE.sub(" ", paragraph).strip()
+        if paragraph:
+            paragraphs.append(SENTENCE_BREAK.split(paragraph))
+    return paragraphs
@@ -5,15 +5,169 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import argparse
+import time
 import redis
-from rq import Worker
+from rq import SimpleWorker, Worker
+from rq.utils import now
+from app.config.logging_config import logger
+from app.config.settings import (
+    REDIS_URL,
+    WORKER_MAX_JOBS,
+    WORKER_METRICS_PORT,
+    WORKER_MODE,
+    WORKER_QUEUE_WEIGHTS,
+    WORKER_QUEUES,
+)
+from app.services.metrics import (
+    JOB_SECONDS,
+    JOB_WAIT_SECONDS,
+    WORKER_BUSY,
+    WORKER_JOBS,
+    observe_timings,
+    start_metrics_server,
+)
+from app.services.preload import preload_worker_models
+from app.services.queues import parse_queue_weights, weighted_order
+from app.services.job_stream import publish_status
+from app.services.scheduling import dispatch_jobs
 
-listen = ["default"]
+listen = WORKER_QUEUES
 
-redis_url = "redis://localhost:6379"
+conn = redis.from_url(REDIS_URL)
+
+
+class SynthiaWorker(Worker):
+    """
+    Moves shortest-job-first held jobs onto the queues as it takes jobs,
+    tells the job's subscribers when it starts, and records job metrics.
+    """
+
+    def dequeue_job_and_maintain_ttl(self, timeout, max_idle_time=None):
+        for queue in self.queues:
+            dispatch_jobs(queue)
+        result = super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+        if result is not None:
+            # Top the queue up for the other workers
+            dispatch_jobs(result[1])
+        return result
+
+    def prepare_job_execution(self, job, remove_from_intermediate_queue=False):
+        super().prepare_job_execution(job, remove_from_intermediate_queue)
+        publish_status(self.connection, job.id, "processing")
+
+    def execute_job(self, job, queue):
+        WORKER_BUSY.set(1)
+        # created_at comes back from Redis as naive UTC
+        waited = now().replace(tzinfo=None) - job.created_at.replace(tzinfo=None)
+        JOB_WAIT_SECONDS.labels(queue=queue.name).observe(waited.total_seconds())
+        start = time.perf_counter()
+        try:
+            super().execute_job(job, queue)
+        finally:
+            WORKER_BUSY.set(0)
+            JOB_SECONDS.labels(queue=queue.name).observe(time.perf_counter() - start)
+            status = job.get_status(refresh=True)
+            WORKER_JOBS.labels(
+                queue=queue.name, status=status.value if status else "deleted"
+            ).inc()
+            # Forked job processes exit with their metrics, but leave the trace
+            if status is not None:
+                observe_timings(job.get_meta(refresh=True).get("timings"))
+
+
+class SynthiaSimpleWorker(SynthiaWorker, SimpleWorker):
+    pass
+
+
+# plain:     stock RQ worker, every job process loads its own models
+# fork:      models preloaded in the parent, each job runs in a forked child
+#            that shares the loaded weights copy-on-write
+# inprocess: models preloaded, jobs run inside the worker process itself
+WORKER_MODES = {
+    "plain": (SynthiaWorker, False),
+    "fork": (SynthiaWorker, True),
+    "inprocess": (SynthiaSimpleWorker, True),
+}
+
+
+class WeightedQueuesMixin:
+    """Reshuffle the queue order by weight after every dequeued job"""
+
+    queue_weights: dict[str, float] = {}
+
+    def reorder_queues(self, reference_queue):
+        self._ordered_queues = weighted_order(self.queues, self.queue_weights)
+
+
+def weighted_worker_class(worker_class, weights: dict[str, float]):
+    return type(
+        f"Weighted{worker_class.__name__}",
+        (WeightedQueuesMixin, worker_class),
+        {"queue_weights": weights},
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Synthia RQ worker")
+    parser.add_argument("--mode", choices=WORKER_MODES.keys(), default=WORKER_MODE)
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=WORKER_MAX_JOBS,
+        help="Restart the worker process after this many jobs (0 = never)",
+    )
+    parser.add_argument(
+        "--queues",
+        default=",".join(listen),
+        help="Comma-separated queues to listen on, checked in this order",
+    )
+    parser.add_argument(
+        "--weights",
+        default=WORKER_QUEUE_WEIGHTS,
+        help="Pick among the queues at random by weight, e.g. 'text=4,pdf=1'",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=WORKER_METRICS_PORT,
+        help="Serve Prometheus metrics on this port (0 = off)",
+    )
+    return parser.parse_args()
+
+
+def run_worker(
+    mode: str, max_jobs: int, queues=None, weights: str = "", metrics_port: int = 0
+):
+    """Start a worker in the given mode, recycling it after max_jobs jobs"""
+    worker_class, preload = WORKER_MODES[mode]
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    if weights:
+        worker_class = weighted_worker_class(worker_class, parse_queue_weights(weights))
+    if preload:
+        preload_worker_models()
+
+    queues = queues or listen
+    worker = worker_class(queues, connection=conn)
+    logger.info(
+        f"Starting {mode} worker on {', '.join(queues)} "
+        f"(max jobs: {max_jobs or 'unlimited'})"
+    )
+    worker.work(max_jobs=max_jobs or None)
+
+    if max_jobs and not worker._stop_requested:
+        # Replace this process with a fresh one to release anything the jobs leaked
+        logger.info(f"Worker reached {max_jobs} jobs, recycling process")
+        os.execv(sys.executable, [sys.executable] + sys.argv)
 
-conn = redis.from_url(redis_url)
 
 if __name__ == "__main__":
-    worker = Worker(listen, connection=conn)
-    worker.work()
+    args = parse_args()
+    run_worker(
+        args.mode,
+        args.max_jobs,
+        args.queues.split(","),
+        args.weights,
+        args.metrics_port,
+    )
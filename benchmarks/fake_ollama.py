@@ -0,0 +1,97 @@
+# benchmarks/fake_ollama.py
+"""
+Stand-in for Ollama's /api/generate with a configurable latency and token
+rate, so load tests measure Synthia rather than the model.
+
+    python -m benchmarks.fake_ollama --port 11500 --latency 0.2 --tokens-per-second 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+app = FastAPI(title="Fake Ollama")
+
+# Replaced from the command line
+config = {
+    "latency": 0.2,
+    "tokens_per_second": 50.0,
+    "response_tokens": 60,
+    "think_tokens": 0,
+}
+
+
+def _tokens() -> list[str]:
+    tokens = [f" word{index}" for index in range(config["response_tokens"])]
+    if config["think_tokens"]:
+        thinking = [" hmm"] * config["think_tokens"]
+        tokens = ["<think>", *thinking, "</think>", *tokens]
+    return tokens
+
+
+def _chunk(model: str, text: str, done: bool) -> dict:
+    return {
+        "model": model,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "response": text,
+        "done": done,
+    }
+
+
+@app.get("/", response_class=PlainTextResponse)
+async def root():
+    return "Ollama is running"
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    payload = await request.json()
+    model = payload.get("model", "")
+    tokens = _tokens()
+    token_delay = 1 / config["tokens_per_second"]
+
+    if not payload.get("stream", True):
+        await asyncio.sleep(config["latency"] + len(tokens) * token_delay)
+        return JSONResponse(_chunk(model, "".join(tokens), True))
+
+    async def stream():
+        await asyncio.sleep(config["latency"])
+        for token in tokens:
+            await asyncio.sleep(token_delay)
+            yield json.dumps(_chunk(model, token, False)) + "\n"
+        yield json.dumps(_chunk(model, "", True)) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="Seconds before the first token"
+    )
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument(
+        "--think-tokens",
+        type=int,
+        default=0,
+        help="Prefix responses with a <think> block of this many tokens",
+    )
+    args = parser.parse_args()
+    config.update(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        think_tokens=args.think_tokens,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test: start Redis, the fake Ollama, the conversion API, RQ
+workers and the API locally, replay a workload at a fixed concurrency and
+report throughput and latency percentiles per file type.
+
+    python -m benchmarks.workload --count 200 -o benchmarks/workload.jsonl
+    python -m benchmarks.load_test --workload benchmarks/workload.jsonl \\
+        --concurrency 16 --workers 4 --start-redis \\
+        --baseline benchmarks/baselines/default.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.workload import materialize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDED = ("completed", "failed")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Services:
+    """Local processes of the stack, with their output in log_dir"""
+
+    def __init__(self, log_dir: str):
+        self.log_dir = log_dir
+        self.processes: list[tuple[str, subprocess.Popen]] = []
+
+    def start(self, name: str, cmd: list[str], env: dict, cwd: str = ROOT):
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "wb")
+        process = subprocess.Popen(
+            cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        self.processes.append((name, process))
+
+    def check(self):
+        for name, process in self.processes:
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"{name} exited with code {process.returncode}, "
+                    f"see {os.path.join(self.log_dir, name + '.log')}"
+                )
+
+    def stop(self):
+        for _, process in reversed(self.processes):
+            process.terminate()
+        for _, process in reversed(self.processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def wait_until_up(services: Services, url: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        services.check()
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout} seconds")
+
+
+def start_stack(args, services: Services) -> str:
+    """Start every service and return the API's base URL"""
+    redis_url = args.redis_url
+    if args.start_redis:
+        if shutil.which("redis-server") is None:
+            raise RuntimeError("redis-server is not installed")
+        redis_port = free_port()
+        services.start(
+            "redis",
+            ["redis-server", "--port", str(redis_port), "--save", ""],
+            dict(os.environ),
+        )
+        redis_url = f"redis://127.0.0.1:{redis_port}/0"
+
+    ollama_port, conversion_port, api_port = free_port(), free_port(), free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "REDIS_URL": redis_url,
+        "OLLAMA_API_URL": f"http://127.0.0.1:{ollama_port}/api/generate",
+        "CONVERSION_API_URL": f"http://127.0.0.1:{conversion_port}",
+        "CONVERSION_DB_PATH": os.path.join(services.log_dir, "conversions.sqlite3"),
+        "SUMMARY_CACHE_ENABLED": "1" if args.cache else "0",
+    }
+
+    services.start(
+        "fake_ollama",
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_ollama",
+            "--port",
+            str(ollama_port),
+            "--latency",
+            str(args.ollama_latency),
+            "--tokens-per-second",
+            str(args.ollama_tokens_per_second),
+        ],
+        env,
+    )
+    services.start(
+        "conversion_api",
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(conversion_port)],
+        env,
+        cwd=os.path.join(ROOT, "conversion_api"),
+    )
+    for index in range(args.workers):
+        services.start(
+            f"worker_{index}",
+            [
+                sys.executable,
+                "app/worker.py",
+                "--mode",
+                args.worker_mode,
+                "--metrics-port",
+                "0",
+            ],
+            env,
+        )
+    services.start(
+        "api",
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(api_port),
+            "--workers",
+            str(args.api_workers),
+        ],
+        env,
+    )
+
+    api_url = f"http://127.0.0.1:{api_port}"
+    wait_until_up(services, f"http://127.0.0.1:{ollama_port}/")
+    wait_until_up(services, f"http://127.0.0.1:{conversion_port}/queue")
+    wait_until_up(services, f"{api_url}/health")
+    return api_url
+
+
+async def run_job(
+    client: httpx.AsyncClient, item: dict, file: tuple[str, bytes], job_timeout: float
+) -> dict:
+    """Submit one item and wait for it to end"""
+    record = {"file_type": item["file_type"], "status": "failed"}
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            "/summarize",
+            files={"file": file},
+            data={
+                "file_type": item["file_type"],
+                "file_name": file[0],
+                "target_language": item.get("target_language", "en"),
+            },
+        )
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        record["submit_seconds"] = time.perf_counter() - start
+
+        deadline = start + job_timeout
+        result = {"status": "timeout", "error": f"Not done after {job_timeout} s"}
+        while time.perf_counter() < deadline:
+            wait = min(30, max(1, deadline - time.perf_counter()))
+            response = await client.get(f"/result/{job_id}", params={"wait": wait})
+            response.raise_for_status()
+            result = response.json()
+            if result["status"] in ENDED:
+                break
+        record["latency_seconds"] = time.perf_counter() - start
+        record["status"] = result["status"]
+        if result["status"] != "completed":
+            record["error"] = result.get("error") or f"Ended as {result['status']}"
+        timings = result.get("timings") or {}
+        if timings.get("queued_seconds") is not None:
+            record["queued_seconds"] = timings["queued_seconds"]
+    except httpx.HTTPError as e:
+        record["latency_seconds"] = time.perf_counter() - start
+        record["error"] = str(e)
+    return record
+
+
+async def watch(services: Services):
+    """Fail the run as soon as one of the local services dies"""
+    while True:
+        services.check()
+        await asyncio.sleep(1)
+
+
+async def replay(
+    api_url: str,
+    items: list[dict],
+    concurrency: int,
+    job_timeout: float,
+    services: Services,
+) -> tuple[list[dict], float]:
+    """Run items with at most concurrency jobs in flight, in workload order"""
+    files = {}
+    for item in items:
+        key = json.dumps(item, sort_keys=True)
+        if key not in files:
+            files[key] = materialize(item)
+
+    pending = iter(items)
+    records = []
+    limits = httpx.Limits(max_connections=concurrency)
+    request_timeout = httpx.Timeout(60, read=90)
+    async with httpx.AsyncClient(
+        base_url=api_url, limits=limits, timeout=request_timeout
+    ) as client:
+
+        async def client_loop():
+            for item in pending:
+                file = files[json.dumps(item, sort_keys=True)]
+                records.append(await run_job(client, item, file, job_timeout))
+
+        start = time.perf_counter()
+        watcher = asyncio.create_task(watch(services))
+        clients = asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        done, _ = await asyncio.wait(
+            [watcher, clients], return_when=asyncio.FIRST_COMPLETED
+        )
+        wall = time.perf_counter() - start
+        watcher.cancel()
+        if watcher in done:
+            clients.cancel()
+            watcher.result()
+    return records, wall
+
+
+def percentile(values: list[float], q: float) -> float:
+    """q-th percentile (0-100) with linear interpolation"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def distribution(values: list[float]) -> dict | None:
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def summarize(records: list[dict], wall: float, config: dict) -> dict:
+    completed = [record for record in records if record["status"] == "completed"]
+    groups = {"all": completed}
+    for record in completed:
+        groups.setdefault(record["file_type"], []).append(record)
+
+    def by_group(field):
+        return {
+            name: distribution([r[field] for r in group if field in r])
+            for name, group in groups.items()
+        }
+
+    return {
+        "config": config,
+        "jobs": len(records),
+        "completed": len(completed),
+        "failed": len(records) - len(completed),
+        "wall_seconds": round(wall, 3),
+        "throughput_jobs_per_second": round(len(completed) / wall, 4) if wall else 0,
+        "latency": by_group("latency_seconds"),
+        "queue_wait": by_group("queued_seconds"),
+        "submit": by_group("submit_seconds"),
+        "errors": sorted({r["error"] for r in records if r.get("error")})[:20],
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of report against baseline beyond the relative tolerance"""
+    regressions = []
+    current = report["throughput_jobs_per_second"]
+    previous = baseline["throughput_jobs_per_second"]
+    if current < previous * (1 - tolerance):
+        regressions.append(f"throughput {previous:.3f} -> {current:.3f} jobs/s")
+    for section in ("latency", "queue_wait"):
+        for name, stats in report[section].items():
+            before = baseline.get(section, {}).get(name)
+            if not stats or not before:
+                continue
+            # Waits near zero are noise, give them a small absolute allowance
+            if stats["p95"] > before["p95"] * (1 + tolerance) + 0.05:
+                regressions.append(
+                    f"{section} p95 of {name} {before['p95']:.3f} -> "
+                    f"{stats['p95']:.3f} s"
+                )
+    return regressions
+
+
+def print_report(report: dict):
+    print(
+        f"{report['completed']}/{report['jobs']} jobs completed in "
+        f"{report['wall_seconds']:.1f} s, "
+        f"{report['throughput_jobs_per_second']:.3f} jobs/s"
+    )
+    print(f"{'':12}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'wait p95':>10}")
+    for name, stats in report["latency"].items():
+        if not stats:
+            continue
+        wait = report["queue_wait"].get(name)
+        print(
+            f"{name:12}{stats['count']:>7}{stats['p50']:>9.3f}{stats['p95']:>9.3f}"
+            f"{stats['p99']:>9.3f}{(wait['p95'] if wait else float('nan')):>10.3f}"
+        )
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workload", default="benchmarks/workload.jsonl")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--job-timeout", type=float, default=600)
+    parser.add_argument(
+        "--api-url", help="Test a running API instead of starting the stack"
+    )
+    parser.add_argument(
+        "--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    )
+    parser.add_argument("--start-redis", action="store_true")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--worker-mode", default="fork", choices=["plain", "fork", "inprocess"]
+    )
+    parser.add_argument("--api-workers", type=int, default=1)
+    parser.add_argument("--ollama-latency", type=float, default=0.2)
+    parser.add_argument("--ollama-tokens-per-second", type=float, default=50.0)
+    parser.add_argument(
+        "--cache", action="store_true", help="Keep the summary cache enabled"
+    )
+    parser.add_argument("--output", help="Where to write the report JSON")
+    parser.add_argument("--baseline", help="Report JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write the report to --baseline"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    with open(args.workload) as workload:
+        items = [json.loads(line) for line in workload if line.strip()]
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    results_dir = os.path.join(ROOT, "benchmarks", "results", stamp)
+    os.makedirs(results_dir, exist_ok=True)
+    config = {
+        "items": len(items),
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "worker_mode": args.worker_mode,
+        "api_workers": args.api_workers,
+        "ollama_latency": args.ollama_latency,
+        "ollama_tokens_per_second": args.ollama_tokens_per_second,
+        "cache": args.cache,
+    }
+
+    services = Services(results_dir)
+    try:
+        api_url = args.api_url or start_stack(args, services)
+        records, wall = asyncio.run(
+            replay(api_url, items, args.concurrency, args.job_timeout, services)
+        )
+    finally:
+        services.stop()
+
+    report = summarize(records, wall, config)
+    print_report(report)
+    output = args.output or os.path.join(results_dir, "report.json")
+    with open(output, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f"Report written to {output}")
+
+    if args.baseline and args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks for the CPU-bound stages that run inside the worker, with
+generated fixtures at several sizes. Reports the median time and the peak
+Python memory (tracemalloc) of each case, and compares them to a baseline.
+
+    python -m benchmarks.micro --save-baseline
+    python -m benchmarks.micro --filter translate
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+from transformers import MarianMTModel, MarianTokenizer
+from app.config.logging_config import logger
+from app.config.settings import MODELS_DIR
+from app.services import ai_client, translation
+from app.services.ai_client import ThinkFilter, filter_model_response
+from app.services.summarization import image
+from app.services.summarization.pdf import extract_text_from_pdf
+from app.utils import temp_manager
+from app.utils.model_registry import ModelRegistry
+from benchmarks.tiny_marian import build_tiny_marian
+from benchmarks.workload import make_pdf
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, ".fixtures")
+DEFAULT_BASELINE = os.path.join(HERE, "baselines", "micro.json")
+
+PORTUGUESE = (
+    "O sistema recebe documentos, imagens e gravações e devolve um resumo. "
+    "Cada pedido é colocado numa fila e processado por um trabalhador. "
+)
+ENGLISH = (
+    "The system receives documents, images and recordings and returns a "
+    "summary. Each request is queued and processed by a worker. "
+)
+
+
+class Case(NamedTuple):
+    name: str
+    # Returns the argument of run, called before every repetition, untimed
+    setup: Callable
+    run: Callable
+    repeat: int = 5
+
+
+def _text(base: str, chars: int) -> str:
+    paragraph = (base * 8).strip() + "\n\n"
+    return (paragraph * (chars // len(paragraph) + 1))[:chars]
+
+
+def pdf_fixture(pages: int) -> str:
+    path = os.path.join(FIXTURES_DIR, f"document-{pages}.pdf")
+    if not os.path.exists(path):
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        with open(path, "wb") as pdf:
+            pdf.write(make_pdf(pages))
+    return path
+
+
+def image_fixture(megabytes: int) -> str:
+    path = os.path.join(FIXTURES_DIR, f"image-{megabytes}mb.bin")
+    if not os.path.exists(path):
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        with open(path, "wb") as output:
+            output.write(os.urandom(megabytes * 1024 * 1024))
+    return path
+
+
+def temp_dir_fixture(files: int) -> str:
+    """A directory holding exactly files empty files"""
+    path = os.path.join(FIXTURES_DIR, f"temp-{files}")
+    os.makedirs(path, exist_ok=True)
+    existing = len(os.listdir(path))
+    for index in range(existing, files):
+        open(os.path.join(path, f"{index}.tmp"), "wb").close()
+    return path
+
+
+def load_translation_pair(tiny: bool):
+    """
+    (pt->en, en->pt) model and tokenizer pairs, and a label saying which were
+    used. The real models are only used when they are already cached.
+    """
+    names = ("Helsinki-NLP/opus-mt-ROMANCE-en", "Helsinki-NLP/opus-mt-tc-big-en-pt")
+    if not tiny:
+        try:
+            pairs = [
+                (
+                    MarianMTModel.from_pretrained(
+                        name, cache_dir=MODELS_DIR, local_files_only=True
+                    ),
+                    MarianTokenizer.from_pretrained(
+                        name, cache_dir=MODELS_DIR, local_files_only=True
+                    ),
+                )
+                for name in names
+            ]
+            return pairs[0], pairs[1], "pretrained"
+        except OSError:
+            pass
+    tiny_pair = build_tiny_marian(os.path.join(FIXTURES_DIR, "tiny-marian"))
+    return tiny_pair, tiny_pair, "tiny-random"
+
+
+def stream_through_filter(pieces: list[str]) -> str:
+    think_filter = ThinkFilter()
+    text = "".join(think_filter.feed(piece) for piece in pieces)
+    return text + think_filter.flush()
+
+
+def build_cases(tiny: bool) -> tuple[list[Case], dict]:
+    pt_en, en_pt, model_label = load_translation_pair(tiny)
+    translation.translation_registry = ModelRegistry(
+        "translation", {"pt-en": pt_en, "en-pt": en_pt}.__getitem__, max_models=2
+    )
+    translation.configure_torch_threads()
+    # The first generate call pays for torch's lazy initialisation
+    translation.translate_pt_to_en(PORTUGUESE)
+    translation.translate_en_to_pt(ENGLISH)
+
+    # Only the file reading and encoding of the image stage is measured
+    ai_client.OllamaClient.generate = staticmethod(lambda *args, **kwargs: "")
+
+    def cleanup(files: int, expired: bool):
+        def setup():
+            directory = temp_dir_fixture(files)
+            temp_manager.TEMP_DIR = directory
+            temp_manager.TEMP_FILE_MAX_AGE = -1 if expired else 3600
+
+        return setup
+
+    def constant(value):
+        return lambda: value
+
+    cases = []
+    for pages in (1, 50, 500):
+        cases.append(
+            Case(
+                f"extract_text_from_pdf[{pages}p]",
+                constant(pdf_fixture(pages)),
+                extract_text_from_pdf,
+                repeat=3 if pages == 500 else 5,
+            )
+        )
+    for chars, label in ((1_000, "1k"), (100_000, "100k")):
+        repeat = 1 if chars > 1_000 else 3
+        cases.append(
+            Case(
+                f"translate_pt_to_en[{label}]",
+                constant(_text(PORTUGUESE, chars)),
+                translation.translate_pt_to_en,
+                repeat,
+            )
+        )
+        cases.append(
+            Case(
+                f"translate_en_to_pt[{label}]",
+                constant(_text(ENGLISH, chars)),
+                translation.translate_en_to_pt,
+                repeat,
+            )
+        )
+        response = f"<think>{_text(ENGLISH, chars)}</think>\n\n{_text(ENGLISH, chars)}"
+        cases.append(
+            Case(
+                f"filter_model_response[{label}]",
+                constant(response),
+                filter_model_response,
+            )
+        )
+        # Streamed responses arrive a token at a time
+        tokens = [response[i : i + 4] for i in range(0, len(response), 4)]
+        cases.append(
+            Case(
+                f"think_filter_stream[{label}]",
+                constant(tokens),
+                stream_through_filter,
+            )
+        )
+    for expired in (False, True):
+        cases.append(
+            Case(
+                f"cleanup_temp_files[10k, {'expired' if expired else 'fresh'}]",
+                cleanup(10_000, expired),
+                lambda _: temp_manager.cleanup_temp_files(),
+            )
+        )
+    for megabytes in (1, 10):
+        cases.append(
+            Case(
+                f"generate_image_summary_encoding[{megabytes}MB]",
+                constant(image_fixture(megabytes)),
+                image.generate_image_summary,
+            )
+        )
+    return cases, {"translation_model": model_label}
+
+
+def measure(case: Case, repeat_scale: float) -> dict:
+    """Median and best time over the repetitions, then one traced run for memory"""
+    repeat = max(1, round(case.repeat * repeat_scale))
+    times = []
+    for _ in range(repeat):
+        argument = case.setup()
+        start = time.perf_counter()
+        case.run(argument)
+        times.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocations down, so memory is measured separately
+    argument = case.setup()
+    tracemalloc.start()
+    try:
+        case.run(argument)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "repeat": repeat,
+        "median_seconds": round(statistics.median(times), 6),
+        "min_seconds": round(min(times), 6),
+        "peak_bytes": peak,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Cases that got slower or hungrier than the baseline beyond tolerance"""
+    regressions = []
+    for name, result in report["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+        # Sub-millisecond cases are dominated by noise
+        if result["median_seconds"] > before["median_seconds"] * (1 + tolerance) + 1e-3:
+            regressions.append(
+                f"{name}: {before['median_seconds']:.4f} -> "
+                f"{result['median_seconds']:.4f} s"
+            )
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + tolerance) + 65536:
+            regressions.append(
+                f"{name}: peak {before['peak_bytes'] / 1e6:.1f} -> "
+                f"{result['peak_bytes'] / 1e6:.1f} MB"
+            )
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", default="", help="Run cases containing this")
+    parser.add_argument(
+        "--repeat-scale", type=float, default=1.0, help="Scale every case's repeats"
+    )
+    parser.add_argument(
+        "--tiny", action="store_true", help="Use the tiny model even if cached"
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", help="Also write the report JSON here")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    # Keep the per-file cleanup log lines out of the timings
+    logger.disabled = True
+
+    cases, environment = build_cases(args.tiny)
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            **environment,
+        },
+        "cases": {},
+    }
+    print(f"{'case':48}{'median s':>11}{'min s':>11}{'peak MB':>10}")
+    for case in cases:
+        if args.filter not in case.name:
+            continue
+        result = measure(case, args.repeat_scale)
+        report["cases"][case.name] = result
+        print(
+            f"{case.name:48}{result['median_seconds']:>11.4f}"
+            f"{result['min_seconds']:>11.4f}{result['peak_bytes'] / 1e6:>10.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, record one with --save-baseline")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["environment"] != report["environment"]:
+        # Timings from another machine or model would only report noise
+        print(
+            f"Baseline {args.baseline} was recorded in a different environment, "
+            "not comparing. Record one here with --save-baseline."
+        )
+        return 0
+    regressions = compare(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# benchmarks/translation_quality.py
+"""
+Compare the int8 translation backend with fp32 on a fixed sample set: speed,
+model size, and how closely the int8 output matches the fp32 output (chrF,
+where 100 means identical).
+
+    python -m benchmarks.translation_quality
+    python -m benchmarks.translation_quality --min-chrf 90 --direction en-pt
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from app.config.logging_config import logger
+from app.services import translation
+from app.services.translation import load_marian_model, quantized_model_path
+from benchmarks.micro import FIXTURES_DIR
+from benchmarks.tiny_marian import build_tiny_marian
+
+PORTUGUESE_SAMPLES = [
+    "O relatório foi entregue ao conselho na semana passada.",
+    "As vendas cresceram doze por cento no primeiro trimestre.",
+    "O sistema recebe documentos, imagens e gravações e devolve um resumo.",
+    "Cada pedido é colocado numa fila e processado por um trabalhador.",
+    "A reunião foi adiada porque metade da equipe estava doente.",
+    "Os dados mostram que o tempo de espera diminuiu depois da mudança.",
+    "Precisamos de uma resposta até sexta-feira, no máximo.",
+    "A cidade anunciou um novo plano para o transporte público.",
+    "O contrato prevê multas em caso de atraso na entrega.",
+    "Não foi possível confirmar a informação junto ao governo.",
+]
+ENGLISH_SAMPLES = [
+    "The report was delivered to the board last week.",
+    "Sales grew twelve percent in the first quarter.",
+    "The system receives documents, images and recordings and returns a summary.",
+    "Each request is queued and processed by a worker.",
+    "The meeting was postponed because half of the team was sick.",
+    "The data shows that waiting times went down after the change.",
+    "We need an answer by Friday at the latest.",
+    "The city announced a new plan for public transport.",
+    "The contract sets fines for late delivery.",
+    "The information could not be confirmed with the government.",
+]
+DIRECTIONS = {
+    "pt-en": ("Helsinki-NLP/opus-mt-ROMANCE-en", PORTUGUESE_SAMPLES),
+    "en-pt": ("Helsinki-NLP/opus-mt-tc-big-en-pt", ENGLISH_SAMPLES),
+}
+
+
+def _ngrams(text: str, n: int) -> Counter:
+    text = "".join(text.split())
+    return Counter(text[i : i + n] for i in range(len(text) - n + 1))
+
+
+def chrf(hypotheses: list[str], references: list[str], order: int = 6) -> float:
+    """Corpus-level chrF (character n-gram F2 score) on a 0-100 scale"""
+    matches, hypothesis_total, reference_total = [0] * order, [0] * order, [0] * order
+    for hypothesis, reference in zip(hypotheses, references):
+        for n in range(1, order + 1):
+            hypothesis_ngrams = _ngrams(hypothesis, n)
+            reference_ngrams = _ngrams(reference, n)
+            matches[n - 1] += sum((hypothesis_ngrams & reference_ngrams).values())
+            hypothesis_total[n - 1] += sum(hypothesis_ngrams.values())
+            reference_total[n - 1] += sum(reference_ngrams.values())
+
+    orders = [n for n in range(order) if hypothesis_total[n] and reference_total[n]]
+    if not orders:
+        return 100.0 if hypotheses == references else 0.0
+    precision = sum(matches[n] / hypothesis_total[n] for n in orders) / len(orders)
+    recall = sum(matches[n] / reference_total[n] for n in orders) / len(orders)
+    if precision + recall == 0:
+        return 0.0
+    beta_squared = 4
+    score = (1 + beta_squared) * precision * recall
+    return 100 * score / (beta_squared * precision + recall)
+
+
+def _translate(model, tokenizer, samples: list[str], repeat: int):
+    """Translations of the samples, one per paragraph, and the best time"""
+    text = "\n\n".join(samples)
+    # The first generate call pays for torch's lazy initialisation
+    translation.translate_text(text, model, tokenizer)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = translation.translate_text(text, model, tokenizer)
+        times.append(time.perf_counter() - start)
+    return output.split("\n\n"), min(times)
+
+
+def _parameter_bytes(model) -> int:
+    return sum(p.numel() * p.element_size() for p in model.state_dict().values())
+
+
+def compare_backends(model_name: str, samples: list[str], repeat: int) -> dict:
+    fp32_model, tokenizer = load_marian_model(model_name, backend="fp32")
+    int8_model, _ = load_marian_model(model_name, backend="int8")
+    fp32_output, fp32_seconds = _translate(fp32_model, tokenizer, samples, repeat)
+    int8_output, int8_seconds = _translate(int8_model, tokenizer, samples, repeat)
+    return {
+        "model": model_name,
+        "samples": len(samples),
+        "chrf": round(chrf(int8_output, fp32_output), 2),
+        "identical": sum(a == b for a, b in zip(int8_output, fp32_output)),
+        "fp32_seconds": round(fp32_seconds, 4),
+        "int8_seconds": round(int8_seconds, 4),
+        "speedup": round(fp32_seconds / int8_seconds, 2),
+        "fp32_mb": round(_parameter_bytes(fp32_model) / 1e6, 1),
+        "int8_mb": round(os.path.getsize(quantized_model_path(model_name)) / 1e6, 1),
+        "differences": [
+            {"fp32": a, "int8": b} for a, b in zip(fp32_output, int8_output) if a != b
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--direction", choices=list(DIRECTIONS), action="append")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--min-chrf", type=float, default=0, help="Exit with 1 below this score"
+    )
+    parser.add_argument(
+        "--tiny",
+        action="store_true",
+        help="Use a tiny random model, to check the pipeline offline",
+    )
+    parser.add_argument("--output", help="Also write the report JSON here")
+    args = parser.parse_args()
+    logger.disabled = True
+    translation.configure_torch_threads()
+
+    directions = {name: DIRECTIONS[name] for name in args.direction or DIRECTIONS}
+    if args.tiny:
+        tiny_directory = os.path.join(FIXTURES_DIR, "tiny-marian")
+        build_tiny_marian(tiny_directory)
+        # Keep the tiny model's int8 artifact out of the real model cache
+        translation.MODELS_DIR = FIXTURES_DIR
+        directions = {
+            name: (tiny_directory, samples) for name, (_, samples) in directions.items()
+        }
+
+    report = {}
+    failed = False
+    for name, (model_name, samples) in directions.items():
+        result = compare_backends(model_name, samples, args.repeat)
+        report[name] = result
+        failed |= result["chrf"] < args.min_chrf
+        print(
+            f"{name}: chrF {result['chrf']:.1f}, "
+            f"{result['identical']}/{result['samples']} identical, "
+            f"{result['fp32_seconds']:.3f} s -> {result['int8_seconds']:.3f} s "
+            f"(x{result['speedup']}), "
+            f"{result['fp32_mb']:.1f} MB -> {result['int8_mb']:.1f} MB"
+        )
+        for difference in result["differences"]:
+            print(f"  fp32: {difference['fp32']}\n  int8: {difference['int8']}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
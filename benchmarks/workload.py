@@ -0,0 +1,147 @@
+# benchmarks/workload.py
+"""
+Build a load-test workload: one JSON object per line describing a file to
+submit. Text can be taken from the "body" or "text" fields of any JSONL file.
+
+    python -m benchmarks.workload --from-jsonl requests.jsonl --count 200 \\
+        --mix text=6,pdf=3,image=1 -o benchmarks/workload.jsonl
+"""
+
+import argparse
+import io
+import json
+import math
+import random
+import struct
+import wave
+import fitz  # PyMuPDF
+from app.core.enums import FileType
+
+LOREM = (
+    "Synthia summarizes documents, images and recordings. Each request is "
+    "queued, processed by a worker and returned to the caller once done. "
+)
+
+# Item sizes are picked from these, per file type
+SIZES = {
+    "text": {"chars": [1_000, 5_000, 20_000]},
+    "pdf": {"pages": [1, 5, 20]},
+    "image": {"width": [256, 640, 1280]},
+    "audio": {"seconds": [5, 30, 120]},
+}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parse 'text=6,pdf=3' into relative weights"""
+    weights = {}
+    for part in mix.split(","):
+        file_type, _, weight = part.partition("=")
+        FileType(file_type.strip())
+        weights[file_type.strip()] = float(weight or 1)
+    return weights
+
+
+def load_texts(path: str) -> list[str]:
+    texts = []
+    with open(path) as source:
+        for line in source:
+            if line.strip():
+                record = json.loads(line)
+                text = record.get("body") or record.get("text")
+                if text:
+                    texts.append(text)
+    return texts
+
+
+def generate_workload(
+    count: int,
+    mix: dict[str, float],
+    texts: list[str] | None = None,
+    target_language: str = "en",
+    seed: int = 0,
+) -> list[dict]:
+    rng = random.Random(seed)
+    file_types = list(mix)
+    weights = [mix[file_type] for file_type in file_types]
+    items = []
+    for index in range(count):
+        file_type = rng.choices(file_types, weights)[0]
+        item = {"file_type": file_type, "target_language": target_language}
+        if file_type == "text" and texts:
+            item["text"] = texts[index % len(texts)]
+        else:
+            for field, choices in SIZES[file_type].items():
+                item[field] = rng.choice(choices)
+        items.append(item)
+    return items
+
+
+def _text(chars: int) -> str:
+    return (LOREM * (chars // len(LOREM) + 1))[:chars]
+
+
+def make_pdf(pages: int) -> bytes:
+    with fitz.open() as doc:
+        for number in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (36, 36, -36, -36), _text(2_500))
+        return doc.tobytes()
+
+
+def make_png(width: int) -> bytes:
+    height = width * 3 // 4
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), False)
+    pixmap.set_rect(pixmap.irect, (90, 140, 200))
+    return pixmap.tobytes("png")
+
+
+def make_wav(seconds: int, sample_rate: int = 16000) -> bytes:
+    """A 440 Hz tone, speech is not needed to load the transcription stage"""
+    frames = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)))
+        for i in range(seconds * sample_rate)
+    )
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+def materialize(item: dict) -> tuple[str, bytes]:
+    """File name and content of a workload item"""
+    file_type = item["file_type"]
+    if file_type == "text":
+        text = item.get("text") or _text(item["chars"])
+        return "document.txt", text.encode()
+    if file_type == "pdf":
+        return "document.pdf", make_pdf(item["pages"])
+    if file_type == "image":
+        return "image.png", make_png(item["width"])
+    return "recording.wav", make_wav(item["seconds"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--mix", default="text=6,pdf=3,image=1")
+    parser.add_argument("--from-jsonl", help="Take text items from this file")
+    parser.add_argument("--target-language", default="en")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmarks/workload.jsonl")
+    args = parser.parse_args()
+
+    texts = load_texts(args.from_jsonl) if args.from_jsonl else None
+    items = generate_workload(
+        args.count, parse_mix(args.mix), texts, args.target_language, args.seed
+    )
+    with open(args.output, "w") as output:
+        for item in items:
+            output.write(json.dumps(item) + "\n")
+    print(f"Wrote {len(items)} items to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
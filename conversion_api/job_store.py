@@ -0,0 +1,207 @@
+# conversion_api/job_store.py
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+FIELDS = [
+    "job_id",
+    "status",
+    "input_file",
+    "output_file",
+    "error",
+    "start_time",
+    "end_time",
+]
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class JobStore(ABC):
+    """Conversion job records shared by every process of the service"""
+
+    @abstractmethod
+    def create(self, job: Dict) -> None: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None: ...
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None: ...
+
+    @abstractmethod
+    def count_by_status(self) -> Dict[str, int]: ...
+
+    @abstractmethod
+    def finished_before(self, timestamp: float) -> List[Dict]:
+        """Completed or failed jobs that ended before timestamp"""
+        ...
+
+    @abstractmethod
+    def unfinished_before(self, timestamp: float) -> List[Dict]:
+        """Pending or processing jobs that started before timestamp"""
+        ...
+
+
+class SQLiteJobStore(JobStore):
+    """Job store in a SQLite file, for several processes on one host"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL lets readers in other processes work while one process writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    input_file TEXT NOT NULL,
+                    output_file TEXT,
+                    error TEXT,
+                    start_time REAL NOT NULL,
+                    end_time REAL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, end_time)"
+            )
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self._lock, self._conn:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def create(self, job: Dict) -> None:
+        placeholders = ", ".join("?" for _ in FIELDS)
+        self._query(
+            f"INSERT INTO jobs ({', '.join(FIELDS)}) VALUES ({placeholders})",
+            [job.get(field) for field in FIELDS],
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def update(self, job_id: str, **fields) -> None:
+        assignments = ", ".join(f"{field} = ?" for field in fields)
+        self._query(
+            f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+            [*fields.values(), job_id],
+        )
+
+    def delete(self, job_id: str) -> None:
+        self._query("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def count_by_status(self) -> Dict[str, int]:
+        rows = self._query("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+    def finished_before(self, timestamp: float) -> List[Dict]:
+        return self._query(
+            "SELECT * FROM jobs WHERE status IN (?, ?) AND end_time < ?",
+            (*FINISHED_STATUSES, timestamp),
+        )
+
+    def unfinished_before(self, timestamp: float) -> List[Dict]:
+        return self._query(
+            "SELECT * FROM jobs WHERE status NOT IN (?, ?) AND start_time < ?",
+            (*FINISHED_STATUSES, timestamp),
+        )
+
+
+class RedisJobStore(JobStore):
+    """Job store in Redis, for processes spread over several hosts"""
+
+    PREFIX = "conversion"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.PREFIX}:job:{job_id}"
+
+    def _status_key(self, status: str) -> str:
+        return f"{self.PREFIX}:status:{status}"
+
+    @staticmethod
+    def _decode(data: Dict) -> Dict:
+        job = {field: data.get(field) for field in FIELDS}
+        for field in ("start_time", "end_time"):
+            if job[field] is not None:
+                job[field] = float(job[field])
+        return job
+
+    def create(self, job: Dict) -> None:
+        with self._redis.pipeline() as pipe:
+            pipe.hset(
+                self._key(job["job_id"]),
+                mapping={k: v for k, v in job.items() if v is not None},
+            )
+            pipe.zadd(
+                self._status_key(job["status"]), {job["job_id"]: job["start_time"]}
+            )
+            pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        data = self._redis.hgetall(self._key(job_id))
+        return self._decode(data) if data else None
+
+    def update(self, job_id: str, **fields) -> None:
+        old_status = self._redis.hget(self._key(job_id), "status")
+        with self._redis.pipeline() as pipe:
+            pipe.hset(
+                self._key(job_id),
+                mapping={k: v for k, v in fields.items() if v is not None},
+            )
+            status = fields.get("status")
+            if status and status != old_status:
+                # Status sets are scored by start time, or end time once finished
+                score = fields.get("end_time") or self._redis.hget(
+                    self._key(job_id), "start_time"
+                )
+                pipe.zrem(self._status_key(old_status), job_id)
+                pipe.zadd(self._status_key(status), {job_id: float(score)})
+            pipe.execute()
+
+    def delete(self, job_id: str) -> None:
+        status = self._redis.hget(self._key(job_id), "status")
+        with self._redis.pipeline() as pipe:
+            pipe.delete(self._key(job_id))
+            if status:
+                pipe.zrem(self._status_key(status), job_id)
+            pipe.execute()
+
+    def count_by_status(self) -> Dict[str, int]:
+        statuses = ["pending", "processing", *FINISHED_STATUSES]
+        with self._redis.pipeline() as pipe:
+            for status in statuses:
+                pipe.zcard(self._status_key(status))
+            counts = pipe.execute()
+        return {status: n for status, n in zip(statuses, counts) if n}
+
+    def _jobs_scored_before(self, statuses, timestamp: float) -> List[Dict]:
+        jobs = []
+        for status in statuses:
+            for job_id in self._redis.zrangebyscore(
+                self._status_key(status), "-inf", f"({timestamp}"
+            ):
+                job = self.get(job_id)
+                if job:
+                    jobs.append(job)
+        return jobs
+
+    def finished_before(self, timestamp: float) -> List[Dict]:
+        return self._jobs_scored_before(FINISHED_STATUSES, timestamp)
+
+    def unfinished_before(self, timestamp: float) -> List[Dict]:
+        return self._jobs_scored_before(("pending", "processing"), timestamp)
+
+
+def make_job_store(redis_url: Optional[str], sqlite_path: str) -> JobStore:
+    """Redis store when a URL is configured, SQLite otherwise"""
+    if redis_url:
+        return RedisJobStore(redis_url)
+    return SQLiteJobStore(sqlite_path)
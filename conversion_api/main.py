@@ -1,13 +1,16 @@
 # conversion_api/main.py
-from fastapi import FastAPI, UploadFile, File, BackgroundTasks, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
+import asyncio
 import os
 import uuid
 import shutil
-import subprocess
 from pydantic import BaseModel
 import time
-from typing import Dict, Optional
+from typing import Optional
+from job_store import make_job_store
+from scheduler import ConversionScheduler
 
 app = FastAPI(title="Audio Conversion API")
 
@@ -15,13 +18,39 @@ app = FastAPI(title="Audio Conversion API")
 UPLOAD_DIR = os.path.join(os.getcwd(), "uploads")
 OUTPUT_DIR = os.path.join(os.getcwd(), "converted")
 ALLOWED_EXTENSIONS = [".mp3", ".ogg", ".m4a", ".flac", ".aac", ".wma", ".opus"]
+MAX_CONCURRENT_CONVERSIONS = int(
+    os.getenv("MAX_CONCURRENT_CONVERSIONS", str(os.cpu_count() or 1))
+)
+CONVERSION_TIMEOUT = int(os.getenv("CONVERSION_TIMEOUT", "120"))  # seconds
+# Finished jobs and their outputs are removed this long after they end
+OUTPUT_TTL = int(os.getenv("CONVERSION_OUTPUT_TTL", "3600"))
+CLEANUP_INTERVAL = int(os.getenv("CONVERSION_CLEANUP_INTERVAL", "300"))
+# Unfinished jobs older than this belonged to a process that died
+STALE_JOB_AGE = int(os.getenv("CONVERSION_STALE_JOB_AGE", "3600"))
+# Job state is shared through Redis when configured, a SQLite file otherwise
+JOB_STORE_REDIS_URL = os.getenv("CONVERSION_REDIS_URL")
+JOB_STORE_PATH = os.getenv(
+    "CONVERSION_DB_PATH", os.path.join(os.getcwd(), "conversion_jobs.sqlite3")
+)
 
 # Ensure directories exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# In-memory job tracking
-conversion_jobs: Dict[str, Dict] = {}
+# Job tracking shared by every uvicorn worker process. Store calls can wait on
+# another process's SQLite write lock or on Redis, so handlers run them in the
+# threadpool to keep the event loop and the ffmpeg workers going.
+job_store = make_job_store(JOB_STORE_REDIS_URL, JOB_STORE_PATH)
+scheduler = ConversionScheduler(
+    job_store, MAX_CONCURRENT_CONVERSIONS, CONVERSION_TIMEOUT
+)
+
+
+class QueueStatus(BaseModel):
+    max_concurrent: int
+    active: int  # conversions running in this process
+    queued: int  # jobs waiting for a free slot in this process
+    jobs: dict  # job counts by status across all processes
 
 
 class ConversionStatus(BaseModel):
@@ -35,9 +64,7 @@ class ConversionStatus(BaseModel):
 
 
 @app.post("/convert/", response_model=ConversionStatus)
-async def convert_audio(
-    background_tasks: BackgroundTasks, file: UploadFile = File(...)
-):
+async def convert_audio(file: UploadFile = File(...)):
     """Upload and convert audio file to WAV format"""
     # Validate file extension
     filename = file.filename
@@ -68,10 +95,10 @@ async def convert_audio(
         input_file=unique_filename,
         start_time=time.time(),
     )
-    conversion_jobs[job_id] = job_status.dict()
+    await run_in_threadpool(job_store.create, job_status.dict())
 
-    # Schedule background conversion
-    background_tasks.add_task(convert_file, job_id, upload_path, output_path)
+    # Queue the conversion, it runs once an ffmpeg slot is free
+    await scheduler.submit(job_id, upload_path, output_path)
 
     return job_status
 
@@ -79,20 +106,32 @@ async def convert_audio(
 @app.get("/status/{job_id}", response_model=ConversionStatus)
 async def get_conversion_status(job_id: str):
     """Get status of a conversion job"""
-    if job_id not in conversion_jobs:
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return conversion_jobs[job_id]
+    return job
+
+
+@app.get("/queue", response_model=QueueStatus)
+async def get_queue_status():
+    """Get the conversion queue depth and job counts"""
+    jobs = await run_in_threadpool(job_store.count_by_status)
+    return QueueStatus(
+        max_concurrent=scheduler.max_concurrent,
+        active=scheduler.active,
+        queued=scheduler.queue_depth,
+        jobs=jobs,
+    )
 
 
 @app.get("/download/{job_id}")
 async def download_converted_file(job_id: str):
     """Download a converted WAV file"""
-    if job_id not in conversion_jobs:
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job = conversion_jobs[job_id]
-
     if job["status"] != "completed":
         raise HTTPException(
             status_code=400,
@@ -111,82 +150,46 @@ async def download_converted_file(job_id: str):
     )
 
 
-def convert_file(job_id: str, input_path: str, output_path: str):
-    """Background task to convert audio file to WAV"""
+def remove_file(file_path: str):
     try:
-        # Update job status
-        conversion_jobs[job_id]["status"] = "processing"
-
-        # Run ffmpeg conversion
-        cmd = [
-            "ffmpeg",
-            "-i",
-            input_path,
-            "-ar",
-            "16000",
-            "-ac",
-            "1",
-            "-c:a",
-            "pcm_s16le",
-            "-y",
-            output_path,
-        ]
-
-        # Run the conversion process with a timeout
-        process = subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False,  # Don't raise exception, we'll handle errors manually
-            timeout=120,  # 2-minute timeout
-        )
-
-        # Check if conversion was successful
-        if process.returncode != 0:
-            raise Exception(
-                f"ffmpeg error (code {process.returncode}): {process.stderr}"
-            )
+        if os.path.isfile(file_path):
+            os.remove(file_path)
+    except Exception as e:
+        print(f"Error cleaning up file {file_path}: {e}")
 
-        # Validate output file exists and has content
-        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
-            raise Exception("Conversion failed: output file is empty or missing")
 
-        # Update job status to completed
-        conversion_jobs[job_id]["status"] = "completed"
-        conversion_jobs[job_id]["output_file"] = os.path.basename(output_path)
-        conversion_jobs[job_id]["end_time"] = time.time()
+def cleanup_expired_jobs():
+    """Remove finished jobs past their TTL and fail jobs left by dead processes"""
+    now = time.time()
+    for job in job_store.finished_before(now - OUTPUT_TTL):
+        if job["output_file"]:
+            remove_file(os.path.join(OUTPUT_DIR, job["output_file"]))
+        job_store.delete(job["job_id"])
 
-        # Cleanup input file
-        if os.path.exists(input_path):
-            os.remove(input_path)
+    for job in job_store.unfinished_before(now - STALE_JOB_AGE):
+        remove_file(os.path.join(UPLOAD_DIR, job["input_file"]))
+        job_store.update(
+            job["job_id"], status="failed", error="Conversion interrupted", end_time=now
+        )
 
-    except subprocess.TimeoutExpired:
-        # Handle timeout
-        conversion_jobs[job_id]["status"] = "failed"
-        conversion_jobs[job_id]["error"] = "Conversion timed out"
-        conversion_jobs[job_id]["end_time"] = time.time()
 
-    except Exception as e:
-        # Handle other errors
-        conversion_jobs[job_id]["status"] = "failed"
-        conversion_jobs[job_id]["error"] = str(e)
-        conversion_jobs[job_id]["end_time"] = time.time()
+async def periodic_cleanup():
+    while True:
+        try:
+            await run_in_threadpool(cleanup_expired_jobs)
+        except Exception as e:
+            print(f"Error cleaning up expired jobs: {e}")
+        await asyncio.sleep(CLEANUP_INTERVAL)
 
-        # Cleanup any partial output
-        if os.path.exists(output_path):
-            os.remove(output_path)
 
-
-# Add cleanup task (optional)
 @app.on_event("startup")
 async def startup_event():
-    # Clear any old files from previous runs
-    for dir_path in [UPLOAD_DIR, OUTPUT_DIR]:
-        for filename in os.listdir(dir_path):
-            file_path = os.path.join(dir_path, filename)
-            try:
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"Error cleaning up file {file_path}: {e}")
+    scheduler.start()
+    # Other processes may share the directories, so expire by TTL only
+    app.state.cleanup_task = asyncio.create_task(periodic_cleanup())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.cleanup_task.cancel()
+    await scheduler.stop()
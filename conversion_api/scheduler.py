@@ -0,0 +1,139 @@
+# conversion_api/scheduler.py
+import asyncio
+import os
+import time
+from typing import List, Optional
+from job_store import JobStore
+
+
+class ConversionScheduler:
+    """
+    Runs ffmpeg conversions from a FIFO queue with a bounded number of
+    concurrent processes.
+    """
+
+    def __init__(self, store: JobStore, max_concurrent: int, timeout: int):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.active = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs accepted by this process that are waiting for a free slot"""
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        # Created here so the queue belongs to the server's event loop
+        self._queue = asyncio.Queue()
+        for _ in range(self.max_concurrent):
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    async def submit(self, job_id: str, input_path: str, output_path: str):
+        await self._queue.put((job_id, input_path, output_path))
+
+    async def _work(self):
+        while True:
+            job_id, input_path, output_path = await self._queue.get()
+            self.active += 1
+            try:
+                await convert_file(
+                    self.store, job_id, input_path, output_path, self.timeout
+                )
+            finally:
+                self.active -= 1
+                self._queue.task_done()
+
+
+async def convert_file(
+    store: JobStore, job_id: str, input_path: str, output_path: str, timeout: int
+):
+    """
+    Convert an audio file to WAV with ffmpeg, recording the outcome. Store
+    calls run in a thread, they may block on a lock held by another process.
+    """
+    process = None
+    try:
+        # Update job status
+        await asyncio.to_thread(store.update, job_id, status="processing")
+
+        # Run ffmpeg conversion
+        cmd = [
+            "ffmpeg",
+            "-i",
+            input_path,
+            "-ar",
+            "16000",
+            "-ac",
+            "1",
+            "-c:a",
+            "pcm_s16le",
+            "-y",
+            output_path,
+        ]
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+
+        # Check if conversion was successful
+        if process.returncode != 0:
+            raise Exception(
+                f"ffmpeg error (code {process.returncode}): "
+                f"{stderr.decode(errors='ignore')}"
+            )
+
+        # Validate output file exists and has content
+        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            raise Exception("Conversion failed: output file is empty or missing")
+
+        # Update job status to completed
+        await asyncio.to_thread(
+            store.update,
+            job_id,
+            status="completed",
+            output_file=os.path.basename(output_path),
+            end_time=time.time(),
+        )
+
+    except asyncio.TimeoutError:
+        # Handle timeout
+        process.kill()
+        await process.wait()
+        await asyncio.to_thread(
+            store.update,
+            job_id,
+            status="failed",
+            error="Conversion timed out",
+            end_time=time.time(),
+        )
+        _remove(output_path)
+
+    except Exception as e:
+        # Handle other errors
+        await asyncio.to_thread(
+            store.update, job_id, status="failed", error=str(e), end_time=time.time()
+        )
+
+        # Cleanup any partial output
+        _remove(output_path)
+
+    finally:
+        # Cleanup input file
+        _remove(input_path)
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        os.remove(path)
@@ -48,7 +48,8 @@ def mock_ollama_response(monkeypatch):
 
         return MockResponse()
 
-    # Patch the requests.post method
+    # Patch the requests.post method and the pooled session used by the clients
     import requests
 
     monkeypatch.setattr(requests, "post", mock_post)
+    monkeypatch.setattr(requests.Session, "post", mock_post)
@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+# The API's import and startup targets. FastAPI itself takes a good part of
+# the import budget on slow machines, so CI can raise it through the env
+IMPORT_BUDGET = float(os.getenv("API_IMPORT_BUDGET_SECONDS", "1.0"))
+STARTUP_BUDGET = float(os.getenv("API_STARTUP_BUDGET_SECONDS", "1.0"))
+
+# Only the workers may load these
+HEAVY_MODULES = ["torch", "whisper", "transformers", "fitz", "numba", "tiktoken"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/health")
+started = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "startup_seconds": started - imported,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def _probe() -> dict:
+    """Import and start the API in a fresh interpreter"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_api_does_not_import_worker_dependencies():
+    modules = set(_probe()["modules"])
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+
+
+def test_api_import_and_startup_within_budget():
+    # Best of three, the first run also warms the bytecode and disk caches
+    probes = [_probe() for _ in range(3)]
+    import_seconds = min(probe["import_seconds"] for probe in probes)
+    startup_seconds = min(probe["startup_seconds"] for probe in probes)
+    assert import_seconds < IMPORT_BUDGET
+    assert startup_seconds < STARTUP_BUDGET
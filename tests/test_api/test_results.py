@@ -0,0 +1,176 @@
+import threading
+import time
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from rq import Queue, SimpleWorker
+from rq.timeouts import TimerDeathPenalty
+from app.main import app
+from app.services.batches import record_batch
+
+
+def finished_summary():
+    return {"summary": "A summary.", "file_name": "document.txt"}
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """API client whose queue and pub/sub connections use a fake Redis"""
+    server = fakeredis.FakeServer()
+    connection = fakeredis.FakeRedis(server=server)
+    queue = Queue(connection=connection)
+    monkeypatch.setattr(app.state, "redis_queue", queue, raising=False)
+    monkeypatch.setattr(
+        app.state, "async_redis", fakeredis.FakeAsyncRedis(server=server), raising=False
+    )
+    return TestClient(app), queue
+
+
+class ThreadWorker(SimpleWorker):
+    """Worker that can run outside the main thread"""
+
+    death_penalty_class = TimerDeathPenalty
+
+    def _install_signal_handlers(self):
+        pass
+
+
+def run_worker_later(queue: Queue, delay: float) -> threading.Thread:
+    """Run the queued jobs in a worker thread after delay seconds"""
+
+    def work():
+        time.sleep(delay)
+        ThreadWorker([queue], connection=queue.connection).work(burst=True)
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    return thread
+
+
+def test_long_poll_returns_when_the_job_ends(redis_client):
+    """Test that wait returns as soon as the job's result is stored"""
+    client, queue = redis_client
+    job = queue.enqueue(f"{__name__}.finished_summary")
+    worker = run_worker_later(queue, 0.3)
+
+    start = time.monotonic()
+    response = client.get(f"/result/{job.id}", params={"wait": 10})
+    elapsed = time.monotonic() - start
+    worker.join()
+
+    assert response.json()["status"] == "completed"
+    assert response.json()["summary"] == "A summary."
+    assert elapsed < 5
+
+
+def test_long_poll_times_out_with_current_status(redis_client):
+    """Test that wait gives up after the requested time"""
+    client, queue = redis_client
+    job = queue.enqueue(f"{__name__}.finished_summary")
+
+    start = time.monotonic()
+    response = client.get(f"/result/{job.id}", params={"wait": 1})
+
+    assert response.json()["status"] == "queued"
+    assert 0.9 < time.monotonic() - start < 5
+
+
+def test_batch_counts_queued_jobs_as_pending(redis_client):
+    """Test that completed, failed and pending add up to the total"""
+    client, queue = redis_client
+    jobs = [queue.enqueue(f"{__name__}.finished_summary") for _ in range(2)]
+    with queue.connection.pipeline() as pipe:
+        record_batch(pipe, "batch", [job.id for job in jobs])
+        pipe.execute()
+
+    body = client.get("/batch/batch").json()
+
+    assert (body["total"], body["completed"], body["pending"]) == (2, 0, 2)
+
+
+def test_websocket_pushes_status_until_the_job_ends(redis_client):
+    """Test that client frames are ignored and the socket closes at the end"""
+    client, queue = redis_client
+    job = queue.enqueue(f"{__name__}.finished_summary")
+
+    with client.websocket_connect(f"/result/{job.id}/ws") as websocket:
+        assert websocket.receive_json()["status"] == "queued"
+        # Application-level pings must not be taken for a disconnect
+        websocket.send_text("ping")
+        worker = run_worker_later(queue, 0.3)
+        final = websocket.receive_json()
+        closing = websocket.receive()
+    worker.join()
+
+    assert final["status"] == "completed"
+    assert final["summary"] == "A summary."
+    assert closing["type"] == "websocket.close"
+
+
+@pytest.fixture
+def expired_job(redis_client, monkeypatch):
+    """A job that expires right after the endpoint has fetched it"""
+    client, queue = redis_client
+    job = queue.enqueue(f"{__name__}.finished_summary")
+    queue.connection.delete(job.key)
+    monkeypatch.setattr(
+        "app.api.endpoints.summarize.fetch_job", lambda connection, job_id: job
+    )
+    return client, job
+
+
+def test_long_poll_reports_an_expired_job_as_not_found(expired_job):
+    """Test that a job gone while it is being read gives a 404, not a 500"""
+    client, job = expired_job
+
+    response = client.get(f"/result/{job.id}", params={"wait": 1})
+
+    assert response.status_code == 404
+
+
+def test_websocket_closes_when_the_job_expires(expired_job):
+    """Test that the socket is closed as not found when the job is gone"""
+    client, job = expired_job
+
+    with client.websocket_connect(f"/result/{job.id}/ws") as websocket:
+        closing = websocket.receive()
+
+    assert closing["type"] == "websocket.close"
+    assert closing["code"] == 4404
+
+
+def test_stream_of_a_finished_job_sends_the_summary(redis_client):
+    """Test that the event stream of an ended job is just its final event"""
+    client, queue = redis_client
+    job = queue.enqueue(f"{__name__}.finished_summary")
+    run_worker_later(queue, 0).join()
+
+    response = client.get(f"/result/{job.id}/stream")
+
+    assert response.text.startswith("event: done\n")
+    assert "A summary." in response.text
+
+
+def test_stream_of_a_text_job_sends_tokens_as_they_come(redis_client, monkeypatch):
+    """Test that a /summarize/text job publishes its tokens and its end"""
+    client, queue = redis_client
+
+    def summarize(text, target_language, on_token=None):
+        for token in ("A ", "summary."):
+            on_token(token)
+        return "A summary."
+
+    monkeypatch.setattr("app.services.jobs.generate_text_summary", summarize)
+    job = queue.enqueue("app.services.jobs.process_text_summarization", "Text.", "en")
+    worker = run_worker_later(queue, 0.3)
+
+    start = time.monotonic()
+    response = client.get(f"/result/{job.id}/stream")
+    elapsed = time.monotonic() - start
+    worker.join()
+
+    assert "event: token" in response.text
+    assert 'event: done\ndata: {"type": "done", "summary": "A summary."}' in (
+        response.text
+    )
+    assert elapsed < 5
@@ -1,6 +1,11 @@
 import io
+import wave
+import fakeredis
 import pytest
+from rq.job import Job
+from app.config.settings import UPLOAD_MAX_SIZES
 from app.core.enums import FileType
+from app.services.queues import create_queues
 
 
 def test_summarize_text_file(client, sample_text_file, mock_ollama_response):
@@ -41,3 +46,83 @@ def test_direct_text_summarization(client, mock_ollama_response):
     data = response.json()
     assert "summary" in data
     assert data["file_type"] == FileType.TEXT
+
+
+def test_batch_rejects_mismatched_file_types(client):
+    """Test that a batch needs one file type per file, or a single one"""
+    files = [
+        ("files", (f"f{i}.txt", io.BytesIO(b"text"), "text/plain")) for i in range(3)
+    ]
+
+    response = client.post(
+        "/summarize/batch",
+        files=files,
+        data={"file_types": [FileType.TEXT.value, FileType.PDF.value]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_bulk_results_rejects_too_many_ids(client, monkeypatch):
+    """Test that bulk status lookups are capped"""
+    from app.api.endpoints import summarize
+
+    monkeypatch.setattr(summarize, "RESULTS_MAX_IDS", 2)
+
+    response = client.post("/results", json={"job_ids": ["a", "b", "c"]})
+
+    assert response.status_code == 413
+
+
+def test_batch_removes_saved_uploads_when_a_file_is_rejected(
+    client, monkeypatch, tmp_path
+):
+    """Test that a batch failing part way leaves no uploads behind"""
+    monkeypatch.setattr(
+        client.app.state, "queues", create_queues(fakeredis.FakeRedis()), raising=False
+    )
+    monkeypatch.setattr("app.utils.temp_manager.TEMP_DIR", str(tmp_path))
+    monkeypatch.setitem(UPLOAD_MAX_SIZES, FileType.TEXT.value, 10)
+    files = [
+        ("files", ("small.txt", io.BytesIO(b"short"), "text/plain")),
+        ("files", ("large.txt", io.BytesIO(b"far too long"), "text/plain")),
+    ]
+
+    response = client.post(
+        "/summarize/batch", files=files, data={"file_types": [FileType.TEXT.value]}
+    )
+
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_whisper_model_is_only_kept_for_audio(client, monkeypatch, tmp_path):
+    """Test that non-audio jobs don't carry a Whisper model they never use"""
+    connection = fakeredis.FakeRedis()
+    monkeypatch.setattr(
+        client.app.state, "queues", create_queues(connection), raising=False
+    )
+    monkeypatch.setattr("app.utils.temp_manager.TEMP_DIR", str(tmp_path))
+    audio = io.BytesIO()
+    with wave.open(audio, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\0\0" * 160)
+    files = [
+        ("files", ("notes.txt", io.BytesIO(b"Some notes."), "text/plain")),
+        ("files", ("voice.wav", io.BytesIO(audio.getvalue()), "audio/wav")),
+    ]
+
+    response = client.post(
+        "/summarize/batch",
+        files=files,
+        data={
+            "file_types": [FileType.TEXT.value, FileType.AUDIO.value],
+            "whisper_model": "tiny",
+        },
+    )
+
+    text_job, audio_job = Job.fetch_many(response.json()["job_ids"], connection)
+    assert text_job.args[4] is None
+    assert audio_job.args[4] == "tiny"
@@ -0,0 +1,48 @@
+import os
+import sys
+import pytest
+
+# The conversion API is run from its own directory and imports its modules flat
+CONVERSION_API_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "conversion_api"
+)
+if CONVERSION_API_DIR not in sys.path:
+    sys.path.insert(0, CONVERSION_API_DIR)
+
+from job_store import RedisJobStore, SQLiteJobStore  # noqa: E402
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def job_store(request, tmp_path, monkeypatch):
+    """Each job store backend, on a temporary file or a fake Redis"""
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+    import fakeredis
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs),
+    )
+    return RedisJobStore("redis://fake")
+
+
+def _make_job(job_id: str, status: str = "pending", start_time: float = 100.0):
+    return {
+        "job_id": job_id,
+        "status": status,
+        "input_file": f"{job_id}.mp3",
+        "output_file": None,
+        "error": None,
+        "start_time": start_time,
+        "end_time": None,
+    }
+
+
+@pytest.fixture
+def make_job():
+    """Builds a job record as the API creates it"""
+    return _make_job
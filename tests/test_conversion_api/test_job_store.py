@@ -0,0 +1,44 @@
+def test_create_get_and_update(job_store, make_job):
+    """Test that a job is stored and its fields updated"""
+    job_store.create(make_job("a"))
+
+    assert job_store.get("a") == make_job("a")
+    assert job_store.get("missing") is None
+
+    job_store.update("a", status="completed", output_file="a.wav", end_time=150.0)
+
+    job = job_store.get("a")
+    assert job["status"] == "completed"
+    assert job["output_file"] == "a.wav"
+    assert job["end_time"] == 150.0
+    assert job_store.count_by_status() == {"completed": 1}
+
+
+def test_delete(job_store, make_job):
+    """Test that a deleted job is gone from lookups and counts"""
+    job_store.create(make_job("a"))
+
+    job_store.delete("a")
+
+    assert job_store.get("a") is None
+    assert job_store.count_by_status() == {}
+
+
+def test_finished_before_selects_expired_jobs(job_store, make_job):
+    """Test that only jobs that ended before the timestamp are returned"""
+    for job_id, end_time in (("old", 120.0), ("new", 200.0)):
+        job_store.create(make_job(job_id))
+        job_store.update(job_id, status="completed", end_time=end_time)
+    job_store.create(make_job("running", "processing"))
+
+    assert [job["job_id"] for job in job_store.finished_before(150.0)] == ["old"]
+
+
+def test_unfinished_before_selects_stale_jobs(job_store, make_job):
+    """Test that only unfinished jobs started before the timestamp are returned"""
+    job_store.create(make_job("stale", "processing", start_time=100.0))
+    job_store.create(make_job("fresh", "pending", start_time=300.0))
+    job_store.create(make_job("done", "pending", start_time=100.0))
+    job_store.update("done", status="failed", end_time=110.0)
+
+    assert [job["job_id"] for job in job_store.unfinished_before(200.0)] == ["stale"]
@@ -0,0 +1,47 @@
+import importlib
+import os
+import sys
+import pytest
+
+
+@pytest.fixture
+def conversion_main(tmp_path, monkeypatch, job_store):
+    """The conversion API module, with its directories under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CONVERSION_DB_PATH", str(tmp_path / "main.sqlite3"))
+    monkeypatch.delenv("CONVERSION_REDIS_URL", raising=False)
+    sys.modules.pop("main", None)
+    main = importlib.import_module("main")
+    monkeypatch.setattr(main, "job_store", job_store)
+    yield main
+    sys.modules.pop("main", None)
+
+
+def test_cleanup_removes_expired_jobs_and_fails_stale_ones(
+    conversion_main, job_store, make_job, monkeypatch
+):
+    """Test the TTL expiry of finished jobs and the stale job cleanup"""
+    main = conversion_main
+    monkeypatch.setattr(main, "OUTPUT_TTL", 100)
+    monkeypatch.setattr(main, "STALE_JOB_AGE", 100)
+    monkeypatch.setattr(main.time, "time", lambda: 1000.0)
+
+    job_store.create(make_job("expired", start_time=800.0))
+    job_store.update(
+        "expired", status="completed", output_file="expired.wav", end_time=850.0
+    )
+    open(os.path.join(main.OUTPUT_DIR, "expired.wav"), "wb").close()
+    job_store.create(make_job("recent", start_time=950.0))
+    job_store.update("recent", status="completed", end_time=960.0)
+    job_store.create(make_job("stale", "processing", start_time=800.0))
+    open(os.path.join(main.UPLOAD_DIR, "stale.mp3"), "wb").close()
+
+    main.cleanup_expired_jobs()
+
+    assert job_store.get("expired") is None
+    assert not os.path.exists(os.path.join(main.OUTPUT_DIR, "expired.wav"))
+    assert job_store.get("recent")["status"] == "completed"
+    stale = job_store.get("stale")
+    assert stale["status"] == "failed"
+    assert stale["error"] == "Conversion interrupted"
+    assert not os.path.exists(os.path.join(main.UPLOAD_DIR, "stale.mp3"))
@@ -0,0 +1,52 @@
+import asyncio
+import scheduler
+from scheduler import ConversionScheduler
+
+
+def test_scheduler_bounds_concurrent_conversions(monkeypatch):
+    """Test that no more than max_concurrent conversions run at once"""
+    running, peak, done = 0, 0, []
+
+    async def fake_convert(store, job_id, input_path, output_path, timeout):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        done.append(job_id)
+
+    monkeypatch.setattr(scheduler, "convert_file", fake_convert)
+
+    async def run():
+        conversions = ConversionScheduler(store=None, max_concurrent=2, timeout=10)
+        conversions.start()
+        for index in range(6):
+            await conversions.submit(str(index), "in", "out")
+        assert conversions.queue_depth > 0
+        await conversions._queue.join()
+        await conversions.stop()
+        return conversions
+
+    conversions = asyncio.run(run())
+
+    assert peak == 2
+    assert sorted(done) == [str(index) for index in range(6)]
+    assert conversions.active == 0
+
+
+def test_failed_conversion_is_recorded(job_store, make_job, tmp_path):
+    """Test that an ffmpeg failure marks the job failed and removes the input"""
+    input_path = tmp_path / "a.mp3"
+    input_path.write_bytes(b"not audio")
+    job_store.create(make_job("a"))
+
+    asyncio.run(
+        scheduler.convert_file(
+            job_store, "a", str(input_path), str(tmp_path / "a.wav"), timeout=10
+        )
+    )
+
+    job = job_store.get("a")
+    assert job["status"] == "failed"
+    assert job["end_time"] is not None
+    assert not input_path.exists()
@@ -0,0 +1,29 @@
+from app.services.ai_client import ThinkFilter, filter_model_response
+
+
+def _stream(chunks):
+    think_filter = ThinkFilter()
+    pieces = [think_filter.feed(chunk) for chunk in chunks]
+    pieces.append(think_filter.flush())
+    return pieces
+
+
+def test_think_filter_matches_filter_model_response():
+    """Test that streamed filtering gives the same text as the batch filter"""
+    response = "<think>\nLet me think about it.\n</think>\n\nThe summary."
+    chunks = [response[i : i + 3] for i in range(0, len(response), 3)]
+
+    assert "".join(_stream(chunks)) == filter_model_response(response)
+
+
+def test_think_filter_holds_back_split_tags():
+    """Test that a tag split across tokens is not leaked"""
+    pieces = _stream(["<th", "ink>hidden</thi", "nk>Visible", " text"])
+
+    assert "".join(pieces) == "Visible text"
+    assert all("<" not in piece for piece in pieces)
+
+
+def test_think_filter_passes_plain_text_through():
+    """Test that responses without thinking are streamed as they arrive"""
+    assert _stream(["Hello", " world"]) == ["Hello", " world", ""]
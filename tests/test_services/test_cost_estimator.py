@@ -0,0 +1,59 @@
+import struct
+import wave
+import zlib
+import fitz
+from app.core.enums import FileType
+from app.services import cost_estimator
+from app.services import scheduling
+from app.services.cost_estimator import estimate_cost
+from app.services.scheduling import sjf_score
+
+
+def test_estimate_cost_reads_wav_duration(tmp_path, monkeypatch):
+    """Test that audio cost follows the duration in the WAV header"""
+    monkeypatch.setitem(cost_estimator.COST_BASE_SECONDS, "audio", 0)
+    monkeypatch.setattr(cost_estimator, "COST_AUDIO_REALTIME_FACTOR", 0.5)
+    path = tmp_path / "voice.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00\x00" * 8000 * 4)
+
+    cost = estimate_cost(str(path), FileType.AUDIO, path.stat().st_size)
+
+    assert cost["units"] == 4.0
+    assert cost["seconds"] == 2.0
+
+
+def test_estimate_cost_counts_pdf_pages_and_image_pixels(tmp_path):
+    """Test that PDF pages and PNG dimensions are read from the files"""
+    pdf_path = tmp_path / "doc.pdf"
+    with fitz.open() as doc:
+        for _ in range(3):
+            doc.new_page()
+        doc.save(str(pdf_path))
+    png_path = tmp_path / "image.png"
+    ihdr = struct.pack(">IIBBBBB", 640, 480, 8, 2, 0, 0, 0)
+    png_path.write_bytes(
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + b"IHDR"
+        + ihdr
+        + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    )
+
+    pdf_cost = estimate_cost(str(pdf_path), FileType.PDF, 0)
+    image_cost = estimate_cost(str(png_path), FileType.IMAGE, 0)
+
+    assert (pdf_cost["unit"], pdf_cost["units"]) == ("pages", 3)
+    assert (image_cost["unit"], image_cost["units"]) == ("pixels", 640 * 480)
+
+
+def test_sjf_score_ages_waiting_jobs(monkeypatch):
+    """Test that a large job overtakes small ones once it has waited long enough"""
+    monkeypatch.setattr(scheduling, "SJF_AGING_RATE", 1.0)
+    large_job = sjf_score(100, submitted_at=0)
+
+    assert sjf_score(5, submitted_at=50) < large_job
+    assert sjf_score(5, submitted_at=200) > large_job
@@ -1,8 +1,10 @@
+import hashlib
 import os
 import pytest
 import io
-from fastapi import UploadFile
-from app.services.file_service import save_upload_file, cleanup_file
+from fastapi import HTTPException, UploadFile
+from app.services import file_service
+from app.services.file_service import save_upload_file, store_upload_file, cleanup_file
 
 
 class MockUploadFile:
@@ -43,3 +45,40 @@ def test_cleanup_file(sample_text_file):
     # Verify results
     assert result is True
     assert not os.path.exists(sample_text_file)
+
+
+@pytest.mark.asyncio
+async def test_store_upload_file_hashes_and_measures(monkeypatch):
+    """Test that the upload is hashed and measured while it is written"""
+    monkeypatch.setattr(file_service, "UPLOAD_CHUNK_SIZE", 4)
+    content = b"Test file content"
+
+    upload = await store_upload_file(MockUploadFile(content), "test.txt")
+
+    try:
+        assert upload.size == len(content)
+        assert upload.sha256 == hashlib.sha256(content).hexdigest()
+        with open(upload.path, "rb") as f:
+            assert f.read() == content
+    finally:
+        cleanup_file(upload.path)
+
+
+@pytest.mark.asyncio
+async def test_store_upload_file_rejects_large_files(monkeypatch):
+    """Test that an upload over the size limit is rejected and removed"""
+    monkeypatch.setattr(file_service, "UPLOAD_CHUNK_SIZE", 4)
+    saved_paths = []
+    original = file_service.create_temp_file_path
+
+    def record_path(file_name):
+        saved_paths.append(original(file_name))
+        return saved_paths[-1]
+
+    monkeypatch.setattr(file_service, "create_temp_file_path", record_path)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await store_upload_file(MockUploadFile(b"x" * 20), "big.txt", max_size=10)
+
+    assert exc_info.value.status_code == 413
+    assert not os.path.exists(saved_paths[0])
@@ -0,0 +1,91 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from prometheus_client import REGISTRY
+from app.services.metrics import observe_timings, time_iter, time_stage
+from app.services.tracing import trace_job
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_time_stage_counts_errors():
+    """Test that a failing stage is still timed and counted as an error"""
+    before = sample("synthia_stage_duration_seconds_count", stage="test_stage")
+    errors = sample("synthia_stage_errors_total", stage="test_stage")
+
+    with time_stage("test_stage"):
+        pass
+    with pytest.raises(ValueError):
+        with time_stage("test_stage"):
+            raise ValueError("boom")
+
+    assert sample("synthia_stage_duration_seconds_count", stage="test_stage") == (
+        before + 2
+    )
+    assert sample("synthia_stage_errors_total", stage="test_stage") == errors + 1
+
+
+def test_time_stage_labels_translation_direction():
+    """Test that translations are timed per direction"""
+    before = sample("synthia_translation_duration_seconds_count", direction="xx-yy")
+
+    with time_stage("translation", direction="xx-yy"):
+        pass
+
+    assert (
+        sample("synthia_translation_duration_seconds_count", direction="xx-yy")
+        == before + 1
+    )
+
+
+def test_time_iter_excludes_consumer_time(monkeypatch):
+    """Test that only the time spent producing items is observed"""
+    clock = iter(range(100))
+    monkeypatch.setattr("app.services.metrics.time.perf_counter", lambda: next(clock))
+    before = sample("synthia_stage_duration_seconds_sum", stage="test_iter")
+
+    for _ in time_iter(["a", "b"], "test_iter"):
+        next(clock)  # the consumer's work takes one tick per item
+
+    # Three next() calls of one tick each, the consumer's two ticks are skipped
+    assert sample("synthia_stage_duration_seconds_sum", stage="test_iter") == (
+        before + 3
+    )
+
+
+def test_job_stages_are_observed_from_the_trace():
+    """Test that stages run in a job are counted once, from the stored timings"""
+    before = sample("synthia_stage_duration_seconds_count", stage="test_job_stage")
+    errors = sample("synthia_stage_errors_total", stage="test_job_stage")
+    direction = sample("synthia_translation_duration_seconds_count", direction="zz-yy")
+    job = SimpleNamespace(
+        id="job",
+        meta={},
+        created_at=datetime(2025, 1, 1),
+        started_at=None,
+        save_meta=lambda: None,
+    )
+
+    with trace_job(job):
+        with time_stage("translation", direction="zz-yy"):
+            pass
+        with pytest.raises(ValueError):
+            with time_stage("test_job_stage"):
+                raise ValueError("boom")
+
+    # A forked job process would exit here, taking its own samples with it
+    assert sample("synthia_stage_duration_seconds_count", stage="test_job_stage") == (
+        before
+    )
+    observe_timings(job.meta["timings"])
+
+    assert sample("synthia_stage_duration_seconds_count", stage="test_job_stage") == (
+        before + 1
+    )
+    assert sample("synthia_stage_errors_total", stage="test_job_stage") == errors + 1
+    assert (
+        sample("synthia_translation_duration_seconds_count", direction="zz-yy")
+        == direction + 1
+    )
@@ -0,0 +1,16 @@
+import random
+from collections import Counter
+from types import SimpleNamespace
+from app.services.queues import parse_queue_weights, weighted_order
+
+
+def test_weighted_order_prefers_heavier_queues():
+    """Test that queues come first in proportion to their weight"""
+    queues = [SimpleNamespace(name=name) for name in ("audio", "text")]
+    weights = parse_queue_weights("text=3, audio=1")
+    rng = random.Random(0)
+
+    firsts = Counter(weighted_order(queues, weights, rng)[0].name for _ in range(4000))
+
+    assert weights == {"text": 3.0, "audio": 1.0}
+    assert 0.7 < firsts["text"] / 4000 < 0.8
@@ -0,0 +1,86 @@
+import fakeredis
+import pytest
+from rq import SimpleWorker
+from rq.job import JobStatus
+from app.core.enums import FileType
+from app.services import scheduling
+from app.services.queues import create_queues
+from app.services.scheduling import (
+    JobSubmission,
+    cost_stats,
+    dispatch_jobs,
+    pending_key,
+    submit_job,
+    submit_jobs,
+)
+
+
+def summarize(text, target_language, on_token=None):
+    return "A summary."
+
+
+@pytest.fixture
+def queues(monkeypatch):
+    """Queues on a fake Redis, with shortest-job-first keeping one job queued"""
+    monkeypatch.setattr(scheduling, "SJF_ENABLED", True)
+    monkeypatch.setattr(scheduling, "SJF_QUEUE_WATERMARK", 1)
+    return create_queues(fakeredis.FakeRedis())
+
+
+def _submission(seconds: float) -> JobSubmission:
+    return JobSubmission(FileType.TEXT, {"seconds": seconds}, print, (seconds,))
+
+
+def test_jobs_are_held_and_the_cheapest_dispatched(queues):
+    """Test that only the cheapest job reaches the queue, the rest are held"""
+    queue = queues[FileType.TEXT]
+
+    expensive, cheap, medium = submit_jobs(
+        queues, [_submission(30), _submission(5), _submission(10)]
+    )
+
+    assert queue.job_ids == [cheap.id]
+    assert cheap.get_status(refresh=True) == JobStatus.QUEUED
+    held = queue.connection.zrange(pending_key(queue.name), 0, -1)
+    assert [job_id.decode() for job_id in held] == [medium.id, expensive.id]
+    assert expensive.get_status(refresh=True) == JobStatus.DEFERRED
+    assert medium.get_status(refresh=True) == JobStatus.DEFERRED
+
+
+def test_dispatch_fills_the_queue_up_to_the_watermark(queues):
+    """Test that held jobs move cheapest first and stop at the watermark"""
+    queue = queues[FileType.TEXT]
+    expensive, cheap, medium = submit_jobs(
+        queues, [_submission(30), _submission(5), _submission(10)]
+    )
+
+    # Already at the watermark, nothing moves
+    assert dispatch_jobs(queue) == 0
+    assert dispatch_jobs(queue, watermark=2) == 1
+    assert queue.job_ids == [cheap.id, medium.id]
+
+    assert dispatch_jobs(queue, watermark=5) == 1
+    assert queue.job_ids == [cheap.id, medium.id, expensive.id]
+    assert expensive.get_status(refresh=True) == JobStatus.QUEUED
+    assert queue.connection.zcard(pending_key(queue.name)) == 0
+    assert dispatch_jobs(queue, watermark=5) == 0
+
+
+def test_text_jobs_record_their_cost(queues, monkeypatch):
+    """Test that /summarize/text jobs feed the estimated vs actual stats"""
+    monkeypatch.setattr("app.services.jobs.generate_text_summary", summarize)
+    queue = queues[FileType.TEXT]
+    submit_job(
+        queues,
+        FileType.TEXT,
+        {"seconds": 2.0},
+        "app.services.jobs.process_text_summarization",
+        "Some text.",
+        "en",
+    )
+
+    SimpleWorker([queue], connection=queue.connection).work(burst=True)
+
+    stats = cost_stats(queue.connection)["text"]
+    assert stats["jobs"] == 1
+    assert stats["estimated_seconds"] == 2.0
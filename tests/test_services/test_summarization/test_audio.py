@@ -0,0 +1,84 @@
+import wave
+import numpy as np
+from app.services.summarization import audio
+from app.services.summarization.audio import load_audio, read_pcm_wav
+
+
+def _write_wav(path, samples, sample_rate=16000):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+
+
+def test_read_pcm_wav(tmp_path):
+    """Test that 16 kHz mono WAV is read straight into float32 samples"""
+    path = tmp_path / "tone.wav"
+    _write_wav(path, np.array([0, 16384, -32768], dtype=np.int16))
+
+    samples = read_pcm_wav(str(path))
+
+    assert samples.dtype == np.float32
+    assert samples.tolist() == [0.0, 0.5, -1.0]
+
+
+def test_read_pcm_wav_needs_resampling(tmp_path):
+    """Test that WAV at another sample rate is not read directly"""
+    path = tmp_path / "tone.wav"
+    _write_wav(path, np.zeros(10, dtype=np.int16), sample_rate=44100)
+
+    assert read_pcm_wav(str(path)) is None
+
+
+def test_read_pcm_wav_rejects_other_encodings(tmp_path):
+    """Test that WAV the wave module can't read is left to ffmpeg"""
+    path = tmp_path / "tone.wav"
+    _write_wav(path, np.zeros(10, dtype=np.int16))
+    data = bytearray(path.read_bytes())
+    data[20:22] = (3).to_bytes(2, "little")  # IEEE float format tag
+    path.write_bytes(bytes(data))
+    truncated = tmp_path / "truncated.wav"
+    truncated.write_bytes(b"RIFF")
+
+    assert read_pcm_wav(str(path)) is None
+    assert read_pcm_wav(str(truncated)) is None
+
+
+def test_load_audio_falls_back_to_conversion_api(monkeypatch):
+    """Test that the conversion API is used when ffmpeg is not available"""
+    converted = np.zeros(4, dtype=np.float32)
+    monkeypatch.setattr(audio, "AUDIO_DECODE_MODE", "auto")
+    monkeypatch.setattr(audio, "ffmpeg_available", lambda: False)
+    monkeypatch.setattr(audio, "convert_with_api", lambda path: converted)
+
+    assert load_audio("voice.ogg") is converted
+
+
+def test_transcribe_long_audio_stitches_segments(monkeypatch):
+    """Test that segment transcripts are joined in order with shifted timestamps"""
+
+    class MockWhisper:
+        def transcribe(self, samples):
+            seconds = len(samples) / 16000
+            return {
+                "text": f" {seconds:.0f}s",
+                "language": "en",
+                "segments": [{"start": 0.0, "end": seconds, "text": f"{seconds:.0f}s"}],
+            }
+
+    monkeypatch.setattr(audio, "AUDIO_TRANSCRIBE_WORKERS", 1)
+    monkeypatch.setattr(audio, "AUDIO_SEGMENT_MAX_SECONDS", 10)
+    monkeypatch.setattr(audio, "AUDIO_SEGMENT_MIN_SECONDS", 2)
+    monkeypatch.setattr(audio, "get_whisper_model", lambda size=None: MockWhisper())
+    samples = np.concatenate(
+        [np.full(8 * 16000, 0.5, dtype=np.float32), np.zeros(16000, np.float32)] * 2
+    )
+
+    result = audio.transcribe_long_audio(samples, "tiny")
+
+    assert len(result["segments"]) == 2
+    first, second = result["segments"]
+    assert first["end"] == second["start"]
+    assert result["text"] == f"{first['text']} {second['text']}"
+    assert result["language"] == "en"
@@ -0,0 +1,20 @@
+from app.services.summarization import image
+from app.services.summarization.image import generate_image_summary
+
+
+def test_image_summary_is_translated_to_a_regional_language(
+    mock_ollama_response, monkeypatch, tmp_path
+):
+    """Test that a pt-br summary is translated, not left in English"""
+    calls = []
+
+    def mock_translate(text, source, target):
+        calls.append((source, target))
+        return "Um resumo."
+
+    monkeypatch.setattr(image, "translate", mock_translate)
+    path = tmp_path / "picture.png"
+    path.write_bytes(b"not really a png")
+
+    assert generate_image_summary(str(path), "pt-br") == "Um resumo."
+    assert calls == [("en", "pt-br")]
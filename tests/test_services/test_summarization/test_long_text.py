@@ -0,0 +1,37 @@
+from app.services.summarization import long_text
+from app.services.summarization.long_text import iter_text_chunks, map_reduce_summary
+
+
+def test_iter_text_chunks_cuts_on_sentences(monkeypatch):
+    """Test that chunks respect the budget and end on sentence boundaries"""
+    monkeypatch.setattr(long_text, "SUMMARY_CHARS_PER_TOKEN", 1)
+    pages = ["First sentence here. Second one follows. ", "Third is on page two. "]
+
+    chunks = list(iter_text_chunks(pages, max_tokens=30))
+
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == "".join(pages).strip()
+
+
+def test_map_reduce_summary_combines_chunks(monkeypatch):
+    """Test that chunk summaries are reduced to a single summary"""
+    monkeypatch.setattr(long_text, "SUMMARY_CHARS_PER_TOKEN", 1)
+    prompts = []
+
+    def mock_generate(model, prompt, images=None, on_token=None):
+        prompts.append(prompt)
+        if on_token:
+            on_token("final")
+        return "final" if prompt.startswith("The following") else "partial."
+
+    monkeypatch.setattr(long_text.OllamaClient, "generate", mock_generate)
+    streamed = []
+    text = "A sentence of text. " * 20
+
+    summary = map_reduce_summary(text, on_token=streamed.append, max_tokens=60)
+
+    assert summary == "final"
+    assert streamed == ["final"]
+    assert sum(p.startswith("Please summarize the following part") for p in prompts) > 1
+    assert prompts[-1].startswith("The following")
@@ -0,0 +1,44 @@
+import fitz
+import pytest
+from app.services.summarization import pdf
+from app.services.summarization.pdf import extract_text_from_pdf, iter_pdf_pages
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Create a small multi-page PDF"""
+    path = tmp_path / "sample.pdf"
+    with fitz.open() as doc:
+        for number in range(6):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {number} text.")
+        doc.save(path)
+    return str(path)
+
+
+def test_extract_text_from_pdf(sample_pdf):
+    """Test that every page is extracted in order"""
+    text = extract_text_from_pdf(sample_pdf)
+
+    assert [line for line in text.splitlines() if line] == [
+        f"Page {number} text." for number in range(6)
+    ]
+
+
+def test_iter_pdf_pages_with_range_and_budget(sample_pdf):
+    """Test page ranges and the character budget"""
+    pages = list(iter_pdf_pages(sample_pdf, page_range=(2, 4)))
+    assert [page.strip() for page in pages] == ["Page 2 text.", "Page 3 text."]
+
+    text = "".join(iter_pdf_pages(sample_pdf, max_chars=20))
+    assert len(text) == 20
+
+
+def test_parallel_extraction_matches_sequential(sample_pdf, monkeypatch):
+    """Test that the process pool gives the same pages as a single process"""
+    sequential = list(iter_pdf_pages(sample_pdf))
+    monkeypatch.setattr(pdf, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(pdf, "PDF_MAX_WORKERS", 2)
+    monkeypatch.setattr(pdf, "PDF_PAGES_PER_TASK", 4)
+
+    assert list(iter_pdf_pages(sample_pdf)) == sequential
@@ -1,4 +1,5 @@
 import pytest
+from app.services.summarization import text as text_module
 from app.services.summarization.text import generate_text_summary
 
 
@@ -11,11 +12,64 @@ def test_generate_text_summary(mock_ollama_response):
     assert summary == "This is a mock summary."
 
 
-def test_generate_text_summary_with_language(mock_ollama_response):
+def test_generate_text_summary_with_language(mock_ollama_response, monkeypatch):
     """Test the text summarization with a specific language"""
+    calls = []
+
+    def mock_translate(text, source, target):
+        calls.append((source, target))
+        return text
+
+    monkeypatch.setattr(text_module, "translate", mock_translate)
+
     # Call the function with a language parameter
     summary = generate_text_summary("This is a test text to summarize.", "pt-br")
 
-    # In a real test, you might verify that the language was passed to the model
-    # Here we just check that it returns the mock summary
+    # The regional code is served by the en-pt model
     assert summary == "This is a mock summary."
+    assert calls == [("en", "pt-br")]
+
+
+def test_english_text_is_not_translated_from_portuguese(
+    mock_ollama_response, monkeypatch
+):
+    """Test that only the summary is translated when the text is in English"""
+    calls = []
+
+    def mock_translate(text, source, target):
+        calls.append((source, target))
+        return "Um resumo."
+
+    monkeypatch.setattr(text_module, "translate", mock_translate)
+
+    summary = generate_text_summary(
+        "The report was delivered to the board last week and approved.", "pt"
+    )
+
+    assert summary == "Um resumo."
+    assert calls == [("en", "pt")]
+
+
+def test_language_is_detected_past_a_short_first_page(monkeypatch):
+    """Test that pieces are read up to the detection limit, and none are lost"""
+    monkeypatch.setattr(text_module, "LANGUAGE_DETECTION_MAX_CHARS", 200)
+    pages = [
+        "Relatório anual",
+        "O relatório foi entregue ao conselho na semana passada e os membros "
+        "vão discuti-lo na próxima reunião.",
+        "As vendas cresceram no primeiro trimestre, mas os custos de transporte "
+        "e de energia também aumentaram.",
+        "A empresa disse que vai contratar mais pessoas este ano.",
+    ]
+    read = []
+
+    def produce():
+        for page in pages:
+            read.append(page)
+            yield page
+
+    language, text = text_module._detect_source_language(produce())
+
+    assert language == "pt"
+    assert read == pages[:3]
+    assert list(text) == pages
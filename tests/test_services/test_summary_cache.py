@@ -0,0 +1,37 @@
+import fakeredis
+from rq import Queue
+from rq.job import Job, JobStatus
+from rq.registry import FinishedJobRegistry
+from rq.results import Result
+from app.core.enums import FileType
+from app.services import summary_cache
+from app.services.summary_cache import create_cached_job, summary_cache_key
+
+
+def test_cache_key_depends_on_request_parameters():
+    """Test that different languages, types and Whisper models don't collide"""
+    base = summary_cache_key("abc", FileType.AUDIO, "en", "small")
+
+    assert summary_cache_key("abc", FileType.AUDIO, "EN", "small") == base
+    assert summary_cache_key("abc", FileType.AUDIO, "pt", "small") != base
+    assert summary_cache_key("abc", FileType.AUDIO, "en", "base") != base
+    assert summary_cache_key("abc", FileType.PDF, "en") != base
+
+
+def test_cached_job_is_stored_like_a_finished_one(monkeypatch):
+    """Test that a cache hit gives a finished job kept for the queue's TTL"""
+    monkeypatch.setitem(
+        summary_cache.JOB_QUEUES, "text", {"job_timeout": 300, "result_ttl": 120}
+    )
+    connection = fakeredis.FakeRedis()
+    queue = Queue("text", connection=connection)
+    result = {"summary": "A summary.", "file_name": "document.txt"}
+
+    job = Job.fetch(create_cached_job(queue, result).id, connection=connection)
+
+    assert job.get_status() == JobStatus.FINISHED
+    assert job.meta == {"cache_hit": True}
+    assert job.return_value() == result
+    assert job.id in FinishedJobRegistry(queue=queue).get_job_ids()
+    assert 0 < connection.ttl(job.key) <= 120
+    assert 0 < connection.ttl(Result.get_key(job.id)) <= 120
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from app.services.metrics import time_stage
+from app.services.tracing import trace_job
+
+
+class MockJob:
+    def __init__(self):
+        self.id = "job"
+        self.meta = {"upload_seconds": 0.5}
+        self.created_at = datetime(2025, 1, 1)
+        self.started_at = self.created_at + timedelta(seconds=3)
+        self.saved = False
+
+    def save_meta(self):
+        self.saved = True
+
+
+def test_trace_job_records_stages():
+    """Test that stages run inside a job end up in its timings"""
+    job = MockJob()
+
+    with trace_job(job):
+        with time_stage("translation", direction="pt-en") as sizes:
+            sizes.update(input_chars=10, output_chars=8)
+        with time_stage("whisper"):
+            pass
+
+    timings = job.meta["timings"]
+    assert job.saved
+    assert timings["upload_seconds"] == 0.5
+    assert timings["queued_seconds"] == 3
+    assert [stage["stage"] for stage in timings["stages"]] == [
+        "translation",
+        "whisper",
+    ]
+    translation = timings["stages"][0]
+    assert translation["direction"] == "pt-en"
+    assert translation["input_chars"] == 10
+    assert translation["output_chars"] == 8
+    assert 0 <= translation["start"] <= translation["end"]
+
+
+def test_stages_outside_a_job_are_not_traced():
+    """Test that stages run in the API process don't leak into a later trace"""
+    with time_stage("upload"):
+        pass
+    job = MockJob()
+
+    with trace_job(job):
+        pass
+
+    assert job.meta["timings"]["stages"] == []
@@ -0,0 +1,164 @@
+from types import SimpleNamespace
+import pytest
+import torch
+from transformers import MarianConfig, MarianMTModel
+from app.config.settings import _parse_translation_models
+from app.services import translation
+from app.services.translation import split_paragraphs, pack_sentences, translate_text
+from app.utils.model_registry import ModelRegistry
+
+
+class MockTokenizer:
+    """Counts one token per word and records the batches it encodes"""
+
+    model_max_length = 512
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, add_special_tokens=True, **kwargs):
+        if kwargs.get("return_tensors"):
+            self.batches.append(list(texts))
+            return {"input_ids": list(texts)}
+        return {"input_ids": [text.split() for text in texts]}
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [text.upper() for text in outputs]
+
+
+class MockModel:
+    config = SimpleNamespace(max_position_embeddings=512)
+
+    def generate(self, input_ids):
+        return input_ids
+
+
+def test_split_paragraphs_on_sentences():
+    """Test that line wraps are folded and sentences split"""
+    text = "First sentence. Second\nsentence!\n\nNew paragraph?"
+
+    assert split_paragraphs(text) == [
+        ["First sentence.", "Second sentence!"],
+        ["New paragraph?"],
+    ]
+
+
+def test_pack_sentences_respects_token_budget():
+    """Test that sentences are packed without exceeding the budget"""
+    sentences = ["one two three.", "four five.", "six seven eight nine."]
+
+    segments = pack_sentences(MockTokenizer(), sentences, max_tokens=5)
+
+    assert segments == ["one two three. four five.", "six seven eight nine."]
+
+
+def test_pack_sentences_splits_oversized_sentence():
+    """Test that a sentence longer than the budget is split on words"""
+    segments = pack_sentences(MockTokenizer(), ["a b c d e f g"], max_tokens=3)
+
+    assert segments == ["a b c", "d e f", "g"]
+
+
+def test_translate_text_batches_and_keeps_order():
+    """Test that segments are translated in batches and reassembled in order"""
+    tokenizer = MockTokenizer()
+    text = "Um dois. Tres quatro cinco.\n\nSeis."
+
+    result = translate_text(text, MockModel(), tokenizer, batch_size=2)
+
+    assert result == "UM DOIS. TRES QUATRO CINCO.\n\nSEIS."
+    assert len(tokenizer.batches) == 1
+
+
+def test_int8_model_is_built_once_and_cached(tmp_path, monkeypatch):
+    """Test that the quantized model is cached and reloaded on later starts"""
+    monkeypatch.setattr(translation, "MODELS_DIR", str(tmp_path))
+    config = MarianConfig(
+        vocab_size=50,
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        pad_token_id=49,
+        decoder_start_token_id=49,
+    )
+    loads = []
+
+    def load_fp32():
+        loads.append(1)
+        return MarianMTModel(config).eval()
+
+    built = translation._load_int8_model("org/model", load_fp32)
+    cached = translation._load_int8_model("org/model", load_fp32)
+
+    assert len(loads) == 1
+    assert translation.quantized_model_path("org/model").startswith(
+        str(tmp_path / "int8" / "org--model")
+    )
+    linear = cached.model.encoder.layers[0].fc1
+    assert isinstance(linear, torch.ao.nn.quantized.dynamic.Linear)
+    input_ids = torch.tensor([[1, 2, 3]])
+    with torch.inference_mode():
+        expected = built.generate(input_ids, max_length=5)
+        assert torch.equal(cached.generate(input_ids, max_length=5), expected)
+
+
+def test_unknown_translation_backend_is_rejected():
+    """Test that a backend name typo fails instead of falling back to fp32"""
+    with pytest.raises(ValueError):
+        translation.load_marian_model("org/model", backend="fp16")
+
+
+def test_translate_loads_only_the_requested_pair(monkeypatch):
+    """Test that translating one direction doesn't load the other"""
+    loaded = []
+
+    def loader(pair):
+        loaded.append(pair)
+        return MockModel(), MockTokenizer()
+
+    registry = ModelRegistry("translation", loader, max_models=2)
+    monkeypatch.setattr(translation, "translation_registry", registry)
+
+    assert translation.translate("Um dois.", "EN", "pt") == "UM DOIS."
+    assert loaded == ["en-pt"]
+    assert translation.supports_pair("pt", "en")
+    assert not translation.supports_pair("en", "xx")
+
+
+def test_preload_skips_unconfigured_pairs(monkeypatch):
+    """Test that a preload pair without a model is skipped instead of failing"""
+    loaded = []
+    registry = ModelRegistry("translation", loaded.append, max_models=2)
+    monkeypatch.setattr(translation, "translation_registry", registry)
+
+    translation.load_translation_models(["pt-en", "en-xx"])
+
+    assert loaded == ["pt-en"]
+
+
+def test_invalid_translation_models_entry_is_rejected():
+    """Test that a malformed TRANSLATION_MODELS entry names itself"""
+    assert _parse_translation_models(" pt-en = org/model ,") == {"pt-en": "org/model"}
+    with pytest.raises(ValueError, match="en-es-org/model"):
+        _parse_translation_models("pt-en=org/model,en-es-org/model")
+
+
+def test_regional_codes_use_the_base_language_model(monkeypatch):
+    """Test that pt-BR is translated with the en-pt model"""
+    loaded = []
+
+    def loader(pair):
+        loaded.append(pair)
+        return MockModel(), MockTokenizer()
+
+    registry = ModelRegistry("translation", loader, max_models=2)
+    monkeypatch.setattr(translation, "translation_registry", registry)
+
+    assert translation.supports_pair("en", "pt-BR")
+    assert translation.supports_pair("pt_br", "en")
+    assert translation.translate("Um dois.", "en", "pt-br") == "UM DOIS."
+    assert loaded == ["en-pt"]
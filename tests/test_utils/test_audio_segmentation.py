@@ -0,0 +1,35 @@
+import numpy as np
+from app.utils.audio_segmentation import split_on_silence
+
+SAMPLE_RATE = 1000
+
+
+def _tone(seconds, amplitude=0.5):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 50 * t)).astype(np.float32)
+
+
+def test_split_on_silence_cuts_in_silences():
+    """Test that segments are bounded and cut inside the silent gaps"""
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    audio = np.concatenate([_tone(8), silence, _tone(8), silence, _tone(8)])
+
+    bounds = split_on_silence(audio, SAMPLE_RATE, max_seconds=12, min_seconds=2)
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    assert all(stop - start <= 12 * SAMPLE_RATE for start, stop in bounds)
+    for _, cut in bounds[:-1]:
+        assert audio[cut - 100 : cut + 100].max() == 0
+
+
+def test_split_on_silence_without_silence():
+    """Test that audio without pauses is still cut to the maximum length"""
+    bounds = split_on_silence(_tone(30), SAMPLE_RATE, max_seconds=10, min_seconds=2)
+
+    assert all(stop - start <= 10 * SAMPLE_RATE for start, stop in bounds)
+    assert bounds[-1][1] == 30 * SAMPLE_RATE
+
+
+def test_split_on_silence_short_audio():
+    """Test that audio under the maximum length is a single segment"""
+    assert split_on_silence(_tone(5), SAMPLE_RATE, 10, 2) == [(0, 5 * SAMPLE_RATE)]
@@ -0,0 +1,36 @@
+from app.utils.language_detection import detect_language
+
+
+def test_detects_portuguese_and_english():
+    """Test that short news-like sentences are told apart"""
+    portuguese = (
+        "A prefeitura anunciou ontem que as obras na avenida principal serão "
+        "concluídas em março, segundo o secretário de infraestrutura."
+    )
+    english = (
+        "The city announced yesterday that the works on the main avenue will be "
+        "finished in March, according to the infrastructure secretary."
+    )
+
+    assert detect_language(portuguese) == "pt"
+    assert detect_language(english) == "en"
+
+
+def test_detects_spanish_rather_than_portuguese():
+    """Test that the closest language to Portuguese isn't mistaken for it"""
+    spanish = "No sé si voy a llegar a tiempo, porque el autobús viene con retraso."
+
+    assert detect_language(spanish) == "es"
+
+
+def test_too_short_text_is_unknown():
+    """Test that a few letters are not enough to guess"""
+    assert detect_language("Hello") is None
+    assert detect_language("12345 67890") is None
+
+
+def test_only_the_start_of_the_text_is_read():
+    """Test that max_chars bounds the text looked at"""
+    text = "The report was delivered to the board. " + "Relatório entregue. " * 50
+
+    assert detect_language(text, max_chars=40) == "en"
@@ -0,0 +1,63 @@
+import pytest
+from app.utils.model_registry import ModelRegistry
+
+
+def test_model_is_loaded_once():
+    """Test that repeated lookups reuse the loaded model"""
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        return object()
+
+    registry = ModelRegistry("test", loader, max_models=2)
+
+    first = registry.get("small")
+    second = registry.get("small")
+
+    assert first is second
+    assert calls == ["small"]
+
+
+def test_least_recently_used_model_is_evicted():
+    """Test that the registry keeps at most max_models resident"""
+    registry = ModelRegistry("test", lambda key: key.upper(), max_models=2)
+
+    registry.warmup(["tiny", "base"])
+    registry.get("tiny")
+    registry.get("small")
+
+    assert registry.loaded() == ["tiny", "small"]
+
+
+def test_registry_requires_capacity():
+    """Test that an empty registry is rejected"""
+    with pytest.raises(ValueError):
+        ModelRegistry("test", lambda key: key, max_models=0)
+
+
+def test_models_are_evicted_to_stay_within_byte_budget():
+    """Test that least recently used models go once the budget is exceeded"""
+    sizes = {"pt-en": 300, "en-pt": 500, "en-es": 400}
+    registry = ModelRegistry(
+        "test", lambda key: key, max_models=10, max_bytes=1000, size_of=sizes.get
+    )
+
+    registry.warmup(["pt-en", "en-pt"])
+    registry.get("pt-en")
+    registry.get("en-es")
+
+    assert registry.loaded() == ["pt-en", "en-es"]
+    assert registry.resident_bytes() == 700
+
+
+def test_model_larger_than_budget_is_kept_alone():
+    """Test that the model just loaded stays even if it is over the budget"""
+    registry = ModelRegistry(
+        "test", lambda key: key, max_models=10, max_bytes=100, size_of=len
+    )
+
+    registry.get("a" * 50)
+    registry.get("b" * 200)
+
+    assert registry.loaded() == ["b" * 200]